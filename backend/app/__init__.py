@@ -1,3 +1,4 @@
+import atexit
 import os
 from flask import Blueprint, Flask, jsonify
 import logging
@@ -43,6 +44,54 @@ def create_app(test_config=None):
         MAIL_DEFAULT_SENDER=os.getenv('MAIL_DEFAULT_SENDER', 'noreply@example.com')
     )
 
+    # Write-behind check-in queue (see services/checkin_queue.py)
+    app.config.update(
+        CHECKIN_WRITE_BEHIND=os.getenv('CHECKIN_WRITE_BEHIND', 'False') == 'True',
+        CHECKIN_QUEUE_DURABILITY=os.getenv('CHECKIN_QUEUE_DURABILITY', 'journal'),
+        CHECKIN_QUEUE_JOURNAL_PATH=os.getenv('CHECKIN_QUEUE_JOURNAL_PATH')
+    )
+
+    # Background report jobs (see services/report_jobs.py)
+    app.config.update(
+        REPORT_JOB_EXECUTOR=os.getenv('REPORT_JOB_EXECUTOR', 'process'),
+        REPORT_JOB_WORKERS=int(os.getenv('REPORT_JOB_WORKERS', 2))
+    )
+
+    # Parallel payroll computation and its result cache (see services/payroll_shards.py,
+    # services/payroll_cache.py)
+    app.config.update(
+        PAYROLL_WORKERS=int(os.getenv('PAYROLL_WORKERS', 1)),
+        PAYROLL_SHARD_BY=os.getenv('PAYROLL_SHARD_BY', 'department'),
+        PAYROLL_CACHE_SIZE=int(os.getenv('PAYROLL_CACHE_SIZE', 64))
+    )
+
+    # Threads running /dashboard/bootstrap sections side by side, and cached schedule month
+    # views (see services/dashboard.py, services/schedule.py)
+    app.config.update(
+        DASHBOARD_BOOTSTRAP_WORKERS=int(os.getenv('DASHBOARD_BOOTSTRAP_WORKERS', 4)),
+        SCHEDULE_CACHE_SIZE=int(os.getenv('SCHEDULE_CACHE_SIZE', 4096)),
+        SCHEDULE_CACHE_MAX_AGE=int(os.getenv('SCHEDULE_CACHE_MAX_AGE', 60))
+    )
+
+    # Change feed telling other workers to rebuild their location snapshot: Redis pub/sub when
+    # LOCATION_FEED_URL is set, else a version file (see services/location_snapshot.py,
+    # services/change_feed.py)
+    app.config.update(
+        LOCATION_FEED_URL=os.getenv('LOCATION_FEED_URL'),
+        LOCATION_FEED_CHANNEL=os.getenv('LOCATION_FEED_CHANNEL', 'locations:changed'),
+        LOCATION_FEED_FILE=os.getenv('LOCATION_FEED_FILE')
+    )
+
+    # The same for cached payroll results (see services/payroll_cache.py, services/change_feed.py)
+    app.config.update(
+        PAYROLL_FEED_URL=os.getenv('PAYROLL_FEED_URL'),
+        PAYROLL_FEED_CHANNEL=os.getenv('PAYROLL_FEED_CHANNEL', 'payroll:changed'),
+        PAYROLL_FEED_FILE=os.getenv('PAYROLL_FEED_FILE')
+    )
+
+    # Roles invoiced at period close instead of paid through payroll (see services/invoices.py)
+    app.config['INVOICE_ROLES'] = os.getenv('INVOICE_ROLES', 'Contractor').split(',')
+
     # Apply test configuration if provided
     if test_config:
         app.config.update(test_config)
@@ -51,8 +100,8 @@ def create_app(test_config=None):
     CORS(app, resources={r"/*": {
         "origins": ["http://localhost:5173", "http://127.0.0.1:5173", "http://localhost:3000"],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"],
-        "expose_headers": ["Content-Type", "Authorization"],
+        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Idempotency-Key"],
+        "expose_headers": ["Content-Type", "Authorization", "X-Next-Cursor", "Idempotent-Replayed"],
         "supports_credentials": True,
         "max_age": 120  # Cache preflight response for 2 minutes
     }})
@@ -89,6 +138,8 @@ def create_app(test_config=None):
     from backend.app.routes.payroll import bp as payroll_bp
     from backend.app.routes.dashboard import bp as dashboard_bp
     from backend.app.routes.shifts import bp as shifts_bp
+    from backend.app.routes.reports import bp as reports_bp
+    from backend.app.routes.invoices import bp as invoices_bp
 
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(checkins_bp, url_prefix='/checkins')
@@ -97,6 +148,8 @@ def create_app(test_config=None):
     app.register_blueprint(payroll_bp, url_prefix='/payroll')
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(shifts_bp, url_prefix='/shifts')
+    app.register_blueprint(reports_bp, url_prefix='/reports')
+    app.register_blueprint(invoices_bp, url_prefix='/invoices')
 
 
     # Default home route
@@ -121,4 +174,10 @@ def create_app(test_config=None):
         db.create_all()
         logging.info("Database tables created or already exist.")
 
+    # Start the write-behind check-in queue when enabled
+    from backend.app.services.checkin_queue import init_checkin_queue
+    checkin_queue = init_checkin_queue(app)
+    if checkin_queue:
+        atexit.register(checkin_queue.stop)
+
     return app
\ No newline at end of file
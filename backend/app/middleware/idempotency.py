@@ -0,0 +1,198 @@
+from flask import request, jsonify, make_response
+from flask_jwt_extended import get_jwt_identity
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import json
+import threading
+import time
+import os
+import logging
+
+from backend.app.middleware.rate_limiter import redis_client
+
+# Header clients send to make a POST safe to retry
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+
+# Marker stored while the first request with a key is still being processed
+IN_PROGRESS = '__in_progress__'
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with per-entry TTL and LRU eviction.
+
+    Args:
+        max_entries (int): Entries kept before the least recently used is evicted
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def add(self, key, value, ttl):
+        """Store value only if key is absent (or expired). Returns True if stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _set(self, key, value, ttl):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Fallback in-memory storage for idempotency records if Redis is unavailable
+in_memory_cache = TTLCache(max_entries=int(os.getenv('IDEMPOTENCY_CACHE_SIZE', 10000)))
+
+
+def _cache_add(key, value, ttl):
+    if redis_client:
+        try:
+            return bool(redis_client.set(key, value, ex=ttl, nx=True))
+        except Exception as e:
+            logging.error(f"Redis idempotency error: {str(e)}")
+    return in_memory_cache.add(key, value, ttl)
+
+
+def _cache_get(key):
+    if redis_client:
+        try:
+            return redis_client.get(key)
+        except Exception as e:
+            logging.error(f"Redis idempotency error: {str(e)}")
+    return in_memory_cache.get(key)
+
+
+def _cache_set(key, value, ttl):
+    if redis_client:
+        try:
+            redis_client.set(key, value, ex=ttl)
+            return
+        except Exception as e:
+            logging.error(f"Redis idempotency error: {str(e)}")
+    in_memory_cache.set(key, value, ttl)
+
+
+def _cache_delete(key):
+    if redis_client:
+        try:
+            redis_client.delete(key)
+            return
+        except Exception as e:
+            logging.error(f"Redis idempotency error: {str(e)}")
+    in_memory_cache.delete(key)
+
+
+def _record_key(path, user_id, idempotency_key):
+    return f"idempotency:{path}:{user_id}:{idempotency_key}"
+
+
+def request_handled(path, user_id, idempotency_key):
+    """
+    Whether a request to path with this key was already accepted (or is being
+    processed), so an upload replaying it elsewhere can skip it.
+    """
+    record = _cache_get(_record_key(path, user_id, idempotency_key))
+    if not record:
+        return False
+    record = json.loads(record)
+    return record["state"] == IN_PROGRESS or record["status"] < 400
+
+
+def idempotent(ttl=86400):
+    """
+    Idempotency-Key decorator for POST routes.
+
+    The first request with a given key runs normally and its response is
+    stored for ``ttl`` seconds. Retries with the same key replay the stored
+    response without running the route (and so without touching the
+    database). Must be applied below ``jwt_required`` so keys are scoped per user.
+
+    Args:
+        ttl (int): Seconds a stored response is kept
+
+    Returns:
+        Function: Decorated route function
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not idempotency_key:
+                return f(*args, **kwargs)
+            if len(idempotency_key) > 255:
+                return jsonify({"error": f"{IDEMPOTENCY_HEADER} must be at most 255 characters"}), 400
+
+            identity = get_jwt_identity() or {}
+            user_id = identity.get('id') if isinstance(identity, dict) else identity
+            key = _record_key(request.path, user_id, idempotency_key)
+            fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+
+            # Claim the key; if someone already holds it, replay or refuse
+            if not _cache_add(key, json.dumps({"state": IN_PROGRESS, "fingerprint": fingerprint}), ttl):
+                record = _cache_get(key)
+                record = json.loads(record) if record else None
+                if record is None:
+                    return jsonify({"error": "Idempotency record expired, please retry"}), 409
+                if record["fingerprint"] != fingerprint:
+                    return jsonify({
+                        "error": f"{IDEMPOTENCY_HEADER} was already used with a different request body"
+                    }), 422
+                if record["state"] == IN_PROGRESS:
+                    return jsonify({"error": "A request with this Idempotency-Key is still in progress"}), 409
+
+                response = make_response(record["body"], record["status"])
+                response.headers['Content-Type'] = record["content_type"]
+                response.headers[REPLAY_HEADER] = 'true'
+                return response
+
+            try:
+                response = make_response(f(*args, **kwargs))
+            except Exception:
+                _cache_delete(key)
+                raise
+
+            # Server errors are not stored so the client can retry them
+            if response.status_code >= 500:
+                _cache_delete(key)
+            else:
+                _cache_set(key, json.dumps({
+                    "state": "done",
+                    "fingerprint": fingerprint,
+                    "status": response.status_code,
+                    "content_type": response.content_type,
+                    "body": response.get_data(as_text=True),
+                }), ttl)
+            return response
+        return decorated_function
+    return decorator
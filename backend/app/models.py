@@ -78,6 +78,11 @@ class Location(db.Model):
 class CheckIn(db.Model):
     """Represents a user's check-in at a specific location."""
     __tablename__ = 'checkins'
+    __table_args__ = (
+        # Keyset pagination order for GET /checkins/ and per-user history scans
+        db.Index('ix_checkins_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_checkins_user_timestamp', 'user_id', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -108,14 +113,111 @@ class CheckIn(db.Model):
         return f"<CheckIn User: {self.user_id}, Location: {self.location_id}, Verified: {self.is_verified}>"
 
 
+class WorkSession(db.Model):
+    """A worked session pairing a check-in with its matching check-out."""
+    __tablename__ = 'work_sessions'
+    __table_args__ = (
+        db.Index('ix_work_sessions_user_start', 'user_id', 'start_time'),
+        db.Index('ix_work_sessions_status_user', 'status', 'user_id'),
+        db.Index('ix_work_sessions_updated_at', 'updated_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    location_id = db.Column(db.Integer, db.ForeignKey('locations.id'), nullable=True)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=True)
+    duration_hours = db.Column(db.Float, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='open')  # open, closed, unmatched
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    user = db.relationship('User')
+    location = db.relationship('Location')
+
+    def serialize(self):
+        """Serialize the WorkSession object into a dictionary."""
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "location_id": self.location_id,
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "duration_hours": self.duration_hours,
+            "status": self.status
+        }
+
+    def __repr__(self) -> str:
+        return f"<WorkSession User: {self.user_id}, Start: {self.start_time}, Status: {self.status}>"
+
+
+class PayRate(db.Model):
+    """
+    Effective-dated hourly rate. Scoped to one user, department or role, or
+    company-wide when none is set; the most specific scope wins
+    (user > department > role > company default).
+    """
+    __tablename__ = 'pay_rates'
+    __table_args__ = (
+        db.Index('ix_pay_rates_user_from', 'user_id', 'effective_from'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    department = db.Column(db.String(100), nullable=True)
+    role = db.Column(db.String(50), nullable=True)
+    hourly_rate = db.Column(db.Float, nullable=False)
+    effective_from = db.Column(db.Date, nullable=False)
+    effective_to = db.Column(db.Date, nullable=True)  # Inclusive; NULL means open-ended
+    created_on = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationship
+    user = db.relationship('User')
+
+    @property
+    def scope(self):
+        """(kind, value) of the scope this rate applies to."""
+        if self.user_id is not None:
+            return ('user', self.user_id)
+        if self.department is not None:
+            return ('department', self.department)
+        if self.role is not None:
+            return ('role', self.role)
+        return ('default', None)
+
+    def serialize(self):
+        """Serialize the PayRate object into a dictionary."""
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "department": self.department,
+            "role": self.role,
+            "hourly_rate": self.hourly_rate,
+            "effective_from": self.effective_from.isoformat() if self.effective_from else None,
+            "effective_to": self.effective_to.isoformat() if self.effective_to else None
+        }
+
+    def __repr__(self) -> str:
+        return f"<PayRate {self.scope}: {self.hourly_rate} from {self.effective_from}>"
+
+
 class Payroll(db.Model):
-    """Payroll information for each user."""
+    """Payroll information for each user, one row per user and pay period."""
     __tablename__ = 'payroll'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'period_start', 'period_end', name='uq_payroll_user_period'),
+        db.Index('ix_payroll_period', 'period_start', 'period_end'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    period_start = db.Column(db.Date, nullable=True)
+    period_end = db.Column(db.Date, nullable=True)  # Inclusive
     hours_worked = db.Column(db.Float, nullable=False)
     pay = db.Column(db.Float, nullable=False)
+    # Latest work_sessions.updated_at included in this row; later changes mark it stale
+    source_updated_at = db.Column(db.DateTime, nullable=True)
     generated_on = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationship
@@ -126,19 +228,60 @@ class Payroll(db.Model):
         return {
             "id": self.id,
             "user_id": self.user_id,
+            "period_start": self.period_start.isoformat() if self.period_start else None,
+            "period_end": self.period_end.isoformat() if self.period_end else None,
             "hours_worked": self.hours_worked,
             "pay": self.pay,
             "generated_on": self.generated_on.isoformat() if self.generated_on else None
         }
 
+class UserMonthlyRollup(db.Model):
+    """
+    Per-user, per-calendar-month earnings totals, maintained at write time
+    (services.rollups) so dashboards read them by primary key.
+    """
+    __tablename__ = 'user_monthly_rollups'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)  # First day of the month
+    checkins = db.Column(db.Integer, nullable=False, default=0)  # Verified check-ins
+    days_worked = db.Column(db.Integer, nullable=False, default=0)
+    hours_worked = db.Column(db.Float, nullable=False, default=0.0)
+    overtime_hours = db.Column(db.Float, nullable=False, default=0.0)
+    double_time_hours = db.Column(db.Float, nullable=False, default=0.0)
+    pay = db.Column(db.Float, nullable=False, default=0.0)
+    # Set when pay rates or bulk session rewrites may have changed the totals
+    stale = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def serialize(self):
+        """Serialize the UserMonthlyRollup object into a dictionary."""
+        return {
+            "user_id": self.user_id,
+            "month": self.month.isoformat() if self.month else None,
+            "checkins": self.checkins,
+            "days_worked": self.days_worked,
+            "hours_worked": self.hours_worked,
+            "overtime_hours": self.overtime_hours,
+            "double_time_hours": self.double_time_hours,
+            "pay": self.pay
+        }
+
+
 class Invoice(db.Model):
-    """Invoice model for payroll records."""
+    """Invoice model for payroll records, one per contractor and pay period."""
     __tablename__ = 'invoices'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'period_start', 'period_end', name='uq_invoice_user_period'),
+        db.Index('ix_invoices_status_created_on', 'status', 'created_on'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     amount = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(50), default='Pending')
+    period_start = db.Column(db.Date, nullable=True)
+    period_end = db.Column(db.Date, nullable=True)  # Inclusive
     created_on = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationship
@@ -151,6 +294,8 @@ class Invoice(db.Model):
             "user_id": self.user_id,
             "amount": self.amount,
             "status": self.status,
+            "period_start": self.period_start.isoformat() if self.period_start else None,
+            "period_end": self.period_end.isoformat() if self.period_end else None,
             "created_on": self.created_on.isoformat() if self.created_on else None
         }
 
@@ -195,7 +340,11 @@ class PasswordResetToken(db.Model):
 class Shift(db.Model):
     """Represents scheduled shifts for users at specific locations."""
     __tablename__ = 'shifts'
-    __table_args__ = {'extend_existing': True}  # Fix the duplicate table error
+    __table_args__ = (
+        # Per-user month views (/dashboard/schedule) and conflict checks
+        db.Index('ix_shifts_user_start', 'user_id', 'start_time'),
+        {'extend_existing': True},  # Fix the duplicate table error
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -224,4 +373,38 @@ class Shift(db.Model):
             "end_time": self.end_time.isoformat() if self.end_time else None,
             "status": self.status,
             "notes": self.notes
-        }
\ No newline at end of file
+        }
+
+class ShiftTemplate(db.Model):
+    """A recurring shift pattern, expanded into Shift rows by POST /shifts/bulk."""
+    __tablename__ = 'shift_templates'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    location_id = db.Column(db.Integer, db.ForeignKey('locations.id'), nullable=False)
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)  # At or before start_time: ends the next day
+    weekdays = db.Column(db.String(20), nullable=True)  # e.g. "MO,TU,WE,TH,FR"; None means every day
+    interval_weeks = db.Column(db.Integer, nullable=False, default=1)  # Every n-th week
+    rotation = db.Column(db.String(64), nullable=True)  # Day cycle, e.g. "11110000" = 4 on, 4 off
+    anchor_date = db.Column(db.Date, nullable=True)  # Week intervals and rotations count from here
+    notes = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    location = db.relationship('Location')
+
+    def serialize(self):
+        """Serialize the ShiftTemplate object into a dictionary."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "location_id": self.location_id,
+            "start_time": self.start_time.strftime('%H:%M') if self.start_time else None,
+            "end_time": self.end_time.strftime('%H:%M') if self.end_time else None,
+            "weekdays": self.weekdays.split(',') if self.weekdays else None,
+            "interval_weeks": self.interval_weeks,
+            "rotation": self.rotation,
+            "anchor_date": self.anchor_date.isoformat() if self.anchor_date else None,
+            "notes": self.notes
+        }
@@ -5,7 +5,7 @@ from flask_jwt_extended import jwt_required, create_access_token, get_jwt_identi
 from sqlalchemy.exc import SQLAlchemyError
 from backend.app.models import User, Location, CheckIn
 from backend.app.extensions import db
-from geopy.distance import geodesic
+from backend.app.services.geo import haversine_scalar_km
 
 # Initialize Blueprint for authentication routes
 auth_bp = Blueprint('auth_bp', __name__, url_prefix='/auth')
@@ -371,9 +371,7 @@ def check_in_out():
             return jsonify({'error': 'Latitude and longitude must be valid numbers'}), 400
 
         # Calculate the distance between the user and the location
-        user_coords = (latitude, longitude)
-        facility_coords = (location.latitude, location.longitude)
-        distance = geodesic(user_coords, facility_coords).km
+        distance = haversine_scalar_km(latitude, longitude, location.latitude, location.longitude)
         print(f"DEBUG: Distance calculated: {distance} km, Location radius: {location.radius} km")
 
         # Check if the user is within the allowed radius
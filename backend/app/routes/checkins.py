@@ -1,7 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models import CheckIn, Location, User, db
-from geopy.distance import geodesic
+from ..models import CheckIn, User, db
 import logging
 
 # Define the blueprint for check-in routes
@@ -10,12 +9,20 @@ bp = Blueprint('checkins_bp', __name__, url_prefix='/checkins')
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-from flask import Blueprint, request, jsonify
+import json
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from geopy.distance import geodesic
+from sqlalchemy import and_, or_, select
 from sqlalchemy.exc import SQLAlchemyError
-from backend.app.models import User, Location, CheckIn
+from backend.app.models import User, CheckIn
 from backend.app.extensions import db
+from backend.app.middleware.idempotency import idempotent, request_handled
+from backend.app.services.checkin_queue import QueueFullError, get_checkin_queue
+from backend.app.services.geofence import get_geofence_index
+from backend.app.services.tabular_export import EXPORT_CHUNK_SIZE, FORMATS, Column, format_error, iter_encoded
+from backend.app.services.work_sessions import record_punches
+from backend.app.utils import decode_cursor, encode_cursor
 import logging
 
 bp = Blueprint('checkins', __name__, url_prefix='/checkins')
@@ -24,6 +31,7 @@ bp = Blueprint('checkins', __name__, url_prefix='/checkins')
 
 @bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent()
 def check_in_out():
     """
     Record a user's check-in or check-out and verify their proximity to a location.
@@ -44,29 +52,35 @@ def check_in_out():
         location_id = data.get('location_id')
         check_type = data.get('check_type', 'in')  # Default to check-in if not specified
 
-        if latitude is None or longitude is None or location_id is None:
-            logging.warning("Missing required fields: latitude, longitude, location_id")
-            return jsonify({'error': 'Missing required fields: latitude, longitude, location_id'}), 400
-
-        # Validate location existence
-        location = db.session.get(Location, location_id)
-        if not location:
-            logging.warning(f"Invalid location ID: {location_id}")
-            return jsonify({'error': f'Invalid location ID: {location_id}'}), 404
+        if latitude is None or longitude is None:
+            logging.warning("Missing required fields: latitude, longitude")
+            return jsonify({'error': 'Missing required fields: latitude, longitude'}), 400
 
         # Validate latitude and longitude types
         try:
             latitude = float(latitude)
             longitude = float(longitude)
-        except ValueError:
+        except (TypeError, ValueError):
             logging.warning("Invalid data type for latitude or longitude")
             return jsonify({'error': 'Latitude and longitude must be valid numbers'}), 400
 
-        # Calculate the distance between the user and the location
-        user_coords = (latitude, longitude)
-        facility_coords = (location.latitude, location.longitude)
-        distance = geodesic(user_coords, facility_coords).km
-        print(f"DEBUG: Distance calculated: {distance} km, Location radius: {location.radius} km")
+        # Resolve the geofence from the in-process index instead of the database
+        index = get_geofence_index()
+        if location_id is not None:
+            location = index.get(location_id)
+            if not location:
+                logging.warning(f"Invalid location ID: {location_id}")
+                return jsonify({'error': f'Invalid location ID: {location_id}'}), 404
+            distance = index.distance_to(location, latitude, longitude)
+        else:
+            location, distance = index.nearest(latitude, longitude)
+            if not location:
+                logging.info(f"Check-{check_type} failed for user {user.username}: no geofence contains ({latitude}, {longitude})")
+                return jsonify({
+                    'success': False,
+                    'error': f'Check-{check_type} failed. You are not within any registered location.'
+                }), 400
+        logging.debug(f"Distance calculated: {distance} km, Location radius: {location.radius} km")
 
         # Check if the user is within the allowed radius
         if distance > location.radius:
@@ -78,25 +92,41 @@ def check_in_out():
             }), 400
 
         # Record the successful check-in/out
-        checkin = CheckIn(
-            user_id=user.id,
-            location_id=location.id,
-            latitude=latitude,
-            longitude=longitude,
-            is_verified=True,
-            check_type=check_type
-        )
-        db.session.add(checkin)
-        db.session.commit()
+        punch = {
+            'user_id': user.id,
+            'location_id': location.id,
+            'latitude': latitude,
+            'longitude': longitude,
+            'timestamp': datetime.utcnow(),
+            'is_verified': True,
+            'check_type': check_type
+        }
+        checkin_queue = get_checkin_queue(current_app)
+        if checkin_queue:
+            # Write-behind mode: the background worker group-commits queued punches
+            try:
+                checkin_queue.submit(punch)
+            except QueueFullError:
+                logging.warning(f"Check-in queue full, rejecting punch from user {user.username}")
+                response = jsonify({'error': 'Check-in service is busy. Please retry shortly.'})
+                response.headers['Retry-After'] = '1'
+                return response, 503
+            status_code = 202
+        else:
+            record_punches([punch])
+            db.session.commit()
+            status_code = 201
 
         action_type = "checked in" if check_type == "in" else "checked out"
         logging.info(f"User {user.username} successfully {action_type} at location {location.name}")
         return jsonify({
             'success': True,
             'is_verified': True,
+            'queued': status_code == 202,
             'check_type': check_type,
+            'location_id': location.id,
             'distance_km': round(distance, 2)
-        }), 201
+        }), status_code
 
     except SQLAlchemyError as db_error:
         db.session.rollback()
@@ -107,11 +137,259 @@ def check_in_out():
         return jsonify({'error': 'Internal Server Error'}), 500
 
 
+# Defaults for offline batch uploads
+BATCH_MAX_SIZE = 500
+BATCH_MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+
+def parse_client_timestamp(value, now):
+    """
+    Parse a client-supplied ISO-8601 punch time into a naive UTC datetime.
+
+    Missing timestamps default to ``now``; times in the future beyond the
+    allowed clock skew are rejected.
+    """
+    if value is None:
+        return now
+    timestamp = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    if timestamp > now + BATCH_MAX_CLOCK_SKEW:
+        raise ValueError("Timestamp is in the future")
+    return timestamp
+
+
+@bp.route('/batch', methods=['POST'])
+@jwt_required()
+@idempotent()
+def batch_check_in_out():
+    """
+    Record a batch of queued check-ins/check-outs from an offline device.
+
+    Expected JSON:
+    {
+        "punches": [
+            {"latitude": 40.71, "longitude": -74.0, "location_id": 1 (optional),
+             "check_type": "in", "timestamp": "2024-05-01T08:58:00Z",
+             "idempotency_key": "..." (optional)},
+            ...
+        ]
+    }
+
+    Every punch is verified against the geofences in one vectorized pass and
+    the verified ones are inserted with a single executemany in one transaction.
+    A punch carrying the Idempotency-Key of an earlier POST /checkins/ that was
+    already accepted is reported as a duplicate and not stored again.
+
+    Returns:
+        200: Per-item results (punches outside their geofence are reported, not stored)
+        400: Validation error
+        401: Unauthorized
+        413: Too many punches in one batch
+    """
+    try:
+        user_identity = get_jwt_identity()
+        user = db.session.get(User, user_identity.get('id'))
+
+        if not user:
+            logging.warning("Unauthorized batch check-in attempt - user not found")
+            return jsonify({'error': 'Unauthorized access'}), 401
+
+        data = request.get_json(silent=True)
+        punches = data.get('punches') if isinstance(data, dict) else data
+        if not isinstance(punches, list) or not punches:
+            return jsonify({'error': 'Request body must contain a non-empty "punches" array'}), 400
+
+        max_size = current_app.config.get('CHECKIN_BATCH_MAX_SIZE', BATCH_MAX_SIZE)
+        if len(punches) > max_size:
+            return jsonify({'error': f'Batch too large. At most {max_size} punches per request'}), 413
+
+        # Parse every punch; invalid ones get their error and skip verification
+        now = datetime.utcnow()
+        single_path = url_for('checkins.check_in_out')
+        results = [None] * len(punches)
+        parsed = []
+        for i, punch in enumerate(punches):
+            try:
+                if not isinstance(punch, dict):
+                    raise ValueError("Punch must be an object")
+                key = punch.get('idempotency_key')
+                if key and request_handled(single_path, user.id, key):
+                    results[i] = {'index': i, 'success': True, 'duplicate': True}
+                    continue
+                if punch.get('latitude') is None or punch.get('longitude') is None:
+                    raise ValueError("Missing required fields: latitude, longitude")
+                check_type = punch.get('check_type', 'in')
+                if check_type not in ('in', 'out'):
+                    raise ValueError("check_type must be 'in' or 'out'")
+                parsed.append((
+                    i,
+                    float(punch['latitude']),
+                    float(punch['longitude']),
+                    punch.get('location_id'),
+                    check_type,
+                    parse_client_timestamp(punch.get('timestamp'), now)
+                ))
+            except (TypeError, ValueError) as e:
+                results[i] = {'index': i, 'success': False, 'error': str(e)}
+
+        # Verify all parsed punches in one pass
+        resolved, distances, inside = get_geofence_index().verify_many(
+            [p[1] for p in parsed], [p[2] for p in parsed], [p[3] for p in parsed]
+        )
+
+        rows = []
+        for (i, latitude, longitude, location_id, check_type, timestamp), site_id, distance, ok in zip(
+                parsed, resolved.tolist(), distances.tolist(), inside.tolist()):
+            if site_id < 0:
+                error = (f'Invalid location ID: {location_id}' if location_id is not None
+                         else f'Check-{check_type} failed. You are not within any registered location.')
+                results[i] = {'index': i, 'success': False, 'error': error}
+            elif not ok:
+                results[i] = {
+                    'index': i,
+                    'success': False,
+                    'location_id': site_id,
+                    'error': f'Check-{check_type} failed. You are outside the allowed radius.',
+                    'distance_km': round(distance, 2)
+                }
+            else:
+                rows.append({
+                    'user_id': user.id,
+                    'location_id': site_id,
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    'timestamp': timestamp,
+                    'is_verified': True,
+                    'check_type': check_type
+                })
+                results[i] = {
+                    'index': i,
+                    'success': True,
+                    'check_type': check_type,
+                    'location_id': site_id,
+                    'timestamp': timestamp.isoformat(),
+                    'distance_km': round(distance, 2)
+                }
+
+        if rows:
+            record_punches(rows)
+            db.session.commit()
+
+        logging.info(f"User {user.username} uploaded {len(punches)} punches: {len(rows)} recorded")
+        return jsonify({
+            'recorded': len(rows),
+            'rejected': sum(1 for result in results if not result['success']),
+            'results': results
+        }), 200
+
+    except SQLAlchemyError as db_error:
+        db.session.rollback()
+        logging.exception(f"Database error during batch check-in: {str(db_error)}")
+        return jsonify({'error': 'Database error occurred. Please try again later.'}), 500
+    except Exception as e:
+        logging.exception(f"Error during batch check-in: {str(e)}")
+        return jsonify({'error': 'Internal Server Error'}), 500
+
+
+@bp.route('/queue/metrics', methods=['GET'])
+@jwt_required()
+def get_queue_metrics():
+    """
+    Report write-behind queue depth and flush latency (Admin only).
+    """
+    user_identity = get_jwt_identity()
+    if user_identity.get('role') != 'Admin':
+        return jsonify({"error": "Access denied"}), 403
+
+    checkin_queue = get_checkin_queue(current_app)
+    if not checkin_queue:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **checkin_queue.metrics()}), 200
+
+
+# Page sizes for GET /checkins/
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 1000
+
+CHECKIN_COLUMNS = (
+    CheckIn.id, CheckIn.user_id, CheckIn.location_id, CheckIn.latitude,
+    CheckIn.longitude, CheckIn.is_verified, CheckIn.check_type, CheckIn.timestamp
+)
+
+# Typed layout of CSV/Parquet/Arrow exports, in CHECKIN_COLUMNS order
+CHECKIN_EXPORT_SCHEMA = [
+    Column('id', 'int'), Column('user_id', 'int'), Column('location_id', 'int'),
+    Column('latitude', 'float'), Column('longitude', 'float'), Column('is_verified', 'bool'),
+    Column('check_type', 'str'), Column('timestamp', 'datetime'),
+]
+
+
+def parse_date_arg(value, end_of_day=False):
+    """Parse a YYYY-MM-DD (or full ISO) query argument into a naive datetime."""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    if end_of_day and len(value) == 10:
+        parsed = parsed + timedelta(days=1) - timedelta(microseconds=1)
+    return parsed
+
+
+def build_checkin_filters(args):
+    """
+    Translate user_id / location_id / start_date / end_date query arguments
+    into SQL filter clauses. Raises ValueError on malformed values.
+    """
+    filters = []
+    user_id = args.get('user_id', type=int)
+    location_id = args.get('location_id', type=int)
+    if user_id is not None:
+        filters.append(CheckIn.user_id == user_id)
+    if location_id is not None:
+        filters.append(CheckIn.location_id == location_id)
+    if args.get('start_date'):
+        try:
+            filters.append(CheckIn.timestamp >= parse_date_arg(args['start_date']))
+        except ValueError:
+            raise ValueError("Invalid start_date format. Use YYYY-MM-DD.")
+    if args.get('end_date'):
+        try:
+            filters.append(CheckIn.timestamp <= parse_date_arg(args['end_date'], end_of_day=True))
+        except ValueError:
+            raise ValueError("Invalid end_date format. Use YYYY-MM-DD.")
+    return filters
+
+
+def serialize_checkin_row(row):
+    """Serialize a check-in column row (see CHECKIN_COLUMNS) into a dictionary."""
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "location_id": row.location_id,
+        "latitude": row.latitude,
+        "longitude": row.longitude,
+        "is_verified": row.is_verified,
+        "check_type": row.check_type,
+        "timestamp": row.timestamp.isoformat() if row.timestamp else None
+    }
+
+
 @bp.route('/', methods=['GET'])
 @jwt_required()
 def get_checkins():
     """
-    Retrieve all check-ins (Admin only).
+    Retrieve check-ins, newest first (Admin only).
+
+    Query parameters:
+        limit (int): Page size (default 100, max 1000)
+        cursor (str): Value of X-Next-Cursor from the previous page
+        user_id, location_id (int): Optional filters
+        start_date, end_date (str): Optional YYYY-MM-DD range (inclusive)
+        format (str): 'ndjson' streams every matching row as newline-delimited JSON
+
+    The JSON response is a list of check-ins; when more rows exist the
+    X-Next-Cursor header carries the cursor for the next page.
     """
     try:
         user_identity = get_jwt_identity()
@@ -121,16 +399,107 @@ def get_checkins():
             logging.warning(f"Access denied for user '{user.username if user else 'Unknown'}' to check-ins data")
             return jsonify({"error": "Access denied"}), 403
 
-        checkins = CheckIn.query.all()
-        logging.info(f"Admin {user.username} retrieved all check-ins")
-        return jsonify([{
-            "id": checkin.id,
-            "user_id": checkin.user_id,
-            "location_id": checkin.location_id,
-            "latitude": checkin.latitude,
-            "longitude": checkin.longitude,
-            "is_verified": checkin.is_verified
-        } for checkin in checkins]), 200
+        try:
+            filters = build_checkin_filters(request.args)
+            cursor = request.args.get('cursor')
+            if cursor:
+                cursor_timestamp, cursor_id = decode_cursor(cursor)
+                filters.append(or_(
+                    CheckIn.timestamp < cursor_timestamp,
+                    and_(CheckIn.timestamp == cursor_timestamp, CheckIn.id < cursor_id)
+                ))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        stmt = select(*CHECKIN_COLUMNS).where(*filters).order_by(
+            CheckIn.timestamp.desc(), CheckIn.id.desc()
+        )
+
+        if request.args.get('format') == 'ndjson':
+            limit = request.args.get('limit', type=int)
+            if limit:
+                stmt = stmt.limit(limit)
+            logging.info(f"Admin {user.username} started a check-in NDJSON export")
+            return Response(
+                stream_with_context(_stream_checkins_ndjson(stmt)),
+                mimetype='application/x-ndjson'
+            )
+
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        rows = db.session.execute(stmt.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        response = jsonify([serialize_checkin_row(row) for row in rows])
+        if has_more:
+            response.headers['X-Next-Cursor'] = encode_cursor(rows[-1].timestamp, rows[-1].id)
+        logging.info(f"Admin {user.username} retrieved {len(rows)} check-ins")
+        return response, 200
     except Exception as e:
         logging.exception(f"Error retrieving check-ins: {str(e)}")
         return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
+
+
+def _stream_checkins_ndjson(stmt):
+    """Yield one JSON line per row from a server-side cursor, in fixed-size chunks."""
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=STREAM_CHUNK_SIZE))
+    try:
+        for partition in result.partitions():
+            yield ''.join(json.dumps(serialize_checkin_row(row)) + '\n' for row in partition)
+    finally:
+        result.close()
+
+
+@bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_checkins():
+    """
+    Export raw check-ins for BI tools (Admin only), oldest first.
+
+    Query parameters:
+        format (str): csv (default), parquet or arrow
+        user_id, location_id (int): Optional filters
+        start_date, end_date (str): Optional YYYY-MM-DD range (inclusive)
+
+    Rows are encoded in record batches straight from server-side cursor
+    partitions and streamed to the client.
+    """
+    try:
+        user_identity = get_jwt_identity()
+        user = db.session.get(User, user_identity.get('id'))
+
+        if not user or user.role != 'Admin':
+            logging.warning(f"Access denied for user '{user.username if user else 'Unknown'}' to check-in export")
+            return jsonify({"error": "Access denied"}), 403
+
+        fmt = request.args.get('format', 'csv')
+        error = format_error(fmt)
+        if error:
+            return jsonify({"error": error}), 400
+        try:
+            filters = build_checkin_filters(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        stmt = select(*CHECKIN_COLUMNS).where(*filters).order_by(CheckIn.timestamp, CheckIn.id)
+        logging.info(f"Admin {user.username} started a check-in {fmt} export")
+        response = Response(
+            stream_with_context(iter_encoded(fmt, _checkin_partitions(stmt), CHECKIN_EXPORT_SCHEMA)),
+            mimetype=FORMATS[fmt].mimetype
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename=checkins_export{FORMATS[fmt].extension}'
+        return response
+    except Exception as e:
+        logging.exception(f"Error exporting check-ins: {str(e)}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+def _checkin_partitions(stmt, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield lists of check-in column tuples from a server-side cursor."""
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
@@ -0,0 +1,161 @@
+# backend/app/routes/invoices.py
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from backend.app.models import Invoice
+from backend.app.extensions import db
+from backend.app.auth import role_required
+from backend.app.utils import decode_cursor, encode_cursor, validate_date_format
+from backend.app.services.invoices import (
+    DEFAULT_INVOICE_ROLES, INVOICE_STATUSES, generate_invoices, update_invoice_status
+)
+from sqlalchemy import and_, or_, select
+import logging
+from datetime import datetime
+
+bp = Blueprint('invoices_bp', __name__, url_prefix='/invoices')
+
+# Page sizes for GET /invoices/
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+@bp.route('/', methods=['GET'])
+@jwt_required()
+def get_invoices():
+    """
+    List invoices, newest first. Admins see every invoice, other users their own.
+
+    Query parameters:
+        limit (int): Page size (default 100, max 1000)
+        cursor (str): Value of X-Next-Cursor from the previous page
+        status (str): Optional status filter (served by the (status, created_on) index)
+        user_id (int): Optional filter, Admin only
+        period_start (str): Optional YYYY-MM-DD pay period start
+
+    When more rows exist the X-Next-Cursor header carries the cursor for the next page.
+    """
+    try:
+        user_identity = get_jwt_identity()
+        filters = []
+        if user_identity.get('role') == 'Admin':
+            user_id = request.args.get('user_id', type=int)
+            if user_id is not None:
+                filters.append(Invoice.user_id == user_id)
+        else:
+            filters.append(Invoice.user_id == user_identity.get('id'))
+
+        status = request.args.get('status')
+        if status:
+            if status not in INVOICE_STATUSES:
+                return jsonify({"error": f"Invalid status. Use one of {', '.join(INVOICE_STATUSES)}."}), 400
+            filters.append(Invoice.status == status)
+
+        period_start = request.args.get('period_start')
+        if period_start:
+            if not validate_date_format(period_start):
+                return jsonify({"error": "Invalid period_start format. Use YYYY-MM-DD."}), 400
+            filters.append(Invoice.period_start == datetime.strptime(period_start, "%Y-%m-%d").date())
+
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_created, cursor_id = decode_cursor(cursor)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            filters.append(or_(
+                Invoice.created_on < cursor_created,
+                and_(Invoice.created_on == cursor_created, Invoice.id < cursor_id)
+            ))
+
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        invoices = db.session.scalars(
+            select(Invoice).where(*filters)
+            .order_by(Invoice.created_on.desc(), Invoice.id.desc())
+            .limit(limit + 1)
+        ).all()
+        has_more = len(invoices) > limit
+        invoices = invoices[:limit]
+
+        response = jsonify([invoice.serialize() for invoice in invoices])
+        if has_more:
+            response.headers['X-Next-Cursor'] = encode_cursor(invoices[-1].created_on, invoices[-1].id)
+        return response, 200
+    except Exception as e:
+        logging.exception(f"Error retrieving invoices: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+@bp.route('/generate', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def generate_period_invoices():
+    """
+    Close a pay period for contractors: bring its payroll run up to date and
+    create a Pending invoice for every contractor not yet invoiced for it.
+    Accessible by Admin users only.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        start_date = data.get("start_date")
+        end_date = data.get("end_date")
+
+        if not start_date or not end_date:
+            return jsonify({"error": "start_date and end_date are required."}), 400
+        if not validate_date_format(start_date) or not validate_date_format(end_date):
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+        if start_date > end_date:
+            return jsonify({"error": "start_date must not be after end_date."}), 400
+
+        roles = current_app.config.get('INVOICE_ROLES', DEFAULT_INVOICE_ROLES)
+        summary = generate_invoices(start_date, end_date, roles)
+        db.session.commit()
+
+        logging.info(f"Generated {summary['created']} invoices for {start_date} to {end_date}")
+        return jsonify(summary), 201
+    except Exception as e:
+        db.session.rollback()
+        logging.exception(f"Error generating invoices: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+@bp.route('/status', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def update_invoices_status():
+    """
+    Move invoices to a new status in bulk, e.g.
+    {"status": "Paid", "ids": [1, 2]} or {"status": "Approved", "start_date": ..., "end_date": ...}.
+    Invoices whose current status does not allow the transition are skipped.
+    Accessible by Admin users only.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        status = data.get("status")
+        ids = data.get("ids")
+        start_date = data.get("start_date")
+        end_date = data.get("end_date")
+
+        if ids is None and not (start_date and end_date):
+            return jsonify({"error": "ids or start_date and end_date are required."}), 400
+        if ids is not None and (not isinstance(ids, list) or not all(isinstance(i, int) for i in ids)):
+            return jsonify({"error": "ids must be a list of integers."}), 400
+        period_start = period_end = None
+        if start_date or end_date:
+            if not (start_date and end_date and validate_date_format(start_date)
+                    and validate_date_format(end_date)):
+                return jsonify({"error": "start_date and end_date must both be YYYY-MM-DD."}), 400
+            period_start = datetime.strptime(start_date, "%Y-%m-%d").date()
+            period_end = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+        try:
+            updated = update_invoice_status(status, ids, period_start, period_end)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        db.session.commit()
+
+        return jsonify({"status": status, "updated": updated}), 200
+    except Exception as e:
+        db.session.rollback()
+        logging.exception(f"Error updating invoice status: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
@@ -1,7 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.app.extensions import db
 from backend.app.models import Location
+from backend.app.services.location_snapshot import get_location_snapshot
 import logging
 
 # Initialize Blueprint for locations
@@ -18,14 +19,13 @@ def get_locations():
     Accessible by all authenticated users.
     """
     try:
-        locations = Location.query.all()
-        return jsonify([{
-            'id': loc.id,
-            'name': loc.name,
-            'latitude': loc.latitude,
-            'longitude': loc.longitude,
-            'radius': loc.radius
-        } for loc in locations]), 200
+        # Pre-serialized snapshot, rebuilt only when locations change; clients
+        # revalidate with If-None-Match and get a 304 while it is unchanged
+        snapshot = get_location_snapshot()
+        response = Response(snapshot.body, mimetype='application/json')
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.set_etag(snapshot.etag)
+        return response.make_conditional(request)
     except Exception as e:
         logging.exception(f"Error fetching locations: {e}")
         return jsonify({"error": "Internal Server Error"}), 500
@@ -1,46 +1,44 @@
 # backend/app/routes/payroll.py
-from flask import Blueprint, jsonify, make_response, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.app.models import User, CheckIn
+from backend.app.models import User, PayRate, Payroll
 from backend.app.extensions import db
 from backend.app.auth import role_required
-import pandas as pd
-import io
+from backend.app.services.payroll_engine import (
+    PAYROLL_EXPORT_COLUMNS, PAYROLL_EXPORT_SCHEMA, iter_payroll, iter_payroll_chunks,
+    period_bounds, run_payroll, user_earnings
+)
+from backend.app.services.payroll_cache import cached_payroll
+from backend.app.services.payroll_shards import compute_payroll_sharded
+from backend.app.services.pay_rates import find_overlapping_rate
+from backend.app.services.spreadsheet import XLSX_MIMETYPE, stream_file, write_xlsx
+from backend.app.services.tabular_export import EXPORT_CHUNK_SIZE, FORMATS, format_error, iter_encoded
+from backend.app.utils import validate_date_format
+from sqlalchemy import func
 import logging
-from datetime import datetime
+import os
+from datetime import datetime, timedelta
 
 bp = Blueprint('payroll_bp', __name__, url_prefix='/payroll')
 
-# Helper function to validate date format
-def validate_date_format(date_str):
-    """
-    Validate date format as YYYY-MM-DD.
-    """
-    try:
-        datetime.strptime(date_str, "%Y-%m-%d")
-        return True
-    except ValueError:
-        return False
-
 # Helper function to calculate payroll for a user
 def calculate_payroll(user):
     """
-    Calculate payroll for a given user based on verified check-ins.
-    """
-    checkins = CheckIn.query.filter(
-        CheckIn.user_id == user.id,
-        CheckIn.is_verified == True
-    ).all()
+    Calculate payroll for a single user from closed work sessions, each day
+    paid at the user's effective PayRate.
 
-    hours_worked = len(checkins) * 8  # Assuming 8 hours per check-in
-    hourly_rate = 15  # Configurable, assuming $15/hour
-    total_pay = hours_worked * hourly_rate
+    Bulk reports use services.payroll_engine.compute_payroll, which covers
+    every user in one query.
+    """
+    earnings = user_earnings(user, None)
 
     return {
         'user_id': user.id,
         'username': user.username,
-        'hours_worked': hours_worked,
-        'pay': total_pay
+        'hours_worked': earnings['hours_worked'],
+        'overtime_hours': earnings['overtime_hours'],
+        'double_time_hours': earnings['double_time_hours'],
+        'pay': earnings['pay']
     }
 
 @bp.route('/', methods=['GET'])
@@ -63,8 +61,11 @@ def generate_payroll():
         if start_date and not end_date:
             return jsonify({"error": "Missing end_date."}), 400
 
-        users = User.query.all()  # This is where the mocker injects the exception.
-        payroll_data = [calculate_payroll(user) for user in users]
+        # Served from the versioned cache until a relevant write; computed
+        # in worker processes when PAYROLL_WORKERS > 1
+        payroll_data = cached_payroll(
+            'payroll', (start_date, end_date), lambda: compute_payroll_sharded(start_date, end_date)
+        )
 
         return jsonify({"payroll_data": payroll_data}), 200
     except Exception as e:
@@ -72,32 +73,268 @@ def generate_payroll():
         return jsonify({"message": "Internal Server Error"}), 500
 
 
+@bp.route('/runs', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def create_payroll_run():
+    """
+    Run (or re-run) payroll for a pay period and persist it as Payroll rows.
+    Only users with new or changed work sessions since the last run are recomputed.
+    Accessible by Admin users only.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        start_date = data.get("start_date")
+        end_date = data.get("end_date")
+
+        if not start_date or not end_date:
+            return jsonify({"error": "start_date and end_date are required."}), 400
+        if not validate_date_format(start_date) or not validate_date_format(end_date):
+            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+        if start_date > end_date:
+            return jsonify({"error": "start_date must not be after end_date."}), 400
+
+        summary = run_payroll(start_date, end_date, full=bool(data.get("full")))
+        db.session.commit()
+
+        return jsonify(summary), 200
+    except Exception as e:
+        db.session.rollback()
+        logging.exception(f"Error running payroll: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+@bp.route('/runs', methods=['GET'])
+@jwt_required()
+@role_required('Admin')
+def get_payroll_runs():
+    """
+    List persisted pay periods, or the stored rows for one period when
+    start_date and end_date are given.
+    Accessible by Admin users only.
+    """
+    try:
+        start_date = request.args.get("start_date")
+        end_date = request.args.get("end_date")
+
+        if start_date or end_date:
+            if not (start_date and end_date and validate_date_format(start_date)
+                    and validate_date_format(end_date)):
+                return jsonify({"error": "start_date and end_date must both be YYYY-MM-DD."}), 400
+            start, end = period_bounds(start_date, end_date)
+            rows = (
+                db.session.query(Payroll, User.username)
+                .join(User, User.id == Payroll.user_id)
+                .filter(Payroll.period_start == start.date(), Payroll.period_end == end.date() - timedelta(days=1))
+                .order_by(Payroll.user_id)
+                .all()
+            )
+            return jsonify({"payroll_data": [
+                {**payroll.serialize(), "username": username} for payroll, username in rows
+            ]}), 200
+
+        periods = (
+            db.session.query(
+                Payroll.period_start,
+                Payroll.period_end,
+                func.count(Payroll.id),
+                func.sum(Payroll.pay),
+                func.max(Payroll.generated_on)
+            )
+            .filter(Payroll.period_start.isnot(None))
+            .group_by(Payroll.period_start, Payroll.period_end)
+            .order_by(Payroll.period_start.desc())
+            .all()
+        )
+        return jsonify({"runs": [
+            {
+                "period_start": period_start.isoformat(),
+                "period_end": period_end.isoformat(),
+                "users": users,
+                "total_pay": round(total_pay or 0.0, 2),
+                "generated_on": generated_on.isoformat() if generated_on else None
+            }
+            for period_start, period_end, users, total_pay, generated_on in periods
+        ]}), 200
+    except Exception as e:
+        logging.exception(f"Error fetching payroll runs: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+def _parse_pay_rate(data, rate=None):
+    """
+    Validate a pay-rate payload (merged over an existing rate when updating).
+    Returns (fields, error message).
+    """
+    fields = {
+        "user_id": rate.user_id if rate else None,
+        "department": rate.department if rate else None,
+        "role": rate.role if rate else None,
+        "hourly_rate": rate.hourly_rate if rate else None,
+        "effective_from": rate.effective_from.isoformat() if rate else None,
+        "effective_to": rate.effective_to.isoformat() if rate and rate.effective_to else None,
+    }
+    fields.update({key: value for key, value in data.items() if key in fields})
+
+    if sum(fields[key] is not None for key in ("user_id", "department", "role")) > 1:
+        return None, "Set at most one of user_id, department or role."
+    if fields["user_id"] is not None and not db.session.get(User, fields["user_id"]):
+        return None, "User not found."
+    try:
+        fields["hourly_rate"] = float(fields["hourly_rate"])
+    except (TypeError, ValueError):
+        return None, "hourly_rate must be a number."
+    if fields["hourly_rate"] < 0:
+        return None, "hourly_rate must not be negative."
+    for key in ("effective_from", "effective_to"):
+        value = fields[key]
+        if value is None:
+            continue
+        if not validate_date_format(value):
+            return None, f"Invalid {key} format. Use YYYY-MM-DD."
+        fields[key] = datetime.strptime(value, "%Y-%m-%d").date()
+    if fields["effective_from"] is None:
+        return None, "effective_from is required."
+    if fields["effective_to"] is not None and fields["effective_to"] < fields["effective_from"]:
+        return None, "effective_to must not be before effective_from."
+
+    overlap = find_overlapping_rate(fields["user_id"], fields["department"], fields["role"],
+                                    fields["effective_from"], fields["effective_to"],
+                                    exclude_id=rate.id if rate else None)
+    if overlap:
+        return None, f"Overlaps pay rate {overlap.id} in the same scope."
+    return fields, None
+
+
+@bp.route('/rates', methods=['GET'])
+@jwt_required()
+@role_required('Admin')
+def get_pay_rates():
+    """
+    List pay rates, optionally filtered by user_id, department or role.
+    Accessible by Admin users only.
+    """
+    try:
+        query = PayRate.query
+        if request.args.get("user_id", type=int) is not None:
+            query = query.filter(PayRate.user_id == request.args.get("user_id", type=int))
+        for key in ("department", "role"):
+            if request.args.get(key):
+                query = query.filter(getattr(PayRate, key) == request.args[key])
+        rates = query.order_by(PayRate.user_id, PayRate.department, PayRate.role, PayRate.effective_from).all()
+        return jsonify([rate.serialize() for rate in rates]), 200
+    except Exception as e:
+        logging.exception(f"Error fetching pay rates: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+@bp.route('/rates', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def create_pay_rate():
+    """
+    Create an effective-dated pay rate for a user, department, role, or (none set)
+    the whole company. Accessible by Admin users only.
+    """
+    try:
+        fields, error = _parse_pay_rate(request.get_json(silent=True) or {})
+        if error:
+            return jsonify({"error": error}), 400
+        rate = PayRate(**fields)
+        db.session.add(rate)
+        db.session.commit()
+        return jsonify(rate.serialize()), 201
+    except Exception as e:
+        db.session.rollback()
+        logging.exception(f"Error creating pay rate: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+@bp.route('/rates/<int:rate_id>', methods=['PUT'])
+@jwt_required()
+@role_required('Admin')
+def update_pay_rate(rate_id):
+    """
+    Update a pay rate. Accessible by Admin users only.
+    """
+    try:
+        rate = db.session.get(PayRate, rate_id)
+        if not rate:
+            return jsonify({"error": "Pay rate not found."}), 404
+        fields, error = _parse_pay_rate(request.get_json(silent=True) or {}, rate)
+        if error:
+            return jsonify({"error": error}), 400
+        for key, value in fields.items():
+            setattr(rate, key, value)
+        db.session.commit()
+        return jsonify(rate.serialize()), 200
+    except Exception as e:
+        db.session.rollback()
+        logging.exception(f"Error updating pay rate: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+@bp.route('/rates/<int:rate_id>', methods=['DELETE'])
+@jwt_required()
+@role_required('Admin')
+def delete_pay_rate(rate_id):
+    """
+    Delete a pay rate. Stored payroll runs are not recomputed automatically;
+    re-run affected periods with full=true. Accessible by Admin users only.
+    """
+    try:
+        rate = db.session.get(PayRate, rate_id)
+        if not rate:
+            return jsonify({"error": "Pay rate not found."}), 404
+        db.session.delete(rate)
+        db.session.commit()
+        return jsonify({"message": "Pay rate deleted."}), 200
+    except Exception as e:
+        db.session.rollback()
+        logging.exception(f"Error deleting pay rate: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
 
 @bp.route('/export', methods=['GET'])
 @jwt_required()
 @role_required('Admin')  # Protect the route
 def export_payroll():
     """
-    Export payroll as an Excel file.
+    Export payroll, optionally for a start_date/end_date period.
+    format: xlsx (default), csv, parquet or arrow.
     Accessible by Admin users only.
     """
     try:
-        users = User.query.all()
-        payroll_data = [calculate_payroll(user) for user in users]
-
-        # Create a Pandas DataFrame
-        df = pd.DataFrame(payroll_data)
+        start_date = request.args.get("start_date")
+        end_date = request.args.get("end_date")
+        fmt = request.args.get("format", "xlsx")
+        if start_date and not validate_date_format(start_date):
+            return jsonify({"error": "Invalid start_date format. Use YYYY-MM-DD."}), 400
+        if end_date and not validate_date_format(end_date):
+            return jsonify({"error": "Invalid end_date format. Use YYYY-MM-DD."}), 400
 
-        # Write the DataFrame to an Excel file in memory
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False, sheet_name='Payroll')
-        output.seek(0)
+        if fmt != "xlsx":
+            error = format_error(fmt)
+            if error:
+                return jsonify({"error": error}), 400
+            # Encoded chunk by chunk straight from the cursor
+            chunks = (
+                [(row['user_id'], row['username'], row['hours_worked'], row['pay']) for row in chunk]
+                for chunk in iter_payroll_chunks(start_date, end_date, chunk_size=EXPORT_CHUNK_SIZE)
+            )
+            response = Response(
+                stream_with_context(iter_encoded(fmt, chunks, PAYROLL_EXPORT_SCHEMA)),
+                mimetype=FORMATS[fmt].mimetype
+            )
+            response.headers['Content-Disposition'] = f'attachment; filename=payroll_report{FORMATS[fmt].extension}'
+            return response
 
-        # Return the Excel file as a downloadable response
-        response = make_response(output.getvalue())
+        # Rows stream from a chunked cursor into a constant-memory workbook on
+        # disk, which is then sent in chunks and removed once the response closes
+        path = write_xlsx(iter_payroll(start_date, end_date), PAYROLL_EXPORT_COLUMNS, sheet_name='Payroll')
+        response = Response(stream_file(path), mimetype=XLSX_MIMETYPE)
         response.headers['Content-Disposition'] = 'attachment; filename=payroll_report.xlsx'
-        response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        response.headers['Content-Length'] = str(os.path.getsize(path))
         return response
     except Exception as e:
         logging.exception(f"Error exporting payroll: {e}")
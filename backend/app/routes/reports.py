@@ -0,0 +1,83 @@
+# backend/app/routes/reports.py
+from flask import Blueprint, Response, current_app, jsonify, request, url_for
+from flask_jwt_extended import jwt_required
+from backend.app.auth import role_required
+from backend.app.services.report_jobs import get_report_jobs
+from backend.app.services.spreadsheet import stream_file
+import logging
+import os
+
+bp = Blueprint('reports_bp', __name__, url_prefix='/reports')
+
+
+def _job_response(job):
+    if job['status'] == 'done':
+        job['download_url'] = url_for('reports_bp.download_report', job_id=job['job_id'])
+    return job
+
+
+@bp.route('/jobs', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def submit_report():
+    """
+    Submit a report job, e.g. {"kind": "payroll_export", "params": {"start_date": ..., "end_date": ...}}.
+    Returns 200 with a cached artifact, or 202 while the report is built.
+    Accessible by Admin users only.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        kind = data.get("kind")
+        params = data.get("params") or {}
+        if not kind:
+            return jsonify({"error": "kind is required."}), 400
+        if not isinstance(params, dict):
+            return jsonify({"error": "params must be an object."}), 400
+
+        try:
+            job = get_report_jobs(current_app._get_current_object()).submit(kind, params)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify(_job_response(job)), 200 if job['status'] == 'done' else 202
+    except Exception as e:
+        logging.exception(f"Error submitting report job: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+@role_required('Admin')
+def get_report_job(job_id):
+    """
+    Poll a report job's status.
+    Accessible by Admin users only.
+    """
+    job = get_report_jobs(current_app._get_current_object()).get(job_id)
+    if job is None:
+        return jsonify({"error": "Report job not found."}), 404
+    return jsonify(_job_response(job)), 200
+
+
+@bp.route('/jobs/<job_id>/download', methods=['GET'])
+@jwt_required()
+@role_required('Admin')
+def download_report(job_id):
+    """
+    Download a finished report from the artifact cache.
+    Accessible by Admin users only.
+    """
+    runner = get_report_jobs(current_app._get_current_object())
+    job = runner.get(job_id)
+    if job is None:
+        return jsonify({"error": "Report job not found."}), 404
+
+    artifact = runner.artifact(job_id)
+    if artifact is None:
+        return jsonify({"error": f"Report is not ready (status: {job['status']})."}), 409
+
+    path, kind = artifact
+    response = Response(stream_file(path, remove=False), mimetype=kind.mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={kind.download_name}'
+    response.headers['Content-Length'] = str(os.path.getsize(path))
+    return response
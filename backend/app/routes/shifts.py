@@ -1,9 +1,13 @@
 # backend/app/routes/shifts.py
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
-from backend.app.models import User, Location, Shift, db
+from datetime import datetime, timezone
+from backend.app.models import User, Location, Shift, ShiftTemplate, db
 from backend.app.auth import role_required
+from backend.app.utils import decode_cursor, encode_cursor
+from backend.app.services.shift_conflicts import find_conflicts, validate_shifts
+from backend.app.services.shift_templates import bulk_create_shifts, template_from_json
+from sqlalchemy import and_, or_, select
 import logging
 
 # Initialize Blueprint
@@ -12,13 +16,86 @@ bp = Blueprint('shifts_bp', __name__, url_prefix='/shifts')
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+# Page sizes for GET /shifts/ (only applied when limit or cursor is given)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Columns read by GET /shifts/, joined with the user and location names
+SHIFT_COLUMNS = (
+    Shift.id, Shift.user_id, User.username, Shift.location_id, Location.name.label('location_name'),
+    Shift.start_time, Shift.end_time, Shift.status, Shift.notes
+)
+
+# Most proposed shifts POST /shifts/validate accepts in one request
+MAX_VALIDATE_SHIFTS = 10000
+
+# Limits for POST /shifts/bulk: range length in days and shifts per request
+MAX_BULK_DAYS = 366
+MAX_BULK_SHIFTS = 250000
+
+
+def serialize_shift_row(row):
+    """Serialize a shift column row (see SHIFT_COLUMNS) like Shift.serialize."""
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "username": row.username,
+        "location_id": row.location_id,
+        "location_name": row.location_name,
+        "start_time": row.start_time.isoformat() if row.start_time else None,
+        "end_time": row.end_time.isoformat() if row.end_time else None,
+        "status": row.status,
+        "notes": row.notes
+    }
+
+
+def serialize_shift_columns(rows):
+    """
+    Serialize shift column rows column by column, with usernames and location
+    names listed once per id rather than on every shift.
+    """
+    columns = {name: [] for name in ('id', 'user_id', 'location_id', 'start_time', 'end_time', 'status', 'notes')}
+    users, locations = {}, {}
+    for row in rows:
+        columns['id'].append(row.id)
+        columns['user_id'].append(row.user_id)
+        columns['location_id'].append(row.location_id)
+        columns['start_time'].append(row.start_time.isoformat() if row.start_time else None)
+        columns['end_time'].append(row.end_time.isoformat() if row.end_time else None)
+        columns['status'].append(row.status)
+        columns['notes'].append(row.notes)
+        users[row.user_id] = row.username
+        locations[row.location_id] = row.location_name
+    return {"columns": columns, "users": users, "locations": locations}
+
+
+def parse_shift_time(value):
+    """Parse an ISO datetime; aware values are converted to naive UTC like stored times."""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
 @bp.route('/', methods=['GET'])
 @jwt_required()
 def get_shifts():
     """
-    Get shifts based on user role.
+    Get shifts based on user role, ordered by start time.
     - Admins can see all shifts or filter by user_id
     - Employees can only see their own shifts
+
+    Query parameters:
+        user_id (int): Optional filter, Admin only
+        start_date, end_date (str): Optional YYYY-MM-DD range of start days (inclusive)
+        limit (int): Page size (max 1000); without limit or cursor every match is returned
+        cursor (str): Value of X-Next-Cursor from the previous page
+        format (str): 'columns' returns {"columns": {name: [values]}, "users":
+            {id: username}, "locations": {id: name}} instead of a list of shifts
+
+    Shifts are read with their username and location name in a single joined
+    column query. When more rows exist the X-Next-Cursor header carries the
+    cursor for the next page.
     """
     try:
         # Get user identity from JWT token
@@ -30,23 +107,21 @@ def get_shifts():
         employee_id = request.args.get('user_id', type=int)
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
-        
-        # Base query
-        query = Shift.query
+        filters = []
         
         # Role-based filtering
         if user_role != 'Admin':
             # Employees can only see their own shifts
-            query = query.filter(Shift.user_id == user_id)
+            filters.append(Shift.user_id == user_id)
         elif employee_id:
             # Admins can filter by employee
-            query = query.filter(Shift.user_id == employee_id)
+            filters.append(Shift.user_id == employee_id)
         
         # Date filtering
         if start_date:
             try:
                 start_date = datetime.strptime(start_date, '%Y-%m-%d')
-                query = query.filter(Shift.start_time >= start_date)
+                filters.append(Shift.start_time >= start_date)
             except ValueError:
                 return jsonify({"error": "Invalid start_date format. Use YYYY-MM-DD."}), 400
                 
@@ -54,17 +129,46 @@ def get_shifts():
             try:
                 end_date = datetime.strptime(end_date, '%Y-%m-%d')
                 end_date = end_date.replace(hour=23, minute=59, second=59)  # End of day
-                query = query.filter(Shift.start_time <= end_date)
+                filters.append(Shift.start_time <= end_date)
             except ValueError:
                 return jsonify({"error": "Invalid end_date format. Use YYYY-MM-DD."}), 400
         
-        # Execute query with order by start_time
-        shifts = query.order_by(Shift.start_time).all()
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_start, cursor_id = decode_cursor(cursor)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            filters.append(or_(
+                Shift.start_time > cursor_start,
+                and_(Shift.start_time == cursor_start, Shift.id > cursor_id)
+            ))
         
-        # Serialize results
-        results = [shift.serialize() for shift in shifts]
+        stmt = (
+            select(*SHIFT_COLUMNS)
+            .outerjoin(User, User.id == Shift.user_id)
+            .outerjoin(Location, Location.id == Shift.location_id)
+            .where(*filters)
+            .order_by(Shift.start_time, Shift.id)
+        )
+        limit = request.args.get('limit', type=int)
+        if limit is None and cursor:
+            limit = DEFAULT_PAGE_SIZE
+        if limit is not None:
+            limit = max(1, min(limit, MAX_PAGE_SIZE))
+            stmt = stmt.limit(limit + 1)
+        rows = db.session.execute(stmt).all()
+        has_more = limit is not None and len(rows) > limit
+        if has_more:
+            rows = rows[:limit]
         
-        return jsonify(results), 200
+        if request.args.get('format') == 'columns':
+            response = jsonify(serialize_shift_columns(rows))
+        else:
+            response = jsonify([serialize_shift_row(row) for row in rows])
+        if has_more:
+            response.headers['X-Next-Cursor'] = encode_cursor(rows[-1].start_time, rows[-1].id)
+        return response, 200
         
     except Exception as e:
         logging.exception(f"Error fetching shifts: {str(e)}")
@@ -91,9 +195,9 @@ def create_shift():
         
         # Parse datetime strings
         try:
-            start_time = datetime.fromisoformat(data['start_time'].replace('Z', '+00:00'))
-            end_time = datetime.fromisoformat(data['end_time'].replace('Z', '+00:00'))
-        except ValueError:
+            start_time = parse_shift_time(data['start_time'])
+            end_time = parse_shift_time(data['end_time'])
+        except (AttributeError, ValueError):
             return jsonify({"error": "Invalid datetime format. Use ISO format."}), 400
         
         # Validate times
@@ -110,6 +214,11 @@ def create_shift():
         if not location:
             return jsonify({"error": "Location not found"}), 404
         
+        # Refuse to double-book the employee
+        conflicts = find_conflicts(user.id, start_time, end_time)
+        if conflicts:
+            return jsonify({"error": "Shift conflicts with existing shifts", "conflicts": conflicts}), 409
+        
         # Create new shift
         new_shift = Shift(
             user_id=data['user_id'],
@@ -165,20 +274,27 @@ def update_shift(shift_id):
             
         if 'start_time' in data:
             try:
-                shift.start_time = datetime.fromisoformat(data['start_time'].replace('Z', '+00:00'))
-            except ValueError:
+                shift.start_time = parse_shift_time(data['start_time'])
+            except (AttributeError, ValueError):
                 return jsonify({"error": "Invalid start_time format. Use ISO format."}), 400
                 
         if 'end_time' in data:
             try:
-                shift.end_time = datetime.fromisoformat(data['end_time'].replace('Z', '+00:00'))
-            except ValueError:
+                shift.end_time = parse_shift_time(data['end_time'])
+            except (AttributeError, ValueError):
                 return jsonify({"error": "Invalid end_time format. Use ISO format."}), 400
                 
         # Validate times
         if shift.start_time >= shift.end_time:
             return jsonify({"error": "End time must be after start time"}), 400
             
+        # Refuse to double-book the employee (the shift itself does not count)
+        with db.session.no_autoflush:
+            conflicts = find_conflicts(shift.user_id, shift.start_time, shift.end_time, exclude=shift.id)
+        if conflicts:
+            db.session.rollback()
+            return jsonify({"error": "Shift conflicts with existing shifts", "conflicts": conflicts}), 409
+            
         if 'status' in data:
             valid_statuses = ['Scheduled', 'Completed', 'Missed']
             if data['status'] not in valid_statuses:
@@ -220,4 +336,170 @@ def delete_shift(shift_id):
     except Exception as e:
         logging.exception(f"Error deleting shift: {str(e)}")
         db.session.rollback()
-        return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@bp.route('/validate', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def validate_shift_batch():
+    """
+    Check proposed shifts without creating them (Admin only).
+
+    Body: {"shifts": [{"user_id", "start_time", "end_time", "location_id"?, "id"?}, ...]}
+    where "id" marks an existing shift being moved.
+
+    Every proposal is checked for a known user and location (when given), a positive
+    duration, overlaps with stored shifts and overlaps with the other
+    proposals, in one pass. Returns {"valid", "checked", "invalid"}, where
+    invalid lists only the proposals with problems, by index.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('shifts')
+        if not isinstance(items, list):
+            return jsonify({"error": "Body must contain a 'shifts' list"}), 400
+        if len(items) > MAX_VALIDATE_SHIFTS:
+            return jsonify({"error": f"At most {MAX_VALIDATE_SHIFTS} shifts per request"}), 400
+
+        proposals = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or any(field not in item for field in ('user_id', 'start_time', 'end_time')):
+                return jsonify({"error": f"Shift {index}: user_id, start_time and end_time are required"}), 400
+            try:
+                shift_id, location_id = item.get('id'), item.get('location_id')
+                proposals.append({
+                    'id': int(shift_id) if shift_id is not None else None,
+                    'user_id': int(item['user_id']),
+                    'location_id': int(location_id) if location_id is not None else None,
+                    'start_time': parse_shift_time(item['start_time']),
+                    'end_time': parse_shift_time(item['end_time']),
+                })
+            except (AttributeError, TypeError, ValueError):
+                return jsonify({"error": f"Shift {index}: invalid id or datetime format. Use ISO format."}), 400
+
+        invalid = validate_shifts(proposals)
+        return jsonify({"valid": not invalid, "checked": len(proposals), "invalid": invalid}), 200
+
+    except Exception as e:
+        logging.exception(f"Error validating shifts: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+
+@bp.route('/templates', methods=['GET'])
+@jwt_required()
+@role_required('Admin')
+def get_templates():
+    """List recurring shift templates (Admin only)"""
+    try:
+        templates = ShiftTemplate.query.order_by(ShiftTemplate.name, ShiftTemplate.id).all()
+        return jsonify([template.serialize() for template in templates]), 200
+    except Exception as e:
+        logging.exception(f"Error fetching shift templates: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@bp.route('/templates', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def create_template():
+    """
+    Create a recurring shift template (Admin only).
+
+    Body: {"name", "location_id", "start_time": "HH:MM", "end_time": "HH:MM",
+    "weekdays"?: ["MO", ...], "interval_weeks"?, "rotation"?: "11110000",
+    "anchor_date"?: "YYYY-MM-DD", "notes"?}
+    """
+    try:
+        try:
+            template = template_from_json(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if not db.session.get(Location, template.location_id):
+            return jsonify({"error": "Location not found"}), 404
+
+        template.created_by = get_jwt_identity().get('id')
+        db.session.add(template)
+        db.session.commit()
+        return jsonify({"message": "Template created successfully", "template": template.serialize()}), 201
+
+    except Exception as e:
+        logging.exception(f"Error creating shift template: {str(e)}")
+        db.session.rollback()
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@role_required('Admin')
+def bulk_schedule():
+    """
+    Schedule a recurring template for many employees at once (Admin only).
+
+    Body: {"template_id" or "template": {...}, "user_ids": [...],
+    "start_date", "end_date" (YYYY-MM-DD, inclusive), "location_id"?,
+    "on_conflict"?: "reject" | "skip", "notes"?}
+
+    The template is expanded for every user over the range and the whole batch
+    is validated (known users and location, overlaps with stored shifts and
+    within the batch) before one bulk insert. With on_conflict "reject" (the
+    default) any problem returns 409 and nothing is written; with "skip" the
+    valid shifts are created and the problems reported.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+
+        if data.get('template_id') is not None:
+            try:
+                template = db.session.get(ShiftTemplate, int(data['template_id']))
+            except (TypeError, ValueError):
+                return jsonify({"error": "template_id must be an integer"}), 400
+            if not template:
+                return jsonify({"error": "Template not found"}), 404
+        elif data.get('template') is not None:
+            try:
+                template = template_from_json(data['template'])
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        else:
+            return jsonify({"error": "Provide template_id or template"}), 400
+
+        user_ids = data.get('user_ids')
+        if not isinstance(user_ids, list) or not user_ids:
+            return jsonify({"error": "user_ids must be a non-empty list"}), 400
+        try:
+            user_ids = [int(user_id) for user_id in user_ids]
+            location_id = int(data['location_id']) if data.get('location_id') is not None else None
+            start_date = datetime.strptime(data.get('start_date'), '%Y-%m-%d').date()
+            end_date = datetime.strptime(data.get('end_date'), '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid user_ids, location_id or dates. Dates use YYYY-MM-DD."}), 400
+        if end_date < start_date:
+            return jsonify({"error": "end_date must not be before start_date"}), 400
+        if (end_date - start_date).days >= MAX_BULK_DAYS:
+            return jsonify({"error": f"At most {MAX_BULK_DAYS} days per request"}), 400
+
+        try:
+            summary = bulk_create_shifts(
+                template, user_ids, start_date, end_date,
+                location_id=location_id,
+                on_conflict=data.get('on_conflict', 'reject'),
+                notes=data.get('notes'),
+                created_by=get_jwt_identity().get('id'),
+                max_shifts=MAX_BULK_SHIFTS
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if summary['created'] == 0 and summary['invalid_count']:
+            db.session.rollback()
+            return jsonify({"error": "Shifts failed validation; nothing was scheduled", **summary}), 409
+
+        db.session.commit()
+        return jsonify({"message": f"{summary['created']} shifts scheduled", **summary}), 201
+
+    except Exception as e:
+        logging.exception(f"Error bulk scheduling shifts: {str(e)}")
+        db.session.rollback()
+        return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,4 @@
+# backend/app/services/__init__.py
+"""
+In-process services shared by the route blueprints (caches, indexes and engines).
+"""
@@ -0,0 +1,143 @@
+# backend/app/services/change_feed.py
+"""
+Change feeds telling the other workers that cached data is out of date.
+
+A worker that commits a change calls ``publish()``; every worker compares
+``current()`` with the token its cache was built from and rebuilds when it
+moves. The token says that something changed, not what.
+
+    redis - pub/sub on <PREFIX>_FEED_CHANNEL when <PREFIX>_FEED_URL is set
+            and redis-py is installed; every message bumps a local counter
+    file  - otherwise a version file (<PREFIX>_FEED_FILE, by default next to
+            a SQLite database or under the instance path) replaced on every
+            change; its stat() is the token
+    local - in-memory SQLite, which no other process can open
+
+Redis pub/sub delivers at most once: a worker disconnected while a change is
+published keeps its cache until the next change or restart. Redis feeds are
+closed by one exit handler, however many apps created them.
+"""
+import atexit
+import logging
+import os
+import uuid
+import weakref
+
+from sqlalchemy.engine import make_url
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+# Redis feeds still subscribed, closed at exit
+_open_feeds = weakref.WeakSet()
+
+
+def shareable_database(database_uri):
+    """Whether separate processes can open the same database."""
+    return not (database_uri.startswith('sqlite') and
+                (database_uri in ('sqlite://', 'sqlite:///') or ':memory:' in database_uri))
+
+
+class LocalChangeFeed:
+    """Feed for a database only this process can open: nothing to tell."""
+
+    def current(self):
+        return None
+
+    def publish(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileChangeFeed:
+    """Version file shared by the workers of one host (or one shared volume)."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def current(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def publish(self):
+        # Replace rather than rewrite, so the inode changes even within one
+        # mtime tick
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as handle:
+            handle.write(uuid.uuid4().hex)
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        pass
+
+
+class RedisChangeFeed:
+    """Redis pub/sub channel; a background thread counts change messages."""
+
+    def __init__(self, url, channel):
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._changes = 0
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: self._on_message})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        _open_feeds.add(self)
+
+    def _on_message(self, message):
+        self._changes += 1
+
+    def current(self):
+        return self._changes
+
+    def publish(self):
+        self._client.publish(self.channel, os.getpid())
+
+    def close(self):
+        _open_feeds.discard(self)
+        self._thread.stop()
+        self._pubsub.close()
+
+
+def make_change_feed(app, prefix, name):
+    """
+    The feed for one kind of change, configured by <prefix>_FEED_URL,
+    <prefix>_FEED_CHANNEL and <prefix>_FEED_FILE.
+
+    Args:
+        app (Flask): The app whose database the feed covers
+        prefix (str): Config key prefix, e.g. 'LOCATION'
+        name (str): Default channel ("<name>:changed") and file name
+    """
+    url = app.config.get(f'{prefix}_FEED_URL')
+    if url:
+        if redis is not None:
+            return RedisChangeFeed(url, app.config.get(f'{prefix}_FEED_CHANNEL') or f'{name}:changed')
+        logging.warning(f"{prefix}_FEED_URL is set but redis is not installed; using the version file")
+    elif not shareable_database(app.config['SQLALCHEMY_DATABASE_URI']):
+        return LocalChangeFeed()
+    path = app.config.get(f'{prefix}_FEED_FILE')
+    if not path:
+        url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        if url.get_backend_name() == 'sqlite':
+            # Every worker sharing a SQLite file runs on the host that has it
+            path = f"{os.path.abspath(url.database)}.{name}-version"
+        else:
+            path = os.path.join(app.instance_path, f'{name}_feed.version')
+    return FileChangeFeed(path)
+
+
+@atexit.register
+def _close_feeds():
+    for feed in list(_open_feeds):
+        try:
+            feed.close()
+        except Exception:
+            logging.exception("Could not close change feed")
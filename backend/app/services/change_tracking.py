@@ -0,0 +1,133 @@
+# backend/app/services/change_tracking.py
+"""
+One set of SQLAlchemy session listeners that tells the in-memory caches what
+a transaction wrote.
+
+Each cache registers a ``ChangeTracker`` for the tables it is built from.
+While the transaction runs, the tracker collects that cache's share of the
+writes into a dict kept in ``session.info``:
+
+    collect - after every flush, for each new, dirty or deleted ORM object of
+              a tracked table
+    bulk    - for INSERT/UPDATE/DELETE statements on a tracked table run
+              through the session, which never reach the unit of work
+
+Once the writes are final the collected dict is handed to ``apply`` (inside
+an app context): after the commit, or with ``after='flush'`` right after the
+flush that produced it, for state maintained in the same transaction. A
+rollback drops it, calling ``discard`` first if given. Writes that bypass the
+session (raw engine connections) are not seen.
+"""
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+BULK_WRITES = ('insert', 'update', 'delete')
+
+_trackers = []
+
+
+def _mark_changed(changes, *args):
+    changes['changed'] = True
+
+
+def _mark_all(changes, *args):
+    changes['all'] = True
+
+
+class ChangeTracker:
+    """
+    One cache's view of the session's writes.
+
+    Args:
+        name (str): session.info key of the collected changes
+        tables (iterable): Names of the tables the cache is built from
+        apply (callable): apply(changes) with the collected dict
+        collect (callable): collect(changes, session, obj) per flushed object;
+            by default sets changes['changed']
+        bulk (callable): bulk(changes, orm_execute_state, table) per bulk
+            statement; by default sets changes['all']
+        bulk_kinds (tuple): Bulk statements that count ('insert', 'update', 'delete')
+        discard (callable): discard(changes) on rollback
+        after (str): 'commit' or 'flush'
+    """
+
+    def __init__(self, name, tables, apply, collect=None, bulk=None, bulk_kinds=BULK_WRITES,
+                 discard=None, after='commit'):
+        if after not in ('commit', 'flush'):
+            raise ValueError("after must be 'commit' or 'flush'")
+        self.key = f'changes:{name}'
+        self.tables = frozenset(tables)
+        self.apply = apply
+        self.collect = collect or _mark_changed
+        self.bulk = bulk or _mark_all
+        self.bulk_kinds = frozenset(bulk_kinds)
+        self.discard = discard
+        self.after = after
+
+    def changes(self, session):
+        """The changes collected so far in session's transaction, for writers outside the listeners."""
+        return session.info.setdefault(self.key, {})
+
+    def hand_over(self, session):
+        changes = session.info.pop(self.key, None)
+        if changes and has_app_context():
+            self.apply(changes)
+
+    def drop(self, session):
+        changes = session.info.pop(self.key, None)
+        if changes and self.discard is not None and has_app_context():
+            self.discard(changes)
+
+
+def track_changes(name, tables, apply, **options):
+    """Register a ChangeTracker (see its arguments) and return it."""
+    tracker = ChangeTracker(name, tables, apply, **options)
+    _trackers.append(tracker)
+    return tracker
+
+
+@event.listens_for(Session, 'after_flush')
+def _after_flush(session, flush_context):
+    objects = [(getattr(obj, '__tablename__', None), obj) for obj in (*session.new, *session.dirty, *session.deleted)]
+    for tracker in _trackers:
+        for table, obj in objects:
+            if table in tracker.tables:
+                tracker.collect(tracker.changes(session), session, obj)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _on_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert:
+        kind = 'insert'
+    elif orm_execute_state.is_update:
+        kind = 'update'
+    elif orm_execute_state.is_delete:
+        kind = 'delete'
+    else:
+        return
+    # ORM statements carry an annotated copy of the table: compare names
+    table = getattr(getattr(orm_execute_state.statement, 'table', None), 'name', None)
+    for tracker in _trackers:
+        if table in tracker.tables and kind in tracker.bulk_kinds:
+            tracker.bulk(tracker.changes(orm_execute_state.session), orm_execute_state, table)
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _after_flush_postexec(session, flush_context):
+    for tracker in _trackers:
+        if tracker.after == 'flush':
+            tracker.hand_over(session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session):
+    for tracker in _trackers:
+        if tracker.after == 'commit':
+            tracker.hand_over(session)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _after_rollback(session):
+    for tracker in _trackers:
+        tracker.drop(session)
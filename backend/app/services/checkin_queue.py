@@ -0,0 +1,450 @@
+# backend/app/services/checkin_queue.py
+"""
+Write-behind queue for verified check-ins.
+
+When ``CHECKIN_WRITE_BEHIND`` is enabled, check_in_out hands verified punches
+to a bounded in-process queue instead of committing them itself. A background
+worker drains the queue and writes punches in group commits, flushing when a
+batch reaches ``CHECKIN_QUEUE_BATCH_SIZE`` rows or ``CHECKIN_QUEUE_FLUSH_INTERVAL``
+seconds have passed since its first row, whichever comes first.
+
+Durability (``CHECKIN_QUEUE_DURABILITY``):
+    memory  - acknowledged punches live only in memory until flushed
+    journal - punches are appended to a journal file before acknowledging,
+              so they survive a process crash and are replayed on startup
+    fsync   - like journal, but fsync'd on every append to survive power loss
+
+Every process needs a journal of its own, since replay and compaction rewrite
+the file. A queue holds an exclusive lock on its journal for as long as it
+runs and refuses to start on one another process holds. Without
+``CHECKIN_QUEUE_JOURNAL_PATH`` each worker claims the first free numbered
+slot in the instance folder (checkin_queue.0.journal, .1, ...), so a restarted
+worker picks up the slot, and any punches, a crashed one left behind; slots
+nobody claimed are replayed by the next worker to start.
+
+A batch that still fails after its retries is appended to the journal's
+``.failed`` dead-letter file for an operator to inspect and re-submit, so the
+journal can keep compacting past it.
+"""
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no advisory locks (Windows)
+    fcntl = None
+
+from backend.app.extensions import db
+from backend.app.models import CheckIn
+from backend.app.services.work_sessions import record_punches
+
+DURABILITY_MODES = ('memory', 'journal', 'fsync')
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 0.2
+DEFAULT_PUT_TIMEOUT = 0.05
+
+
+class QueueFullError(Exception):
+    """Raised when the queue stays full for longer than the put timeout."""
+
+
+def _lock_journal(path):
+    """
+    Take an exclusive, non-blocking lock on a journal (through its .lock file).
+
+    Returns:
+        file: The open lock file, to be closed to release the lock; None when
+        another process holds it.
+    """
+    lock = open(path + '.lock', 'a')
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return None
+    return lock
+
+
+class CheckInWriteBehindQueue:
+    """
+    Bounded queue of check-in rows flushed by a background worker.
+
+    Args:
+        app (Flask): Application whose database the rows are written to.
+        max_size (int): Queue capacity; submit() applies backpressure beyond it.
+        batch_size (int): Rows per group commit.
+        flush_interval (float): Max seconds a row waits before its batch is flushed.
+        durability (str): One of DURABILITY_MODES.
+        journal_path (str): Journal file used by the journal/fsync modes.
+        put_timeout (float): Seconds submit() waits for room before giving up.
+        journal_lock (file): Lock already taken on journal_path (see _lock_journal).
+    """
+
+    def __init__(self, app, max_size=DEFAULT_MAX_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, durability='journal',
+                 journal_path=None, put_timeout=DEFAULT_PUT_TIMEOUT, journal_lock=None):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of: {', '.join(DURABILITY_MODES)}")
+        if durability != 'memory' and not journal_path:
+            raise ValueError("journal_path is required for journal durability")
+
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.journal_path = journal_path
+        self.put_timeout = put_timeout
+
+        self._queue = queue.Queue(maxsize=max_size)
+        self._submit_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._journal = None
+        self._journal_lock = journal_lock
+        self._seq = 0
+        # Highest seq below the first failed batch not yet dead-lettered, if any
+        self._failed_floor = None
+        self._undead = []  # Failed batches whose dead-letter write failed
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'enqueued': 0,
+            'rejected': 0,
+            'flushed': 0,
+            'flushes': 0,
+            'failed_flushes': 0,
+            'last_flush_ms': None,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+            'failed_rows': 0,
+            'dead_lettered': 0,
+            'last_error': None,
+        }
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self):
+        """Replay any journaled punches, then start the background worker."""
+        if self.durability != 'memory':
+            if self._journal_lock is None:
+                self._journal_lock = _lock_journal(self.journal_path)
+                if self._journal_lock is None:
+                    raise RuntimeError(
+                        f"Check-in journal {self.journal_path} is in use by another process; "
+                        "give each worker its own CHECKIN_QUEUE_JOURNAL_PATH"
+                    )
+            self._replay_journal(self.journal_path)
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name='checkin-write-behind', daemon=True)
+        self._thread.start()
+        logging.info(f"Check-in write-behind queue started (durability={self.durability})")
+
+    def stop(self, timeout=5.0):
+        """Stop the worker and flush whatever is still queued."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.flush()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+        if self._journal_lock:
+            self._journal_lock.close()
+            self._journal_lock = None
+
+    def adopt_journal(self, path):
+        """
+        Replay another journal if no running process holds it, e.g. the slot of
+        a worker that crashed and was not replaced.
+
+        Returns:
+            bool: Whether the journal was free and has been replayed.
+        """
+        lock = _lock_journal(path)
+        if lock is None:
+            return False
+        try:
+            self._replay_journal(path)
+        finally:
+            lock.close()
+        return True
+
+    # ------------------------------------------------------------------ producer side
+
+    def submit(self, row):
+        """
+        Queue a verified check-in row for writing.
+
+        Args:
+            row (dict): Column values for the checkins table (timestamp included).
+
+        Raises:
+            QueueFullError: If the queue is still full after put_timeout seconds.
+        """
+        with self._submit_lock:
+            self._seq += 1
+            try:
+                self._queue.put((self._seq, row), timeout=self.put_timeout)
+            except queue.Full:
+                self._seq -= 1
+                with self._metrics_lock:
+                    self._metrics['rejected'] += 1
+                raise QueueFullError("Check-in queue is full")
+            if self._journal:
+                self._journal.write(json.dumps({'seq': self._seq, 'row': _encode_row(row)}) + '\n')
+                self._journal.flush()
+                if self.durability == 'fsync':
+                    os.fsync(self._journal.fileno())
+        with self._metrics_lock:
+            self._metrics['enqueued'] += 1
+
+    def metrics(self):
+        """Return a snapshot of queue depth and flush statistics."""
+        with self._metrics_lock:
+            snapshot = dict(self._metrics)
+        flushes = snapshot.pop('flushes')
+        total = snapshot.pop('total_flush_ms')
+        snapshot.update({
+            'depth': self._queue.qsize(),
+            'capacity': self._queue.maxsize,
+            'durability': self.durability,
+            'flushes': flushes,
+            'avg_flush_ms': round(total / flushes, 3) if flushes else None,
+        })
+        return snapshot
+
+    # ------------------------------------------------------------------ consumer side
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+
+    def flush(self):
+        """Synchronously write everything queued so far, including batches in flight."""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                break
+            self._write_batch(batch)
+        self._queue.join()
+
+    def _write_batch(self, batch, attempts=3):
+        rows = [row for _, row in batch]
+        with self._flush_lock:
+            for attempt in range(1, attempts + 1):
+                started = time.perf_counter()
+                try:
+                    with self.app.app_context():
+                        record_punches(rows)
+                        db.session.commit()
+                    break
+                except Exception as e:
+                    with self.app.app_context():
+                        db.session.rollback()
+                    with self._metrics_lock:
+                        self._metrics['failed_flushes'] += 1
+                        self._metrics['last_error'] = str(e)
+                    logging.exception(f"Check-in group commit failed (attempt {attempt}/{attempts}): {e}")
+                    if attempt == attempts:
+                        with self._metrics_lock:
+                            self._metrics['failed_rows'] += len(rows)
+                        self._done(batch)
+                        if self._journal:
+                            # Until the rows reach the dead-letter file they stay in the
+                            # journal, and the journal does not compact past them
+                            self._undead.append(batch)
+                            if self._failed_floor is None:
+                                self._failed_floor = batch[0][0] - 1
+                            self._checkpoint(batch[-1][0])
+                        return
+                    time.sleep(0.05 * attempt)
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._metrics_lock:
+                self._metrics['flushed'] += len(rows)
+                self._metrics['flushes'] += 1
+                self._metrics['last_flush_ms'] = round(elapsed_ms, 3)
+                self._metrics['total_flush_ms'] += elapsed_ms
+                self._metrics['max_flush_ms'] = max(self._metrics['max_flush_ms'], round(elapsed_ms, 3))
+                self._metrics['last_error'] = None
+
+            self._done(batch)
+            if self._journal:
+                self._checkpoint(batch[-1][0])
+
+    def _done(self, batch):
+        for _ in batch:
+            self._queue.task_done()
+
+    # ------------------------------------------------------------------ journal
+
+    @property
+    def _checkpoint_path(self):
+        return self.journal_path + '.checkpoint'
+
+    @property
+    def _dead_letter_path(self):
+        return self.journal_path + '.failed'
+
+    def _dead_letter(self):
+        """Move failed batches to the dead-letter file; clears the failed floor once all are written."""
+        try:
+            with open(self._dead_letter_path, 'a', encoding='utf-8') as fh:
+                while self._undead:
+                    batch = self._undead[0]
+                    fh.write(''.join(json.dumps({'seq': seq, 'row': _encode_row(row)}) + '\n'
+                                     for seq, row in batch))
+                    fh.flush()
+                    if self.durability == 'fsync':
+                        os.fsync(fh.fileno())
+                    self._undead.pop(0)
+                    with self._metrics_lock:
+                        self._metrics['dead_lettered'] += len(batch)
+                    logging.error(f"{len(batch)} check-ins could not be written; "
+                                  f"saved to {self._dead_letter_path}")
+        except OSError as e:
+            logging.exception(f"Could not write the check-in dead-letter file: {e}")
+        if not self._undead:
+            self._failed_floor = None
+
+    def _checkpoint(self, seq):
+        """Record that every journaled punch up to seq is committed; compact when idle."""
+        if self._undead:
+            self._dead_letter()
+        if self._failed_floor is not None:
+            seq = min(seq, self._failed_floor)
+        with self._submit_lock:
+            if self._failed_floor is None and self._queue.unfinished_tasks == 0:
+                self._journal.truncate(0)
+                self._journal.seek(0)
+                if os.path.exists(self._checkpoint_path):
+                    os.remove(self._checkpoint_path)
+                return
+        with open(self._checkpoint_path, 'w', encoding='utf-8') as fh:
+            fh.write(str(seq))
+
+    def _replay_journal(self, path):
+        """Write journaled punches that were acknowledged but never committed."""
+        if not os.path.exists(path):
+            return
+        checkpoint_path = path + '.checkpoint'
+        committed = 0
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding='utf-8') as fh:
+                committed = int(fh.read().strip() or 0)
+
+        pending = []
+        with open(path, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn final write
+                if entry['seq'] > committed:
+                    pending.append(_decode_row(entry['row']))
+
+        if pending:
+            with self.app.app_context():
+                # A crash between commit and checkpoint can leave committed rows in
+                # the journal; skip any punch that is already stored.
+                fresh = [
+                    row for row in pending
+                    if not db.session.query(CheckIn.id).filter_by(
+                        user_id=row['user_id'], location_id=row['location_id'],
+                        timestamp=row['timestamp'], check_type=row['check_type']
+                    ).first()
+                ]
+                if fresh:
+                    record_punches(fresh)
+                    db.session.commit()
+            logging.info(f"Replayed {len(pending)} journaled check-ins from {path} ({len(fresh)} new)")
+
+        open(path, 'w').close()
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+
+def _encode_row(row):
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+
+
+def _decode_row(row):
+    row = dict(row)
+    row['timestamp'] = datetime.fromisoformat(row['timestamp'])
+    return row
+
+
+def _claim_journal_slot(directory):
+    """Lock the first numbered journal slot in directory no other process holds."""
+    slot = 0
+    while True:
+        path = os.path.join(directory, f'checkin_queue.{slot}.journal')
+        lock = _lock_journal(path)
+        if lock is not None:
+            return path, lock
+        slot += 1
+
+
+def init_checkin_queue(app):
+    """Create and start the write-behind queue if the app enables it."""
+    if not app.config.get('CHECKIN_WRITE_BEHIND'):
+        return None
+    durability = app.config.get('CHECKIN_QUEUE_DURABILITY', 'journal')
+    journal_path = app.config.get('CHECKIN_QUEUE_JOURNAL_PATH')
+    journal_lock = None
+    slots = []
+    if durability != 'memory' and not journal_path:
+        os.makedirs(app.instance_path, exist_ok=True)
+        journal_path, journal_lock = _claim_journal_slot(app.instance_path)
+        slots = glob.glob(os.path.join(app.instance_path, 'checkin_queue.*.journal'))
+
+    checkin_queue = CheckInWriteBehindQueue(
+        app,
+        max_size=app.config.get('CHECKIN_QUEUE_MAX_SIZE', DEFAULT_MAX_SIZE),
+        batch_size=app.config.get('CHECKIN_QUEUE_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+        flush_interval=app.config.get('CHECKIN_QUEUE_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL),
+        durability=durability,
+        journal_path=journal_path,
+        put_timeout=app.config.get('CHECKIN_QUEUE_PUT_TIMEOUT', DEFAULT_PUT_TIMEOUT),
+        journal_lock=journal_lock,
+    )
+    checkin_queue.start()
+    for slot in sorted(slots):
+        if slot != journal_path:
+            checkin_queue.adopt_journal(slot)
+    app.extensions['checkin_queue'] = checkin_queue
+    return checkin_queue
+
+
+def get_checkin_queue(app):
+    """Return the app's write-behind queue, or None when write-behind is off."""
+    return app.extensions.get('checkin_queue')
@@ -0,0 +1,209 @@
+# backend/app/services/dashboard.py
+"""
+Sections of the employee dashboard, shared by the individual /dashboard
+endpoints and the one-round-trip /dashboard/bootstrap.
+
+Every section is a plain function of the user's id (and the few user
+attributes it needs), so the bootstrap can load the user once and run the
+independent sections side by side. ``run_sections`` uses a per-app thread
+pool; each task gets its own app context and therefore its own database
+session. Databases that separate connections cannot share (in-memory
+SQLite) are served serially.
+
+``SECTION_MAX_AGE`` is how long, in seconds, a client may reuse a section
+before asking again; the endpoints send it as Cache-Control.
+"""
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select
+
+from backend.app.extensions import db
+from backend.app.models import Payroll, User
+from backend.app.services.change_feed import shareable_database
+from backend.app.services.geofence import get_geofence_index
+from backend.app.services.pay_rates import get_rate_table
+from backend.app.services.recent_activity import recent_checkins
+from backend.app.services.rollups import get_year_rollups
+from backend.app.services.schedule import month_view
+
+SECTIONS = ('employee', 'earnings', 'activity', 'schedule', 'locations')
+
+SECTION_MAX_AGE = {
+    'employee': 300,
+    'earnings': 60,
+    'activity': 0,     # Changes with every check-in
+    'schedule': 0,     # Revalidated with its ETag (see services/schedule.py)
+    'locations': 300,
+}
+
+DEFAULT_BOOTSTRAP_WORKERS = 4
+
+
+def cache_control(*sections):
+    """Cache-Control value for a response made of the given sections."""
+    max_age = min(SECTION_MAX_AGE[section] for section in sections)
+    return f"private, max-age={max_age}" if max_age else "private, no-cache"
+
+
+def employee_section(user):
+    """Profile card for a loaded User."""
+    # Get manager information if available
+    manager = None
+    if hasattr(user, 'manager_id') and user.manager_id:
+        manager = db.session.get(User, user.manager_id)
+
+    return {
+        "name": user.username,
+        "role": user.role,
+        "employeeId": f"EMP{user.id:05d}",
+        "department": getattr(user, 'department', 'General'),
+        "joinDate": getattr(user, 'created_at', datetime.now()).isoformat(),
+        "manager": manager.username if manager else "No Manager Assigned"
+    }
+
+
+def earnings_section(user_id, department, role):
+    """Current month and year-to-date earnings. May commit refreshed rollups."""
+    today = datetime.now().date()
+
+    # Month and year-to-date totals from the user's monthly rollups: one
+    # primary-key range read, however long the user's history is. The pay
+    # period is assumed to be the current month.
+    rollups = get_year_rollups(user_id, today.year)
+    this_month = next((row for row in rollups if row.month == date(today.year, today.month, 1)), None)
+    hours_this_period = this_month.hours_worked if this_month else 0.0
+    overtime_hours = this_month.overtime_hours if this_month else 0.0
+    double_time_hours = this_month.double_time_hours if this_month else 0.0
+    current_pay = this_month.pay if this_month else 0.0
+    ytd_earnings = round(sum(row.pay for row in rollups), 2)
+    hourly_rate = get_rate_table().rate_for(user_id, department, role, today)
+    if db.session.dirty:
+        db.session.commit()  # Persist stale rollups refreshed by the read
+
+    # Last paycheck: the most recent persisted payroll run that has ended
+    last_paycheck = db.session.scalar(
+        select(Payroll.pay)
+        .where(Payroll.user_id == user_id, Payroll.period_end < today)
+        .order_by(Payroll.period_end.desc())
+        .limit(1)
+    ) or 0.0
+
+    # Calculate next payday (15th or last day of month)
+    if today.day < 15:
+        next_payday = datetime(today.year, today.month, 15)
+    else:
+        # Last day of current month
+        if today.month == 12:
+            next_payday = datetime(today.year + 1, 1, 15)
+        else:
+            next_payday = datetime(today.year, today.month + 1, 15)
+
+    return {
+        "currentPay": current_pay,
+        "ytdEarnings": ytd_earnings,
+        "lastPaycheck": last_paycheck,
+        "nextPayday": next_payday.strftime("%Y-%m-%d"),
+        "hourlyRate": hourly_rate,
+        "hoursThisPeriod": hours_this_period,
+        "overtimeHours": overtime_hours,
+        "doubleTimeHours": double_time_hours
+    }
+
+
+def activity_section(user_id, limit):
+    """Newest check-ins, padded with the payroll entry."""
+    # Recent check-ins from the user's ring buffer (one joined query to seed it)
+    activity_data = recent_checkins(user_id, limit)
+
+    # Add mock payroll activity if needed
+    if len(activity_data) < limit:
+        # Add recent payroll activity (mock)
+        last_payday = datetime.now() - timedelta(days=3)
+        activity_data.append({
+            "id": f"payroll-{user_id}",
+            "type": "payroll",
+            "time": last_payday.isoformat(),
+            "description": "Paycheck processed: $1,225.37"
+        })
+    return activity_data
+
+
+def schedule_section(user_id, year, month):
+    """Day-by-day schedule for a month, from the user's shifts."""
+    return month_view(user_id, year, month).days
+
+
+def locations_section():
+    """Every location, as /locations/ lists them, from the cached geofence index."""
+    return [
+        {'id': site.id, 'name': site.name, 'latitude': site.latitude,
+         'longitude': site.longitude, 'radius': site.radius}
+        for site in get_geofence_index().sites()
+    ]
+
+
+_pool_lock = threading.Lock()
+
+
+def _get_pool(app):
+    pool = app.extensions.get('dashboard_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get('dashboard_pool')
+            if pool is None:
+                pool = ThreadPoolExecutor(
+                    max_workers=app.config.get('DASHBOARD_BOOTSTRAP_WORKERS', DEFAULT_BOOTSTRAP_WORKERS),
+                    thread_name_prefix='dashboard'
+                )
+                app.extensions['dashboard_pool'] = pool
+                atexit.register(pool.shutdown, wait=False)
+    return pool
+
+
+def _run_in_app(app, fn, args):
+    with app.app_context():
+        return fn(*args)
+
+
+def _run_here(fn, args):
+    try:
+        return fn(*args)
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def run_sections(tasks, local=()):
+    """
+    Run independent dashboard sections.
+
+    Args:
+        tasks (dict): section name -> (function, args)
+        local (iterable): sections to run on the calling thread, because their
+            arguments are bound to its session (a loaded User)
+
+    Returns:
+        tuple: (results, errors), each a dict keyed by section name. A section
+        that raises is logged and reported in errors; the others still return.
+    """
+    app = current_app._get_current_object()
+    workers = app.config.get('DASHBOARD_BOOTSTRAP_WORKERS', DEFAULT_BOOTSTRAP_WORKERS)
+    pooled = [name for name in tasks if name not in local]
+    futures = {}
+    if len(pooled) > 1 and workers > 1 and shareable_database(app.config['SQLALCHEMY_DATABASE_URI']):
+        pool = _get_pool(app)
+        futures = {name: pool.submit(_run_in_app, app, *tasks[name]) for name in pooled}
+
+    results, errors = {}, {}
+    for name, (fn, args) in tasks.items():
+        try:
+            results[name] = futures[name].result() if name in futures else _run_here(fn, args)
+        except Exception as e:
+            logging.exception(f"Error building dashboard section {name}: {str(e)}")
+            errors[name] = "Internal server error"
+    return results, errors
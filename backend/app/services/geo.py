@@ -0,0 +1,143 @@
+# backend/app/services/geo.py
+"""
+Vectorized geodesic distance kernels.
+
+All array functions broadcast with NumPy rules, so the same call handles one
+point against one site, many points against one site, or (via
+``distance_matrix_km``) every point against every site.
+"""
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# WGS-84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+
+VINCENTY_TOLERANCE = 1e-12
+VINCENTY_MAX_ITER = 200
+
+
+def haversine_scalar_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, without NumPy call overhead."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in kilometers on a spherical Earth.
+
+    Args:
+        lat1, lon1, lat2, lon2 (array_like): Coordinates in degrees.
+
+    Returns:
+        numpy.ndarray: Distances, broadcast over the inputs.
+    """
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def vincenty_km(lat1, lon1, lat2, lon2):
+    """
+    Ellipsoidal (WGS-84) distance in kilometers using Vincenty's inverse formula.
+
+    Agrees with geopy's geodesic to well under a millimeter for everything but
+    near-antipodal pairs, where the iteration does not converge and the
+    haversine distance is returned instead.
+
+    Args:
+        lat1, lon1, lat2, lon2 (array_like): Coordinates in degrees.
+
+    Returns:
+        numpy.ndarray: Distances, broadcast over the inputs.
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lat1, lon1, lat2, lon2))
+    )
+    f = WGS84_F
+    L = np.radians(lon2 - lon1)
+    U1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    U2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    sinU1, cosU1 = np.sin(U1), np.cos(U1)
+    sinU2, cosU2 = np.sin(U2), np.cos(U2)
+
+    lam = L
+    converged = np.zeros(L.shape, dtype=bool)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(VINCENTY_MAX_ITER):
+            sinLam, cosLam = np.sin(lam), np.cos(lam)
+            sinSigma = np.hypot(cosU2 * sinLam, cosU1 * sinU2 - sinU1 * cosU2 * cosLam)
+            cosSigma = sinU1 * sinU2 + cosU1 * cosU2 * cosLam
+            sigma = np.arctan2(sinSigma, cosSigma)
+            sinAlpha = np.where(sinSigma == 0, 0.0, cosU1 * cosU2 * sinLam / sinSigma)
+            cos2Alpha = 1 - sinAlpha ** 2
+            # Equatorial lines have cos2Alpha == 0
+            cos2SigmaM = np.where(cos2Alpha == 0, 0.0, cosSigma - 2 * sinU1 * sinU2 / cos2Alpha)
+            C = f / 16 * cos2Alpha * (4 + f * (4 - 3 * cos2Alpha))
+            lam_prev = lam
+            lam = L + (1 - C) * f * sinAlpha * (
+                sigma + C * sinSigma * (cos2SigmaM + C * cosSigma * (-1 + 2 * cos2SigmaM ** 2))
+            )
+            converged = np.abs(lam - lam_prev) < VINCENTY_TOLERANCE
+            if converged.all():
+                break
+
+        uSq = cos2Alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+        A = 1 + uSq / 16384 * (4096 + uSq * (-768 + uSq * (320 - 175 * uSq)))
+        B = uSq / 1024 * (256 + uSq * (-128 + uSq * (74 - 47 * uSq)))
+        deltaSigma = B * sinSigma * (cos2SigmaM + B / 4 * (
+            cosSigma * (-1 + 2 * cos2SigmaM ** 2)
+            - B / 6 * cos2SigmaM * (-3 + 4 * sinSigma ** 2) * (-3 + 4 * cos2SigmaM ** 2)
+        ))
+        distance = WGS84_B * A * (sigma - deltaSigma) / 1000.0
+
+    if not converged.all():
+        distance = np.where(converged, distance, haversine_km(lat1, lon1, lat2, lon2))
+    return distance
+
+
+METHODS = {
+    'haversine': haversine_km,
+    'vincenty': vincenty_km,
+}
+
+
+def distance_matrix_km(points, sites, method='haversine'):
+    """
+    Distance from every point to every site.
+
+    Args:
+        points (array_like): Shape (n, 2) array of (latitude, longitude).
+        sites (array_like): Shape (m, 2) array of (latitude, longitude).
+        method (str): 'haversine' or 'vincenty'.
+
+    Returns:
+        numpy.ndarray: Shape (n, m) distance matrix in kilometers.
+    """
+    kernel = METHODS[method]
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    sites = np.asarray(sites, dtype=np.float64).reshape(-1, 2)
+    return kernel(points[:, 0:1], points[:, 1:2], sites[:, 0], sites[:, 1])
+
+
+def within_radius(lat, lon, site_lat, site_lon, radius_km, method='haversine'):
+    """
+    Pairwise geofence check, one site per point.
+
+    Returns:
+        tuple: (distances_km, inside_mask) as NumPy arrays.
+    """
+    distances = METHODS[method](lat, lon, site_lat, site_lon)
+    return distances, distances <= np.asarray(radius_km, dtype=np.float64)
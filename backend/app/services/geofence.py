@@ -0,0 +1,223 @@
+# backend/app/services/geofence.py
+"""
+In-process spatial index over Location geofences.
+
+The index buckets every geofence into the cells of a uniform lat/lon grid that
+its bounding box overlaps. Resolving a raw (latitude, longitude) therefore only
+looks at the handful of sites registered in one grid cell, prefilters them by
+bounding box and runs the exact distance check on whatever is left.
+"""
+import logging
+import math
+import threading
+from collections import defaultdict, namedtuple
+
+import numpy as np
+from flask import current_app
+
+from backend.app.models import Location
+from backend.app.services.change_tracking import track_changes
+from backend.app.services.geo import haversine_km, haversine_scalar_km, within_radius
+from backend.app.services.location_snapshot import location_version
+
+KM_PER_DEGREE_LAT = 111.32
+
+# Grid cell edge in degrees (~5.5 km of latitude)
+DEFAULT_CELL_SIZE_DEG = 0.05
+
+GeofenceSite = namedtuple('GeofenceSite', ['id', 'name', 'latitude', 'longitude', 'radius'])
+
+_index_lock = threading.Lock()
+
+
+def _bounding_box(latitude, longitude, radius_km):
+    """Return (min_lat, max_lat, min_lon, max_lon) enclosing a circle of radius_km."""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(latitude))
+    # Near the poles a degree of longitude collapses, so cover the full circle
+    dlon = 180.0 if cos_lat < 1e-6 else min(180.0, radius_km / (KM_PER_DEGREE_LAT * cos_lat))
+    return latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon
+
+
+class GeofenceIndex:
+    """
+    Uniform-grid index of geofence sites.
+
+    Args:
+        sites (iterable): GeofenceSite tuples to index.
+        cell_size (float): Grid cell edge in degrees.
+    """
+
+    def __init__(self, sites=(), cell_size=DEFAULT_CELL_SIZE_DEG):
+        self.cell_size = cell_size
+        self.version = None          # location_version() it was built at
+        self._sites = {}
+        self._boxes = {}
+        self._grid = defaultdict(list)
+        self._arrays = None
+        for site in sites:
+            self._add(site)
+
+    @classmethod
+    def from_locations(cls, locations, cell_size=DEFAULT_CELL_SIZE_DEG):
+        """Build an index from Location rows."""
+        return cls(
+            (GeofenceSite(loc.id, loc.name, loc.latitude, loc.longitude, loc.radius or 0.0)
+             for loc in locations),
+            cell_size=cell_size
+        )
+
+    def __len__(self):
+        return len(self._sites)
+
+    def _cell(self, latitude, longitude):
+        return int(math.floor(latitude / self.cell_size)), int(math.floor(longitude / self.cell_size))
+
+    def _add(self, site):
+        box = _bounding_box(site.latitude, site.longitude, site.radius)
+        self._sites[site.id] = site
+        self._boxes[site.id] = box
+        min_row, min_col = self._cell(box[0], box[2])
+        max_row, max_col = self._cell(box[1], box[3])
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                self._grid[(row, col)].append(site.id)
+
+    def arrays(self):
+        """
+        Column arrays of every indexed site, for vectorized bulk checks.
+
+        Returns:
+            tuple: (ids, latitudes, longitudes, radii) NumPy arrays in matching order.
+        """
+        if self._arrays is None:
+            sites = list(self._sites.values())
+            self._arrays = (
+                np.array([s.id for s in sites], dtype=np.int64),
+                np.array([s.latitude for s in sites], dtype=np.float64),
+                np.array([s.longitude for s in sites], dtype=np.float64),
+                np.array([s.radius for s in sites], dtype=np.float64),
+            )
+        return self._arrays
+
+    def sites(self):
+        """Every indexed site, ordered by id."""
+        return sorted(self._sites.values())
+
+    def get(self, location_id):
+        """Return the site registered under location_id, or None."""
+        try:
+            return self._sites.get(int(location_id))
+        except (TypeError, ValueError):
+            return None
+
+    def candidates(self, latitude, longitude):
+        """Return the sites whose bounding box contains the point."""
+        result = []
+        for site_id in self._grid.get(self._cell(latitude, longitude), ()):
+            min_lat, max_lat, min_lon, max_lon = self._boxes[site_id]
+            if min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon:
+                result.append(self._sites[site_id])
+        return result
+
+    def distance_to(self, site, latitude, longitude):
+        """Distance in kilometers between a site center and a point."""
+        return haversine_scalar_km(latitude, longitude, site.latitude, site.longitude)
+
+    def nearest(self, latitude, longitude):
+        """
+        Resolve the nearest geofence whose radius contains the point.
+
+        Returns:
+            tuple: (site, distance_km), or (None, None) if no geofence matches.
+        """
+        best_site, best_distance = None, None
+        for site in self.candidates(latitude, longitude):
+            distance = self.distance_to(site, latitude, longitude)
+            if distance <= site.radius and (best_distance is None or distance < best_distance):
+                best_site, best_distance = site, distance
+        return best_site, best_distance
+
+    def verify_many(self, latitudes, longitudes, location_ids):
+        """
+        Verify many points against the geofences in one vectorized pass.
+
+        Points with a location_id are checked against that site; points whose
+        location_id is None are matched to the nearest geofence containing them.
+
+        Returns:
+            tuple: (resolved_ids, distances_km, inside) NumPy arrays. resolved_ids
+            is -1 where the location_id is unknown or no geofence contains the point.
+        """
+        ids, site_lat, site_lon, radii = self.arrays()
+        lat = np.asarray(latitudes, dtype=np.float64)
+        lon = np.asarray(longitudes, dtype=np.float64)
+        n = len(lat)
+        resolved = np.full(n, -1, dtype=np.int64)
+        distances = np.full(n, np.nan)
+        inside = np.zeros(n, dtype=bool)
+        if n == 0 or len(ids) == 0:
+            return resolved, distances, inside
+
+        column = {int(site_id): col for col, site_id in enumerate(ids)}
+        requested = np.full(n, -2, dtype=np.int64)
+        for i, location_id in enumerate(location_ids):
+            if location_id is not None:
+                site = self.get(location_id)
+                requested[i] = column[site.id] if site else -1
+
+        explicit = np.nonzero(requested >= 0)[0]
+        if len(explicit):
+            cols = requested[explicit]
+            d, ok = within_radius(lat[explicit], lon[explicit], site_lat[cols], site_lon[cols], radii[cols])
+            resolved[explicit] = ids[cols]
+            distances[explicit] = d
+            inside[explicit] = ok
+
+        implicit = np.nonzero(requested == -2)[0]
+        if len(implicit):
+            matrix = haversine_km(lat[implicit, None], lon[implicit, None], site_lat, site_lon)
+            matrix = np.where(matrix <= radii, matrix, np.inf)
+            best = matrix.argmin(axis=1)
+            best_distance = matrix[np.arange(len(implicit)), best]
+            hit = np.isfinite(best_distance)
+            resolved[implicit[hit]] = ids[best[hit]]
+            distances[implicit[hit]] = best_distance[hit]
+            inside[implicit[hit]] = True
+
+        return resolved, distances, inside
+
+
+def get_geofence_index():
+    """
+    Return the geofence index for the current app, building it on first use.
+
+    The index lives in ``app.extensions`` so every app (and every test database)
+    gets its own copy. It is rebuilt once a location write commits, here or in
+    another worker (see services/location_snapshot.py).
+    """
+    extensions = current_app.extensions
+    version = location_version()
+    index = extensions.get('geofence_index')
+    if index is None or index.version != version:
+        with _index_lock:
+            index = extensions.get('geofence_index')
+            if index is None or index.version != version:
+                index = GeofenceIndex.from_locations(
+                    Location.query.all(),
+                    cell_size=current_app.config.get('GEOFENCE_CELL_SIZE_DEG', DEFAULT_CELL_SIZE_DEG)
+                )
+                index.version = version
+                extensions['geofence_index'] = index
+                logging.info(f"Geofence index built with {len(index)} locations")
+    return index
+
+
+def invalidate_geofence_index():
+    """Drop the current app's index so the next lookup rebuilds it."""
+    current_app.extensions.pop('geofence_index', None)
+
+
+# Only committed writes count: an index built from a flushed location would
+# outlive a rollback
+track_changes('geofence', {Location.__tablename__}, lambda changes: invalidate_geofence_index())
@@ -0,0 +1,114 @@
+# backend/app/services/invoices.py
+"""
+Bulk invoicing of contractors from persisted payroll runs.
+
+Closing a period brings its payroll run up to date (services.payroll_engine
+.run_payroll, incremental), then creates every missing contractor invoice
+with one INSERT ... SELECT from the payroll rows, so the cost does not grow
+with one ORM round-trip per invoice. Status changes are single UPDATE
+statements guarded by the allowed transitions.
+"""
+from datetime import datetime
+
+from sqlalchemy import and_, insert, literal, select, update
+
+from backend.app.extensions import db
+from backend.app.models import Invoice, Payroll, User
+from backend.app.services.payroll_engine import run_payroll
+
+INVOICE_STATUSES = ('Pending', 'Approved', 'Paid', 'Void')
+
+# Target status -> statuses an invoice may move from
+STATUS_TRANSITIONS = {
+    'Approved': ('Pending',),
+    'Paid': ('Approved',),
+    'Void': ('Pending', 'Approved'),
+}
+
+DEFAULT_INVOICE_ROLES = ('Contractor',)
+
+
+def generate_invoices(start_date, end_date, roles=DEFAULT_INVOICE_ROLES):
+    """
+    Create a Pending invoice for every user with one of the given roles and
+    positive pay in the period. Users already invoiced for the period are
+    skipped, so closing a period twice is harmless. Does not commit.
+
+    Args:
+        start_date (str): Inclusive period start (YYYY-MM-DD)
+        end_date (str): Inclusive period end (YYYY-MM-DD)
+        roles (iterable): Roles that are invoiced rather than paid by payroll
+
+    Returns:
+        dict: period_start, period_end, created (invoices), payroll (run summary)
+    """
+    summary = run_payroll(start_date, end_date)
+    period_start = datetime.strptime(summary['period_start'], "%Y-%m-%d").date()
+    period_end = datetime.strptime(summary['period_end'], "%Y-%m-%d").date()
+
+    already_invoiced = select(Invoice.id).where(
+        Invoice.user_id == Payroll.user_id,
+        Invoice.period_start == period_start,
+        Invoice.period_end == period_end
+    ).exists()
+    rows = (
+        select(
+            Payroll.user_id,
+            Payroll.pay,
+            literal('Pending'),
+            Payroll.period_start,
+            Payroll.period_end,
+            literal(datetime.utcnow())
+        )
+        .join(User, User.id == Payroll.user_id)
+        .where(
+            User.role.in_(list(roles)),
+            Payroll.period_start == period_start,
+            Payroll.period_end == period_end,
+            Payroll.pay > 0,
+            ~already_invoiced
+        )
+    )
+    result = db.session.execute(
+        insert(Invoice).from_select(
+            ['user_id', 'amount', 'status', 'period_start', 'period_end', 'created_on'], rows
+        )
+    )
+    return {
+        'period_start': summary['period_start'],
+        'period_end': summary['period_end'],
+        'created': result.rowcount,
+        'payroll': summary
+    }
+
+
+def update_invoice_status(status, ids=None, period_start=None, period_end=None):
+    """
+    Move invoices to a new status in one UPDATE. Invoices whose current
+    status does not allow the transition are left untouched. Does not commit.
+
+    Args:
+        status (str): Target status (see STATUS_TRANSITIONS)
+        ids (list): Invoice ids to update; optional
+        period_start, period_end (date): Restrict to one period; optional
+
+    Returns:
+        int: Number of invoices updated
+    """
+    if status not in STATUS_TRANSITIONS:
+        raise ValueError(f"Invalid status '{status}'. Use one of {', '.join(STATUS_TRANSITIONS)}.")
+
+    conditions = [Invoice.status.in_(STATUS_TRANSITIONS[status])]
+    if ids is not None:
+        conditions.append(Invoice.id.in_(ids))
+    if period_start is not None:
+        conditions.append(Invoice.period_start == period_start)
+    if period_end is not None:
+        conditions.append(Invoice.period_end == period_end)
+
+    result = db.session.execute(
+        update(Invoice).where(and_(*conditions)).values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
@@ -0,0 +1,115 @@
+# backend/app/services/location_snapshot.py
+"""
+Versioned snapshot of every location for GET /locations/.
+
+The snapshot holds the serialized JSON body of the location list, as bytes,
+and an ETag of it. It is built with one query the first time it is needed
+and again only after locations change, so the endpoint neither queries nor
+serializes per request and answers If-None-Match with a 304.
+
+Location writes (ORM changes and bulk statements against locations) are
+seen by a change tracker (services/change_tracking.py). When such a
+transaction commits, this worker's snapshot is dropped and the change is published on the LOCATION_FEED
+change feed (services/change_feed.py: Redis pub/sub when LOCATION_FEED_URL
+is set, else a version file), which tells the other workers.
+
+``location_version()`` combines this worker's change counter with the feed's
+token. The snapshot, and the geofence index, remember the version they were
+built from and rebuild when it moves.
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import namedtuple
+
+from flask import current_app
+from sqlalchemy import select
+
+from backend.app.extensions import db
+from backend.app.models import Location
+from backend.app.services.change_feed import make_change_feed
+from backend.app.services.change_tracking import track_changes
+
+LocationSnapshot = namedtuple('LocationSnapshot', ['version', 'etag', 'body', 'count'])
+
+
+class LocationCache:
+    """One app's location snapshot and its change bookkeeping."""
+
+    def __init__(self, feed):
+        self.feed = feed
+        self.changes = 0            # Location commits seen by this worker
+        self.snapshot = None
+        self._lock = threading.Lock()
+
+    def version(self):
+        return self.changes, self.feed.current()
+
+    def changed(self):
+        """A location write committed here: drop the snapshot and tell the other workers."""
+        with self._lock:
+            self.changes += 1
+            self.snapshot = None
+        try:
+            self.feed.publish()
+        except Exception as e:
+            logging.exception(f"Could not publish location change: {str(e)}")
+
+    def get_snapshot(self):
+        version = self.version()
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self.snapshot
+            if snapshot is not None and snapshot.version == self.version():
+                return snapshot
+            version = self.version()
+            snapshot = _build_snapshot(version)
+            # A commit between reading the version and here leaves it stale
+            if self.version() == version:
+                self.snapshot = snapshot
+            return snapshot
+
+
+def _build_snapshot(version):
+    rows = db.session.execute(
+        select(Location.id, Location.name, Location.latitude, Location.longitude, Location.radius)
+        .order_by(Location.id)
+    ).all()
+    body = json.dumps([
+        {'id': row.id, 'name': row.name, 'latitude': row.latitude, 'longitude': row.longitude,
+         'radius': row.radius}
+        for row in rows
+    ], separators=(',', ':')).encode('utf-8')
+    return LocationSnapshot(version, hashlib.sha1(body).hexdigest(), body, len(rows))
+
+
+_cache_lock = threading.Lock()
+
+
+def get_location_cache(app=None):
+    """Return the app's location cache, creating it (and its feed) on first use."""
+    app = app or current_app
+    cache = app.extensions.get('location_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = app.extensions.get('location_cache')
+            if cache is None:
+                cache = LocationCache(make_change_feed(app, 'LOCATION', 'locations'))
+                app.extensions['location_cache'] = cache
+    return cache
+
+
+def get_location_snapshot():
+    """The current app's location snapshot, rebuilt if locations changed anywhere."""
+    return get_location_cache().get_snapshot()
+
+
+def location_version():
+    """Token that changes whenever locations change in this or another worker."""
+    return get_location_cache().version()
+
+
+track_changes('locations', {Location.__tablename__}, lambda changes: get_location_cache().changed())
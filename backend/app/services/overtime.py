@@ -0,0 +1,116 @@
+# backend/app/services/overtime.py
+"""
+Vectorized daily and weekly overtime.
+
+Input is one row per employee-day (hours worked and the rate in effect),
+sorted by employee then day, as NumPy arrays for a whole population. Each day
+is split into regular, overtime and double-time hours:
+
+    daily:  hours beyond ``daily_threshold`` are overtime, hours beyond
+            ``double_threshold`` are double time
+    weekly: regular hours accumulate per ISO week (Monday to Sunday); regular
+            hours beyond ``weekly_threshold`` in that week become overtime
+
+Daily overtime does not count towards the weekly threshold, so no hour is
+paid a premium twice. The per-week running totals are computed with one
+cumulative sum over the whole population, offset per (employee, week) group.
+A threshold of None disables that rule.
+"""
+from collections import namedtuple
+
+import numpy as np
+from flask import current_app
+
+OvertimeRules = namedtuple(
+    'OvertimeRules',
+    'daily_threshold double_threshold weekly_threshold overtime_multiplier double_time_multiplier'
+)
+
+DEFAULT_RULES = OvertimeRules(
+    daily_threshold=8.0,
+    double_threshold=12.0,
+    weekly_threshold=40.0,
+    overtime_multiplier=1.5,
+    double_time_multiplier=2.0
+)
+
+OvertimeResult = namedtuple('OvertimeResult', 'regular overtime double_time pay')
+
+
+def get_overtime_rules():
+    """Overtime rules from the app config (OVERTIME_*), falling back to DEFAULT_RULES."""
+    config = current_app.config
+    return OvertimeRules(
+        daily_threshold=config.get('OVERTIME_DAILY_THRESHOLD', DEFAULT_RULES.daily_threshold),
+        double_threshold=config.get('OVERTIME_DOUBLE_THRESHOLD', DEFAULT_RULES.double_threshold),
+        weekly_threshold=config.get('OVERTIME_WEEKLY_THRESHOLD', DEFAULT_RULES.weekly_threshold),
+        overtime_multiplier=config.get('OVERTIME_MULTIPLIER', DEFAULT_RULES.overtime_multiplier),
+        double_time_multiplier=config.get('OVERTIME_DOUBLE_TIME_MULTIPLIER', DEFAULT_RULES.double_time_multiplier)
+    )
+
+
+def iso_week_start(days):
+    """Monday of the ISO week of each datetime64[D] value."""
+    days = np.asarray(days, dtype='datetime64[D]')
+    # 1970-01-01 was a Thursday, i.e. weekday 3 with Monday as 0
+    weekday = (days.astype(np.int64) + 3) % 7
+    return days - weekday.astype('timedelta64[D]')
+
+
+def _group_cumsum(values, keys_changed):
+    """Running sum of values that restarts wherever keys_changed is True."""
+    totals = np.cumsum(values)
+    starts = np.flatnonzero(keys_changed)
+    offsets = np.concatenate(([0.0], totals))[starts]
+    lengths = np.diff(np.append(starts, len(values)))
+    return totals - np.repeat(offsets, lengths)
+
+
+def apply_overtime(employee, days, hours, rates, rules=DEFAULT_RULES):
+    """
+    Split each employee-day into regular, overtime and double-time hours and pay.
+
+    Args:
+        employee (array): Employee key per row (any integer id)
+        days (array): datetime64[D] (or date-like) per row
+        hours (array): Hours worked per row
+        rates (array): Hourly rate per row
+        rules (OvertimeRules): Thresholds and multipliers
+
+    Rows must be sorted by employee, then day, with at most one row per
+    employee and day.
+
+    Returns:
+        OvertimeResult: Arrays aligned with the input rows
+    """
+    employee = np.asarray(employee)
+    days = np.asarray(days, dtype='datetime64[D]')
+    hours = np.asarray(hours, dtype=np.float64)
+    rates = np.asarray(rates, dtype=np.float64)
+    if not len(hours):
+        empty = np.zeros(0)
+        return OvertimeResult(empty, empty, empty, empty)
+
+    double_time = np.zeros_like(hours)
+    overtime = np.zeros_like(hours)
+    if rules.double_threshold is not None:
+        double_time = np.maximum(hours - rules.double_threshold, 0.0)
+    if rules.daily_threshold is not None:
+        overtime = np.maximum(hours - double_time - rules.daily_threshold, 0.0)
+    regular = hours - overtime - double_time
+
+    if rules.weekly_threshold is not None:
+        weeks = iso_week_start(days)
+        changed = np.ones(len(hours), dtype=bool)
+        changed[1:] = (employee[1:] != employee[:-1]) | (weeks[1:] != weeks[:-1])
+        running = _group_cumsum(regular, changed)
+        before = running - regular
+        weekly = (np.maximum(running - rules.weekly_threshold, 0.0)
+                  - np.maximum(before - rules.weekly_threshold, 0.0))
+        regular = regular - weekly
+        overtime = overtime + weekly
+
+    pay = rates * (regular
+                   + overtime * rules.overtime_multiplier
+                   + double_time * rules.double_time_multiplier)
+    return OvertimeResult(regular, overtime, double_time, pay)
@@ -0,0 +1,190 @@
+# backend/app/services/pay_rates.py
+"""
+Effective-dated pay-rate lookup.
+
+All PayRate rows are loaded once into a ``RateTable``: per scope, the rate
+intervals sorted by start date, so resolving the rate for a user on a given
+day is a bisect per scope (O(log n)) with no query. The table lives in
+``app.extensions`` and is dropped whenever a PayRate row is written here
+(ORM or bulk), and again when that transaction commits or rolls back.
+
+PayRate writes committed by other workers are noticed through the PAYROLL
+change feed (services/payroll_cache.py): when its token moves, the table
+compares ``rate_table_version()`` with the one it was built at and rebuilds
+if the rates changed. A steady state costs no query per lookup.
+"""
+import logging
+import threading
+from bisect import bisect_right
+from datetime import date, datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import func, or_, select
+
+from backend.app.extensions import db
+from backend.app.models import PayRate
+from backend.app.services.change_tracking import track_changes
+from backend.app.services.payroll_cache import get_payroll_cache
+
+# Used when no PayRate row (not even a company default) covers a day
+FALLBACK_HOURLY_RATE = 15.0
+
+_table_lock = threading.Lock()
+
+
+def as_date(value):
+    """Normalize a date, datetime or ISO string (as returned by SQL date()) to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+class RateTable:
+    """Sorted, non-overlapping rate intervals per scope."""
+
+    def __init__(self, rates, fallback=FALLBACK_HOURLY_RATE, version=None, feed_token=None):
+        self.fallback = fallback
+        self.version = version            # rate_table_version() it was built at
+        self.feed_token = feed_token      # PAYROLL feed token it was last checked at
+        grouped = {}
+        for rate in rates:
+            grouped.setdefault(rate.scope, []).append(
+                (rate.effective_from, rate.effective_to, rate.hourly_rate)
+            )
+        self._intervals = {}
+        for scope, intervals in grouped.items():
+            intervals.sort(key=lambda interval: interval[0])
+            self._intervals[scope] = (
+                [start for start, _, _ in intervals],
+                [end for _, end, _ in intervals],
+                [value for _, _, value in intervals],
+            )
+
+    def __len__(self):
+        return sum(len(starts) for starts, _, _ in self._intervals.values())
+
+    def _lookup(self, scope, day):
+        intervals = self._intervals.get(scope)
+        if intervals is None:
+            return None
+        starts, ends, values = intervals
+        i = bisect_right(starts, day) - 1
+        if i >= 0 and (ends[i] is None or day <= ends[i]):
+            return values[i]
+        return None
+
+    def rate_for(self, user_id, department, role, day):
+        """
+        Hourly rate for a user on a day (date, datetime or ISO string).
+        The most specific scope with a rate in effect wins.
+        """
+        if not self._intervals:
+            return self.fallback
+        day = as_date(day)
+        for scope in (('user', user_id), ('department', department), ('role', role)):
+            if scope[1] is not None:
+                value = self._lookup(scope, day)
+                if value is not None:
+                    return value
+        value = self._lookup(('default', None), day)
+        return self.fallback if value is None else value
+
+
+def get_rate_table():
+    """
+    Return the rate table for the current app, building it on first use.
+
+    The table lives in ``app.extensions`` so every app (and every test database)
+    gets its own copy. It is rebuilt when another worker changed the rates.
+    """
+    extensions = current_app.extensions
+    feed = get_payroll_cache().feed
+    table = extensions.get('pay_rate_table')
+    if table is not None and table.feed_token != feed.current():
+        # Payroll data changed somewhere; only a rate change needs a rebuild
+        token = feed.current()
+        if rate_table_version() == table.version:
+            table.feed_token = token
+        elif extensions.get('pay_rate_table') is table:
+            extensions.pop('pay_rate_table', None)
+    table = extensions.get('pay_rate_table')
+    if table is None:
+        with _table_lock:
+            table = extensions.get('pay_rate_table')
+            if table is None:
+                # Token, then version, then rows: a write in between only
+                # triggers another check
+                token = feed.current()
+                version = rate_table_version()
+                table = RateTable(
+                    PayRate.query.all(),
+                    fallback=current_app.config.get('DEFAULT_HOURLY_RATE', FALLBACK_HOURLY_RATE),
+                    version=version,
+                    feed_token=token
+                )
+                extensions['pay_rate_table'] = table
+                logging.info(f"Pay rate table built with {len(table)} rates")
+    return table
+
+
+def invalidate_rate_table():
+    """Drop the current app's rate table so the next lookup rebuilds it."""
+    current_app.extensions.pop('pay_rate_table', None)
+
+
+def rate_table_version():
+    """Cheap aggregate that changes whenever a PayRate row is written, in any process."""
+    return tuple(db.session.execute(select(
+        func.count(PayRate.id), func.max(PayRate.id), func.max(PayRate.updated_at)
+    )).one())
+
+
+def sync_rate_table(version):
+    """
+    Drop the current app's rate table if it was built for another rate version.
+
+    Used by pool workers, which never see the parent's PayRate writes: the
+    parent sends its ``rate_table_version()`` with each task.
+    """
+    table = current_app.extensions.get('pay_rate_table')
+    if table is not None and table.version != version:
+        invalidate_rate_table()
+
+
+def find_overlapping_rate(user_id, department, role, effective_from, effective_to, exclude_id=None):
+    """
+    Return an existing rate in the same scope whose dates overlap the given
+    range, or None. Ranges are inclusive; a None end is open-ended.
+    """
+    query = PayRate.query.filter(
+        PayRate.user_id.is_(None) if user_id is None else PayRate.user_id == user_id,
+        PayRate.department.is_(None) if department is None else PayRate.department == department,
+        PayRate.role.is_(None) if role is None else PayRate.role == role,
+        or_(PayRate.effective_to.is_(None), PayRate.effective_to >= effective_from)
+    )
+    if effective_to is not None:
+        query = query.filter(PayRate.effective_from <= effective_to)
+    if exclude_id is not None:
+        query = query.filter(PayRate.id != exclude_id)
+    return query.first()
+
+
+def _rates_written(changes, *args):
+    """Drop the table as soon as PayRate rows are written."""
+    changes['changed'] = True
+    if has_app_context():
+        invalidate_rate_table()
+
+
+def _transaction_ended(changes):
+    """
+    Drop a table rebuilt inside the transaction: after a rollback it would
+    hold rates that were never committed.
+    """
+    invalidate_rate_table()
+
+
+track_changes('pay_rates', {PayRate.__tablename__}, _transaction_ended,
+              collect=_rates_written, bulk=_rates_written, discard=_transaction_ended)
@@ -0,0 +1,125 @@
+# backend/app/services/payroll_cache.py
+"""
+Versioned cache of computed payroll results.
+
+Every app keeps a data version: a counter bumped whenever a write touches a
+table payroll is computed from (check-ins, work sessions, shifts, pay rates,
+users), plus the token of the PAYROLL_FEED change feed (services/change_feed.py)
+that every such commit is published on, so a write committed by another
+worker moves the version too. Writes are seen by a change tracker
+(services/change_tracking.py): the version is bumped as soon as a flush or a
+bulk statement touches one of those tables, and again after the commit, so a
+result computed from the pre-commit snapshot of another request is never
+served afterwards.
+
+Results are cached under (kind, parameters, data version), so an unchanged
+database is served from memory and any relevant write makes older entries
+unreachable; they age out of the LRU. Writes that bypass the session (raw
+engine connections) are not seen.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+
+from backend.app.models import CheckIn, PayRate, Shift, User, WorkSession
+from backend.app.services.change_feed import LocalChangeFeed, make_change_feed
+from backend.app.services.change_tracking import track_changes
+
+DEFAULT_CACHE_SIZE = 64
+
+# Tables whose writes can change a payroll result
+TRACKED_TABLES = frozenset(model.__tablename__ for model in (CheckIn, WorkSession, Shift, PayRate, User))
+
+
+class PayrollCache:
+    """LRU of payroll results plus the data version they are keyed on."""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE, feed=None):
+        self.max_entries = max_entries
+        self.feed = feed or LocalChangeFeed()
+        self.changes = 0            # Payroll writes seen by this worker
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self):
+        return self.changes, self.feed.current()
+
+    def bump(self):
+        """Advance this worker's data version; cached results become unreachable."""
+        with self._lock:
+            self.changes += 1
+
+    def changed(self):
+        """A payroll write committed here: bump and tell the other workers."""
+        self.bump()
+        try:
+            self.feed.publish()
+        except Exception as e:
+            logging.exception(f"Could not publish payroll change: {str(e)}")
+
+    def get_or_compute(self, kind, params, compute):
+        """
+        Return the cached result for (kind, params) at the current data
+        version, computing and storing it on a miss.
+
+        The version is read before computing, so a write that lands while
+        the result is being computed files it under the old version.
+        """
+        if self.max_entries <= 0:
+            return compute()
+        key = (kind, params, self.version())
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        result = compute()
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {'changes': self.changes, 'entries': len(self._entries),
+                    'hits': self.hits, 'misses': self.misses}
+
+
+_cache_lock = threading.Lock()
+
+
+def get_payroll_cache(app=None):
+    """Return the app's payroll cache, creating it on first use."""
+    app = app or current_app
+    cache = app.extensions.get('payroll_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = app.extensions.get('payroll_cache')
+            if cache is None:
+                cache = PayrollCache(app.config.get('PAYROLL_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+                                     make_change_feed(app, 'PAYROLL', 'payroll'))
+                app.extensions['payroll_cache'] = cache
+    return cache
+
+
+def cached_payroll(kind, params, compute):
+    """get_or_compute on the current app's cache; params must be hashable."""
+    return get_payroll_cache().get_or_compute(kind, params, compute)
+
+
+def _data_changed(changes, *args):
+    changes['changed'] = True
+    if has_app_context():
+        get_payroll_cache().bump()
+
+
+track_changes('payroll', TRACKED_TABLES, lambda changes: get_payroll_cache().changed(),
+              collect=_data_changed, bulk=_data_changed)
@@ -0,0 +1,415 @@
+# backend/app/services/payroll_engine.py
+"""
+Set-based payroll computation.
+
+Every user's hours come from one grouped aggregate over closed work sessions,
+left-joined to users so people with no sessions still get a zero row, and the
+pay-period filters are applied in SQL. Hours are grouped per user and day so
+each day is paid at the rate in effect on it (services.pay_rates), resolved
+in memory rather than with a query per row, and split into regular, overtime
+and double-time hours by the vectorized engine in services.overtime.
+
+``run_payroll`` persists the result per pay period as Payroll rows. Each row
+keeps the newest work_sessions.updated_at it was computed from; a re-run only
+recomputes users with sessions changed after that watermark, plus users who
+have no row yet, so closing a period costs time proportional to the delta.
+"""
+from datetime import datetime, timedelta
+from itertools import islice
+
+import numpy as np
+from sqlalchemy import and_, case, func, select
+
+from backend.app.extensions import db
+from backend.app.models import PayRate, Payroll, User, WorkSession
+from backend.app.services.overtime import apply_overtime, get_overtime_rules
+from backend.app.services.pay_rates import get_rate_table
+from backend.app.services.tabular_export import Column
+
+# Re-check sessions stamped slightly before the watermark, in case a
+# transaction flushed before the last run but committed after it
+WATERMARK_GRACE = timedelta(seconds=60)
+
+# Users per IN (...) list when recomputing a delta
+RECOMPUTE_CHUNK_SIZE = 500
+
+# (key, header) column layout of payroll spreadsheets
+PAYROLL_EXPORT_COLUMNS = [
+    ('user_id', 'user_id'),
+    ('username', 'username'),
+    ('hours_worked', 'hours_worked'),
+    ('pay', 'pay'),
+]
+
+# Typed layout of CSV/Parquet/Arrow payroll exports
+PAYROLL_EXPORT_SCHEMA = [
+    Column('user_id', 'int'),
+    Column('username', 'str'),
+    Column('hours_worked', 'float'),
+    Column('pay', 'float'),
+]
+
+
+def period_bounds(start_date=None, end_date=None):
+    """
+    Convert inclusive YYYY-MM-DD period strings into a half-open datetime range.
+
+    Returns:
+        tuple: (start, end) datetimes, either of which may be None.
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+    end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) if end_date else None
+    return start, end
+
+
+def payroll_hours_query(start=None, end=None, user_ids=None, per_day=True, user_filter=None):
+    """
+    Build the grouped per-user, per-day aggregate for a period:
+    (user_id, username, department, role, work_date, hours_worked, last_updated),
+    ordered by user. Users without sessions get a single row with a NULL
+    work_date. Only closed sessions count towards hours; last_updated covers
+    every session in the period and serves as the payroll watermark.
+
+    With per_day=False there is one row per user and work_date is just the
+    first session's start, which is enough when every day has the same rate.
+    user_filter is an optional extra WHERE clause on users (a payroll shard).
+    """
+    join_condition = [WorkSession.user_id == User.id]
+    if start is not None:
+        join_condition.append(WorkSession.start_time >= start)
+    if end is not None:
+        join_condition.append(WorkSession.start_time < end)
+
+    closed_hours = case((WorkSession.status == 'closed', WorkSession.duration_hours), else_=0.0)
+    if per_day:
+        work_date = func.date(WorkSession.start_time)
+        day_columns = [work_date]
+    else:
+        work_date = func.min(WorkSession.start_time)
+        day_columns = []
+    query = (
+        select(
+            User.id.label('user_id'),
+            User.username,
+            User.department,
+            User.role,
+            work_date.label('work_date'),
+            func.coalesce(func.sum(closed_hours), 0.0).label('hours_worked'),
+            func.max(WorkSession.updated_at).label('last_updated')
+        )
+        .select_from(User)
+        .outerjoin(WorkSession, and_(*join_condition))
+        .group_by(User.id, User.username, User.department, User.role, *day_columns)
+        .order_by(User.id, *day_columns)
+    )
+    if user_ids is not None:
+        query = query.where(User.id.in_(user_ids))
+    if user_filter is not None:
+        query = query.where(user_filter)
+    return query
+
+
+def _pricing(hourly_rate=None):
+    """
+    Resolve how a payroll is priced.
+
+    Returns:
+        tuple: (rate_for, rules, per_day). rate_for(user_id, department, role, day)
+            is a flat rate if given, otherwise the effective-dated rate table;
+            rules are the overtime rules; per_day says whether hours must be
+            grouped per day (rates vary by date or overtime applies).
+    """
+    rules = get_overtime_rules()
+    overtime = any(threshold is not None for threshold in
+                   (rules.daily_threshold, rules.double_threshold, rules.weekly_threshold))
+    if hourly_rate is not None:
+        return (lambda user_id, department, role, day: hourly_rate), rules, overtime
+    table = get_rate_table()
+    return table.rate_for, rules, overtime or len(table) > 0
+
+
+def _query_start(start, rules):
+    """Weekly overtime needs the whole first week: query from its Monday, pay from start."""
+    if start is None or rules.weekly_threshold is None:
+        return start
+    return start - timedelta(days=start.weekday())
+
+
+def _iter_priced(rows, rate_for, rules, pay_from=None, batch_users=1000):
+    """
+    Price per-day rows (ordered by user) in batches of whole users.
+
+    Yields:
+        tuple: (entry dict, last_updated watermark) per user
+    """
+    batch = []
+    users = 0
+    last_user = None
+    for row in rows:
+        if row[0] != last_user:
+            if users >= batch_users:
+                yield from _price_batch(batch, rate_for, rules, pay_from)
+                batch, users = [], 0
+            last_user = row[0]
+            users += 1
+        batch.append(row)
+    if batch:
+        yield from _price_batch(batch, rate_for, rules, pay_from)
+
+
+def _split_days(rows, rate_for, rules):
+    """
+    Price per-day rows (ordered by user) with the overtime engine.
+
+    Returns:
+        tuple: (users, employee, days, hours, split) where users lists
+            [user_id, username, last_updated] and employee indexes into it
+    """
+    users = []  # [user_id, username, last_updated]
+    employee, days, hours, rates = [], [], [], []
+    for user_id, username, department, role, work_date, worked, updated in rows:
+        if not users or users[-1][0] != user_id:
+            users.append([user_id, username, None])
+        if updated is not None and (users[-1][2] is None or updated > users[-1][2]):
+            users[-1][2] = updated
+        if work_date is not None and worked:
+            employee.append(len(users) - 1)
+            days.append(work_date)
+            hours.append(worked)
+            rates.append(rate_for(user_id, department, role, work_date))
+
+    employee = np.asarray(employee, dtype=np.int64)
+    days = np.array(days, dtype='datetime64[D]')
+    hours = np.asarray(hours, dtype=np.float64)
+    return users, employee, days, hours, apply_overtime(employee, days, hours, rates, rules)
+
+
+def _price_batch(rows, rate_for, rules, pay_from):
+    users, employee, days, hours, split = _split_days(rows, rate_for, rules)
+
+    # Days before the period (the start of its first week) only feed weekly totals
+    paid = days >= np.datetime64(pay_from.date()) if pay_from is not None else slice(None)
+
+    def per_user(values):
+        return np.bincount(employee[paid], weights=values[paid], minlength=len(users))
+
+    hours_worked, overtime, double_time, pay = (
+        per_user(hours), per_user(split.overtime), per_user(split.double_time), per_user(split.pay)
+    )
+    for i, (user_id, username, last_updated) in enumerate(users):
+        yield {
+            'user_id': user_id,
+            'username': username,
+            'hours_worked': round(float(hours_worked[i]), 2),
+            'overtime_hours': round(float(overtime[i]), 2),
+            'double_time_hours': round(float(double_time[i]), 2),
+            'pay': round(float(pay[i]), 2)
+        }, last_updated
+
+
+def monthly_earnings(user_ids, start, end):
+    """
+    Hours, overtime and pay per user and calendar month over [start, end),
+    each day at its effective rate. Used to maintain UserMonthlyRollup rows.
+
+    Args:
+        user_ids (list): Users to price
+        start (datetime): First day of the first month
+        end (datetime): Exclusive end (first day of the month after the last)
+
+    Returns:
+        dict: (user_id, month date) -> dict with hours_worked, overtime_hours,
+            double_time_hours, pay and days_worked; months without work are absent
+    """
+    rate_for, rules, _ = _pricing()
+    rows = db.session.execute(payroll_hours_query(_query_start(start, rules), end, user_ids)).all()
+    users, employee, days, hours, split = _split_days(rows, rate_for, rules)
+
+    paid = days >= np.datetime64(start.date())
+    months = days[paid].astype('datetime64[M]')
+    keys, group = np.unique(
+        np.rec.fromarrays([employee[paid], months.astype(np.int64)]), return_inverse=True
+    )
+    totals = [
+        np.bincount(group, weights=values[paid], minlength=len(keys))
+        for values in (hours, split.overtime, split.double_time, split.pay)
+    ]
+    days_worked = np.bincount(group, minlength=len(keys))
+
+    result = {}
+    for i, (user, month) in enumerate(keys.tolist()):
+        month_start = np.datetime64(month, 'M').astype('datetime64[D]').item()
+        result[(users[user][0], month_start)] = {
+            'hours_worked': round(float(totals[0][i]), 2),
+            'overtime_hours': round(float(totals[1][i]), 2),
+            'double_time_hours': round(float(totals[2][i]), 2),
+            'pay': round(float(totals[3][i]), 2),
+            'days_worked': int(days_worked[i])
+        }
+    return result
+
+
+def compute_payroll(start_date=None, end_date=None, hourly_rate=None, user_filter=None):
+    """
+    Compute every user's hours and pay for a period with a single query.
+
+    Args:
+        start_date (str): Inclusive period start (YYYY-MM-DD), optional
+        end_date (str): Inclusive period end (YYYY-MM-DD), optional
+        hourly_rate (float): Flat pay per hour; by default each day is paid
+            at the user's effective PayRate
+        user_filter: Optional WHERE clause restricting the users covered
+
+    Returns:
+        list: One dict per user with user_id, username, hours_worked,
+            overtime_hours, double_time_hours and pay, ordered by user_id
+    """
+    return list(iter_payroll(start_date, end_date, hourly_rate, user_filter=user_filter))
+
+
+def iter_payroll(start_date=None, end_date=None, hourly_rate=None, chunk_size=1000, user_filter=None):
+    """
+    Like compute_payroll, but yields rows from a server-side cursor in chunks
+    of chunk_size so large reports never sit in memory at once.
+    """
+    for chunk in iter_payroll_chunks(start_date, end_date, hourly_rate, chunk_size, user_filter):
+        yield from chunk
+
+
+def iter_payroll_chunks(start_date=None, end_date=None, hourly_rate=None, chunk_size=1000, user_filter=None):
+    """Yield lists of up to chunk_size payroll dicts, streamed from a server-side cursor."""
+    start, end = period_bounds(start_date, end_date)
+    rate_for, rules, per_day = _pricing(hourly_rate)
+    query = payroll_hours_query(
+        _query_start(start, rules), end, per_day=per_day, user_filter=user_filter
+    ).execution_options(
+        stream_results=True, yield_per=chunk_size
+    )
+    result = db.session.execute(query)
+    try:
+        entries = (entry for entry, _ in _iter_priced(result, rate_for, rules, start, chunk_size))
+        while True:
+            chunk = list(islice(entries, chunk_size))
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        result.close()
+
+
+def user_earnings(user, start, end=None, as_of=None):
+    """
+    Hours, overtime and pay for one user over [start, end), each day at its
+    effective rate, plus the user's current hourly rate (as of as_of or now).
+
+    Returns:
+        dict: hours_worked, overtime_hours, double_time_hours, pay, hourly_rate
+    """
+    rate_for, rules, per_day = _pricing()
+    rows = db.session.execute(
+        payroll_hours_query(_query_start(start, rules), end, [user.id], per_day=per_day)
+    ).all()
+    entry, _ = next(_iter_priced(rows, rate_for, rules, start))
+    entry['hourly_rate'] = get_rate_table().rate_for(
+        user.id, user.department, user.role, as_of or datetime.utcnow()
+    )
+    return entry
+
+
+def stale_payroll_users(start, end, existing, sessions_from=None):
+    """
+    Users whose stored payroll for [start, end) is missing or out of date.
+
+    Args:
+        start (datetime): Period start
+        end (datetime): Exclusive period end
+        existing (dict): user_id -> Payroll row already stored for the period
+        sessions_from (datetime): Earliest session that affects the period
+            (the Monday of its first week under weekly overtime); defaults to start
+
+    Returns:
+        set: User ids to recompute
+    """
+    watermarks = [row.source_updated_at for row in existing.values() if row.source_updated_at]
+    changed = select(WorkSession.user_id, func.max(WorkSession.updated_at)).where(
+        WorkSession.start_time >= (sessions_from or start),
+        WorkSession.start_time < end
+    ).group_by(WorkSession.user_id)
+    if watermarks:
+        # Index range scan on updated_at: only sessions touched since the last run
+        changed = changed.where(WorkSession.updated_at > max(watermarks) - WATERMARK_GRACE)
+
+    has_row = select(Payroll.id).where(
+        Payroll.user_id == User.id,
+        Payroll.period_start == start.date(),
+        Payroll.period_end == (end - timedelta(days=1)).date()
+    ).exists()
+
+    stale = set()
+    for user_id, last_updated in db.session.execute(changed):
+        payroll = existing.get(user_id)
+        if payroll is None or payroll.source_updated_at is None or last_updated > payroll.source_updated_at:
+            stale.add(user_id)
+    stale.update(db.session.scalars(select(User.id).where(~has_row)))
+    return stale
+
+
+def run_payroll(start_date, end_date, hourly_rate=None, full=False):
+    """
+    Compute and persist payroll for a pay period. Does not commit.
+
+    Users whose stored row is still current are left untouched. Everybody
+    is recomputed when a PayRate was created or edited after the stored run;
+    pass full=True after deleting rates or bulk rewrites of work_sessions
+    (rebuild_work_sessions).
+
+    Args:
+        start_date (str): Inclusive period start (YYYY-MM-DD)
+        end_date (str): Inclusive period end (YYYY-MM-DD)
+        hourly_rate (float): Flat pay per hour; effective PayRates by default
+        full (bool): Ignore watermarks and recompute every user
+
+    Returns:
+        dict: period_start, period_end, recomputed and unchanged user counts
+    """
+    start, end = period_bounds(start_date, end_date)
+    period_start, period_end = start.date(), (end - timedelta(days=1)).date()
+    existing = {
+        row.user_id: row
+        for row in Payroll.query.filter_by(period_start=period_start, period_end=period_end)
+    }
+
+    rates_changed_at = db.session.scalar(select(func.max(PayRate.updated_at)))
+    if rates_changed_at is not None and existing:
+        full = full or rates_changed_at > min(row.generated_on for row in existing.values())
+
+    rate_for, rules, per_day = _pricing(hourly_rate)
+    query_start = _query_start(start, rules)
+    if full or not existing:
+        batches = [None]
+    else:
+        stale = sorted(stale_payroll_users(start, end, existing, query_start))
+        batches = [stale[i:i + RECOMPUTE_CHUNK_SIZE] for i in range(0, len(stale), RECOMPUTE_CHUNK_SIZE)]
+
+    recomputed = 0
+    now = datetime.utcnow()
+    for user_ids in batches:
+        rows = db.session.execute(payroll_hours_query(query_start, end, user_ids, per_day=per_day))
+        for entry, last_updated in _iter_priced(rows, rate_for, rules, start):
+            payroll = existing.get(entry['user_id'])
+            if payroll is None:
+                payroll = Payroll(user_id=entry['user_id'], period_start=period_start, period_end=period_end)
+                db.session.add(payroll)
+                existing[entry['user_id']] = payroll
+            payroll.hours_worked = entry['hours_worked']
+            payroll.pay = entry['pay']
+            payroll.source_updated_at = last_updated
+            payroll.generated_on = now
+            recomputed += 1
+
+    return {
+        'period_start': period_start.isoformat(),
+        'period_end': period_end.isoformat(),
+        'recomputed': recomputed,
+        'unchanged': len(existing) - recomputed
+    }
@@ -0,0 +1,177 @@
+# backend/app/services/payroll_shards.py
+"""
+Payroll computed in parallel shards of users.
+
+Users are split into shards by department (whole departments, packed so each
+shard has about the same number of users) or by contiguous user id ranges.
+Each shard is computed by ``compute_payroll`` in a spawn-based process pool;
+workers build their own app from the database URI and the parent's pricing
+config, so they query and price only their own users. Each task also carries
+the parent's pay-rate version, so a worker rebuilds its cached rate table
+after a PayRate write instead of pricing with the rates it first loaded. Shard results are each
+ordered by user_id and merged on it, so the output is identical to the serial
+``compute_payroll`` no matter which shard finishes first.
+
+Falls back to computing serially in the request process when only one worker
+is configured, when the database cannot be shared between processes
+(in-memory SQLite), or when the pool breaks.
+"""
+import atexit
+import heapq
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+from sqlalchemy import func, or_, select
+
+from backend.app.extensions import db
+from backend.app.models import User
+from backend.app.services.change_feed import shareable_database
+from backend.app.services.pay_rates import rate_table_version, sync_rate_table
+from backend.app.services.payroll_engine import compute_payroll
+
+SHARD_STRATEGIES = ('department', 'id')
+
+# Shards per worker: a few more shards than workers evens out skewed departments
+SHARDS_PER_WORKER = 2
+
+# Config the workers need to price exactly like the parent
+PRICING_CONFIG_KEYS = (
+    'DEFAULT_HOURLY_RATE',
+    'OVERTIME_DAILY_THRESHOLD',
+    'OVERTIME_DOUBLE_THRESHOLD',
+    'OVERTIME_WEEKLY_THRESHOLD',
+    'OVERTIME_MULTIPLIER',
+    'OVERTIME_DOUBLE_TIME_MULTIPLIER',
+)
+
+
+def plan_shards(count, shard_by='department'):
+    """
+    Split all users into at most count shards.
+
+    Args:
+        count (int): Number of shards wanted
+        shard_by (str): 'department' (whole departments) or 'id' (id ranges)
+
+    Returns:
+        list: Picklable shard descriptors, ('department', (names...)) or
+            ('id', first_id, last_id)
+    """
+    if shard_by not in SHARD_STRATEGIES:
+        raise ValueError(f"Unknown shard strategy '{shard_by}'. Use one of {', '.join(SHARD_STRATEGIES)}.")
+
+    if shard_by == 'id':
+        ids = db.session.scalars(select(User.id).order_by(User.id)).all()
+        size = -(-len(ids) // count) if ids else 0
+        return [('id', ids[i], ids[min(i + size, len(ids)) - 1]) for i in range(0, len(ids), size or 1)]
+
+    sizes = db.session.execute(
+        select(User.department, func.count(User.id)).group_by(User.department)
+    ).all()
+    # Largest department first onto the lightest shard; ties broken by name
+    # so the plan is the same on every run
+    sizes.sort(key=lambda row: (-row[1], row[0] or ''))
+    shards = [[0, []] for _ in range(min(count, len(sizes)))]
+    for department, users in sizes:
+        lightest = min(shards, key=lambda shard: shard[0])
+        lightest[0] += users
+        lightest[1].append(department)
+    return [('department', tuple(departments)) for _, departments in shards]
+
+
+def shard_filter(shard):
+    """WHERE clause on users for a shard descriptor."""
+    if shard[0] == 'id':
+        return User.id.between(shard[1], shard[2])
+    names = [name for name in shard[1] if name is not None]
+    clause = User.department.in_(names)
+    if len(names) < len(shard[1]):
+        clause = or_(clause, User.department.is_(None))
+    return clause
+
+
+# Apps created inside pool workers, keyed by database URI and pricing config
+_worker_apps = {}
+
+
+def _compute_in_worker(database_uri, config, rate_version, start_date, end_date, hourly_rate, shard):
+    from backend.app import create_app
+
+    key = (database_uri, tuple(sorted(config.items())))
+    app = _worker_apps.get(key)
+    if app is None:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri, 'CHECKIN_WRITE_BEHIND': False, **config})
+        _worker_apps[key] = app
+    with app.app_context():
+        sync_rate_table(rate_version)
+        return compute_payroll(start_date, end_date, hourly_rate, user_filter=shard_filter(shard))
+
+
+_pool_lock = threading.Lock()
+
+
+def get_payroll_pool(app, workers):
+    """Return the app's payroll process pool, creating it on first use."""
+    pool = app.extensions.get('payroll_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get('payroll_pool')
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                app.extensions['payroll_pool'] = pool
+                atexit.register(pool.shutdown, wait=False)
+    return pool
+
+
+def shutdown_payroll_pool(app):
+    """Stop the app's payroll workers, if any were started."""
+    pool = app.extensions.pop('payroll_pool', None)
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def compute_payroll_sharded(start_date=None, end_date=None, hourly_rate=None, workers=None, shard_by=None):
+    """
+    compute_payroll, split into shards computed in parallel worker processes.
+
+    Args:
+        start_date (str): Inclusive period start (YYYY-MM-DD), optional
+        end_date (str): Inclusive period end (YYYY-MM-DD), optional
+        hourly_rate (float): Flat pay per hour; effective PayRates by default
+        workers (int): Worker processes (PAYROLL_WORKERS by default); 1 runs serially
+        shard_by (str): 'department' or 'id' (PAYROLL_SHARD_BY by default)
+
+    Returns:
+        list: The same rows as compute_payroll, ordered by user_id
+    """
+    app = current_app._get_current_object()
+    workers = workers or app.config.get('PAYROLL_WORKERS', 1)
+    shard_by = shard_by or app.config.get('PAYROLL_SHARD_BY', 'department')
+    database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if workers <= 1 or not shareable_database(database_uri):
+        return compute_payroll(start_date, end_date, hourly_rate)
+
+    shards = plan_shards(workers * SHARDS_PER_WORKER, shard_by)
+    if len(shards) <= 1:
+        return compute_payroll(start_date, end_date, hourly_rate)
+
+    config = {key: app.config[key] for key in PRICING_CONFIG_KEYS if key in app.config}
+    rate_version = rate_table_version()
+    try:
+        pool = get_payroll_pool(app, workers)
+        futures = [
+            pool.submit(_compute_in_worker, database_uri, config, rate_version,
+                        start_date, end_date, hourly_rate, shard)
+            for shard in shards
+        ]
+        results = [future.result() for future in futures]
+    except BrokenProcessPool:
+        logging.exception("Payroll worker pool broke, computing payroll serially")
+        app.extensions.pop('payroll_pool', None)
+        return compute_payroll(start_date, end_date, hourly_rate)
+
+    return list(heapq.merge(*results, key=lambda entry: entry['user_id']))
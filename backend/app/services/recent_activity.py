@@ -0,0 +1,213 @@
+# backend/app/services/recent_activity.py
+"""
+Per-user ring buffers of recent check-ins for /dashboard/activity/recent.
+
+Each user's buffer holds their newest RECENT_ACTIVITY_SIZE check-ins as
+(timestamp, id, check_type, location_id) tuples, newest first. The first
+read for a user seeds it with one query; check-ins recorded afterwards are
+appended when their transaction commits (a change tracker, see
+services/change_tracking.py), so repeated dashboard loads never touch the
+checkins table. Location names are resolved from the cached geofence index at
+read time.
+
+Buffers are kept for the RECENT_ACTIVITY_USERS most recently seen users.
+Deleting check-ins, or bulk statements against the checkins table, drop the
+affected buffers so the next read reseeds them.
+
+The tracker only sees this worker's commits, so a buffer is also
+reseeded once it is RECENT_ACTIVITY_MAX_AGE seconds old: check-ins recorded
+by other workers show up within that time.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import select
+
+from backend.app.extensions import db
+from backend.app.models import CheckIn, Location
+from backend.app.services.change_tracking import track_changes
+from backend.app.services.geofence import get_geofence_index
+
+RECENT_ACTIVITY_SIZE = 50
+RECENT_ACTIVITY_USERS = 10000
+RECENT_ACTIVITY_MAX_AGE = 30
+
+
+class RecentActivityBuffer:
+    """Bounded per-user buffers of the newest check-ins, newest first."""
+
+    def __init__(self, size=RECENT_ACTIVITY_SIZE, max_users=RECENT_ACTIVITY_USERS,
+                 max_age=RECENT_ACTIVITY_MAX_AGE):
+        self.size = size
+        self.max_users = max_users
+        self.max_age = max_age
+        self._buffers = OrderedDict()   # user_id -> (seeded at, entries)
+        self._lock = threading.Lock()
+        # Bumped by every append/invalidate, so a seed read before a
+        # concurrent write is not stored over it
+        self.writes = 0
+
+    def get(self, user_id, limit):
+        """The user's newest limit entries, or None if the buffer cannot answer."""
+        if limit > self.size:
+            return None
+        with self._lock:
+            buffer = self._buffers.get(user_id)
+            if buffer is None:
+                return None
+            seeded_at, entries = buffer
+            if time.monotonic() - seeded_at >= self.max_age:
+                # Other workers may have recorded check-ins since
+                del self._buffers[user_id]
+                return None
+            self._buffers.move_to_end(user_id)
+            return entries[:limit]
+
+    def seed(self, user_id, entries, writes):
+        """
+        Store a user's newest entries as read from the database, unless a
+        write happened since ``writes`` was read.
+        """
+        with self._lock:
+            if writes != self.writes:
+                return
+            self._buffers[user_id] = (time.monotonic(), sorted(entries, reverse=True)[:self.size])
+            self._buffers.move_to_end(user_id)
+            while len(self._buffers) > self.max_users:
+                self._buffers.popitem(last=False)
+
+    def append(self, user_id, entries):
+        """Add committed check-ins to a user's buffer, if the user has one."""
+        with self._lock:
+            self.writes += 1
+            buffer = self._buffers.get(user_id)
+            if buffer is None:
+                return  # The next read seeds it, new rows included
+            seeded_at, current = buffer
+            entries = sorted(entries, reverse=True)
+            if not current or entries[-1] >= current[0]:
+                merged = entries + current
+            else:
+                # Punches uploaded out of order
+                merged = sorted(current + entries, reverse=True)
+            self._buffers[user_id] = (seeded_at, merged[:self.size])
+
+    def invalidate(self, user_id=None):
+        """Drop one user's buffer, or every buffer."""
+        with self._lock:
+            self.writes += 1
+            if user_id is None:
+                self._buffers.clear()
+            else:
+                self._buffers.pop(user_id, None)
+
+
+_buffer_lock = threading.Lock()
+
+
+def get_recent_activity_buffer(app=None):
+    """Return the app's recent-activity buffers, creating them on first use."""
+    app = app or current_app
+    buffer = app.extensions.get('recent_activity')
+    if buffer is None:
+        with _buffer_lock:
+            buffer = app.extensions.get('recent_activity')
+            if buffer is None:
+                buffer = RecentActivityBuffer(
+                    app.config.get('RECENT_ACTIVITY_SIZE', RECENT_ACTIVITY_SIZE),
+                    app.config.get('RECENT_ACTIVITY_USERS', RECENT_ACTIVITY_USERS),
+                    app.config.get('RECENT_ACTIVITY_MAX_AGE', RECENT_ACTIVITY_MAX_AGE)
+                )
+                app.extensions['recent_activity'] = buffer
+    return buffer
+
+
+def recent_checkins(user_id, limit):
+    """
+    A user's newest check-ins as activity dicts, newest first.
+
+    Served from the ring buffer when possible; otherwise one query joined to
+    locations, which also seeds the buffer.
+    """
+    buffer = get_recent_activity_buffer()
+    entries = buffer.get(user_id, limit)
+    if entries is not None:
+        index = get_geofence_index()
+        names = {}
+        for _, _, _, location_id in entries:
+            if location_id not in names:
+                site = index.get(location_id)
+                names[location_id] = site.name if site else "Unknown Location"
+        return [_activity(entry, names[entry[3]]) for entry in entries]
+
+    writes = buffer.writes
+    rows = db.session.execute(
+        select(CheckIn.timestamp, CheckIn.id, CheckIn.check_type, CheckIn.location_id, Location.name)
+        .outerjoin(Location, Location.id == CheckIn.location_id)
+        .where(CheckIn.user_id == user_id)
+        .order_by(CheckIn.timestamp.desc(), CheckIn.id.desc())
+        .limit(max(limit, buffer.size))
+    ).all()
+    if limit <= buffer.size:
+        buffer.seed(user_id, [tuple(row[:4]) for row in rows], writes)
+    return [_activity(row[:4], row[4] or "Unknown Location") for row in rows[:limit]]
+
+
+def _activity(entry, location_name):
+    timestamp, checkin_id, check_type, _ = entry
+    return {
+        "id": checkin_id,
+        "type": "check-out" if check_type == 'out' else "check-in",
+        "time": timestamp.isoformat(),
+        "location": location_name
+    }
+
+
+def note_checkins(rows, ids=None, session=None):
+    """
+    Queue bulk-inserted check-in rows (column dicts) for the buffers on commit.
+    Without their ids the affected users' buffers are dropped instead.
+    """
+    changes = _tracker.changes(session or db.session)
+    if ids is None:
+        changes.setdefault('invalidate', set()).update(row['user_id'] for row in rows)
+        return
+    pending = changes.setdefault('append', {})
+    for row, checkin_id in zip(rows, ids):
+        pending.setdefault(row['user_id'], []).append(
+            (row['timestamp'], checkin_id, row.get('check_type', 'in'), row.get('location_id'))
+        )
+
+
+def _collect_changes(changes, session, obj):
+    if obj not in session.new:
+        changes.setdefault('invalidate', set()).add(obj.user_id)
+        return
+    timestamp = obj.__dict__.get('timestamp')
+    if timestamp is None:
+        # Server-side default: reseed instead of guessing the value
+        changes.setdefault('invalidate', set()).add(obj.user_id)
+    else:
+        changes.setdefault('append', {}).setdefault(obj.user_id, []).append(
+            (timestamp, obj.id, obj.check_type, obj.location_id)
+        )
+
+
+def _apply_changes(changes):
+    buffer = get_recent_activity_buffer()
+    if changes.get('all'):
+        buffer.invalidate()
+        return
+    invalidated = changes.get('invalidate', set())
+    for user_id in invalidated:
+        buffer.invalidate(user_id)
+    for user_id, entries in changes.get('append', {}).items():
+        if user_id not in invalidated:
+            buffer.append(user_id, entries)
+
+
+# Bulk inserts report their rows through note_checkins
+_tracker = track_changes('recent_activity', {CheckIn.__tablename__}, _apply_changes,
+                         collect=_collect_changes, bulk_kinds=('update', 'delete'))
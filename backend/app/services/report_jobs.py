@@ -0,0 +1,379 @@
+# backend/app/services/report_jobs.py
+"""
+Background report jobs with a content-addressed artifact cache.
+
+Submitting a report returns a job id straight away; the report is built in an
+executor (a process pool by default) and written into the cache directory
+under a key derived from the report kind, its parameters and a fingerprint of
+the data it reads. Submitting the same parameters again while the data is
+unchanged returns the cached artifact without building anything, and
+identical jobs already in flight in this worker are shared.
+
+Job records (id, content key, status) are JSON files under
+``<cache dir>/jobs``, so a poll or download can land on any worker sharing
+the cache directory; downloads resolve the artifact from the job's content
+key. Records age out with the artifacts, and an artifact is kept for as long
+as a finished job still points at it.
+
+Executors (``REPORT_JOB_EXECUTOR``):
+    process - a spawn-based process pool; workers build their own app from
+              the database URI and pricing config, so the request worker is
+              never blocked
+    thread  - a thread pool inside this process
+    serial  - build inline on submit (tests, single-process tools)
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+import multiprocessing
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from backend.app.extensions import db
+from backend.app.models import User, WorkSession
+from backend.app.services.pay_rates import rate_table_version, sync_rate_table
+from backend.app.services.payroll_engine import PAYROLL_EXPORT_COLUMNS, iter_payroll
+from backend.app.services.payroll_shards import PRICING_CONFIG_KEYS
+from backend.app.services.spreadsheet import XLSX_MIMETYPE, write_xlsx
+
+EXECUTORS = ('process', 'thread', 'serial')
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_CACHE_MAX_AGE = 7 * 24 * 3600        # Seconds an unused artifact or job record is kept
+PRUNE_INTERVAL = 3600                        # Seconds between cache sweeps
+
+JOB_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+ReportKind = namedtuple('ReportKind', 'validate fingerprint build extension mimetype download_name')
+
+
+def _validate_period(params):
+    for field in ('start_date', 'end_date'):
+        value = params.get(field)
+        if value is not None:
+            try:
+                datetime.strptime(value, "%Y-%m-%d")
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid {field} format. Use YYYY-MM-DD.")
+    unknown = set(params) - {'start_date', 'end_date'}
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+
+
+def payroll_data_fingerprint():
+    """
+    Cheap aggregate that changes whenever payroll inputs change: work sessions,
+    pay rates, the role and department each user's rate is resolved by, and
+    the pricing config.
+    """
+    sessions = db.session.execute(select(
+        func.count(WorkSession.id), func.max(WorkSession.id), func.max(WorkSession.updated_at)
+    )).one()
+    rates = rate_table_version()
+    # users has no updated_at, so digest the columns pricing depends on
+    users = hashlib.sha256(json.dumps(
+        [list(row) for row in db.session.execute(select(User.id, User.role, User.department).order_by(User.id))]
+    ).encode('utf-8')).hexdigest()
+    config = json.dumps({key: current_app.config.get(key) for key in PRICING_CONFIG_KEYS}, sort_keys=True)
+    return f"{tuple(sessions)}|{tuple(rates)}|{users}|{config}"
+
+
+def _build_payroll_export(params, path):
+    write_xlsx(iter_payroll(params.get('start_date'), params.get('end_date')),
+               PAYROLL_EXPORT_COLUMNS, sheet_name='Payroll', path=path)
+
+
+REPORT_KINDS = {
+    'payroll_export': ReportKind(
+        validate=_validate_period,
+        fingerprint=payroll_data_fingerprint,
+        build=_build_payroll_export,
+        extension='.xlsx',
+        mimetype=XLSX_MIMETYPE,
+        download_name='payroll_report.xlsx'
+    ),
+}
+
+
+def cache_key(kind, params, fingerprint):
+    """Content address of a report: kind, canonical parameters and data fingerprint."""
+    payload = json.dumps([kind, params, fingerprint], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def build_report(kind, params, path):
+    """Build a report into path atomically (write to a temp name, then rename)."""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        REPORT_KINDS[kind].build(params, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+# Apps created inside pool workers, keyed by database URI and pricing config
+_worker_apps = {}
+
+
+def _build_in_worker(kind, params, path, database_uri, config, rate_version):
+    from backend.app import create_app
+
+    key = (database_uri, tuple(sorted(config.items())))
+    app = _worker_apps.get(key)
+    if app is None:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri, 'CHECKIN_WRITE_BEHIND': False, **config})
+        _worker_apps[key] = app
+    with app.app_context():
+        sync_rate_table(rate_version)
+        return build_report(kind, params, path)
+
+
+def _build_in_app(app, kind, params, path):
+    with app.app_context():
+        return build_report(kind, params, path)
+
+
+class _SerialExecutor:
+    """Executor stand-in that runs the call immediately."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class ReportJobRunner:
+    """Tracks report jobs and the artifact cache for one app."""
+
+    def __init__(self, app, executor='process', max_workers=DEFAULT_MAX_WORKERS, cache_dir=None,
+                 cache_max_age=DEFAULT_CACHE_MAX_AGE):
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown report executor '{executor}'. Use one of {', '.join(EXECUTORS)}.")
+        self.app = app
+        self.executor_kind = executor
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir or os.path.join(app.instance_path, 'report_cache')
+        self.jobs_dir = os.path.join(self.cache_dir, 'jobs')
+        self.cache_max_age = cache_max_age
+
+        self._executor = None
+        self._inflight = {}          # cache key -> job built by this worker
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_kind == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            elif self.executor_kind == 'thread':
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='report-job')
+            else:
+                self._executor = _SerialExecutor()
+        return self._executor
+
+    def artifact_path(self, kind, key):
+        return os.path.join(self.cache_dir, key[:2], key + REPORT_KINDS[kind].extension)
+
+    def _record_path(self, job_id):
+        return os.path.join(self.jobs_dir, job_id + '.json')
+
+    def _save(self, job):
+        """Write a job record atomically, so readers in other workers never see half of it."""
+        path = self._record_path(job['id'])
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as handle:
+            json.dump(job, handle)
+        os.replace(tmp_path, path)
+
+    def _load(self, job_id):
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        try:
+            with open(self._record_path(job_id)) as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def submit(self, kind, params=None):
+        """
+        Submit a report. Must be called inside an app context.
+
+        Returns:
+            dict: The job's public state (see ``get``)
+
+        Raises:
+            ValueError: Unknown kind or invalid parameters
+        """
+        if kind not in REPORT_KINDS:
+            raise ValueError(f"Unknown report kind '{kind}'.")
+        params = dict(params or {})
+        REPORT_KINDS[kind].validate(params)
+
+        self._maybe_prune()
+        key = cache_key(kind, params, REPORT_KINDS[kind].fingerprint())
+        path = self.artifact_path(kind, key)
+
+        with self._lock:
+            if key in self._inflight:
+                return self._public(self._inflight[key])
+
+            job = {
+                'id': uuid.uuid4().hex,
+                'kind': kind,
+                'params': params,
+                'key': key,
+                'status': 'running',
+                'cached': False,
+                'error': None,
+                'created_at': datetime.utcnow().isoformat(),
+                'finished_at': None
+            }
+
+            if os.path.exists(path):
+                os.utime(path)  # Keep hot artifacts clear of pruning
+                job.update(status='done', cached=True, finished_at=job['created_at'])
+                self._save(job)
+                return self._public(job)
+
+            self._save(job)
+            self._inflight[key] = job
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.executor_kind == 'process':
+            config = {key: self.app.config[key] for key in PRICING_CONFIG_KEYS if key in self.app.config}
+            args = (_build_in_worker, kind, params, path, self.app.config['SQLALCHEMY_DATABASE_URI'],
+                    config, rate_table_version())
+        else:
+            args = (_build_in_app, self.app, kind, params, path)
+        future = self._get_executor().submit(*args)
+        future.add_done_callback(lambda f, job=job: self._finish(job, f))
+        return self.get(job['id'])
+
+    def _finish(self, job, future):
+        with self._lock:
+            self._inflight.pop(job['key'], None)
+            error = future.exception()
+            if error is not None:
+                logging.error(f"Report job {job['id']} ({job['kind']}) failed: {error}")
+                job.update(status='failed', error=str(error))
+            else:
+                job['status'] = 'done'
+            job['finished_at'] = datetime.utcnow().isoformat()
+            try:
+                self._save(job)
+            except OSError as e:
+                logging.error(f"Could not record report job {job['id']}: {e}")
+
+    @staticmethod
+    def _public(job):
+        return {
+            'job_id': job['id'],
+            'kind': job['kind'],
+            'params': job['params'],
+            'status': job['status'],
+            'cached': job['cached'],
+            'error': job['error'],
+            'created_at': job['created_at'],
+            'finished_at': job['finished_at']
+        }
+
+    def get(self, job_id):
+        """Public state of a job, or None if it is unknown."""
+        job = self._load(job_id)
+        return self._public(job) if job else None
+
+    def artifact(self, job_id):
+        """(path, ReportKind) of a finished job's artifact, or None if not available."""
+        job = self._load(job_id)
+        if job is None or job['status'] != 'done':
+            return None
+        path = self.artifact_path(job['kind'], job['key'])
+        if not os.path.exists(path):
+            return None
+        return path, REPORT_KINDS[job['kind']]
+
+    def _maybe_prune(self):
+        now = time.time()
+        if now - self._last_prune < PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        self.prune(now - self.cache_max_age)
+
+    def prune(self, cutoff):
+        """
+        Remove job records and artifacts last touched before cutoff (a
+        timestamp), keeping every artifact a remaining finished job points at.
+        """
+        referenced = set()
+        for name in os.listdir(self.jobs_dir):
+            path = os.path.join(self.jobs_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            job = self._load(name[:-len('.json')]) if name.endswith('.json') else None
+            if job is not None and job['status'] == 'done':
+                referenced.add(self.artifact_path(job['kind'], job['key']))
+
+        for root, _, files in os.walk(self.cache_dir):
+            if root == self.jobs_dir:
+                continue
+            for name in files:
+                path = os.path.join(root, name)
+                if path in referenced:
+                    continue
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+    def shutdown(self, wait=False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_runner_lock = threading.Lock()
+
+
+def get_report_jobs(app):
+    """Return the app's report job runner, creating it on first use."""
+    runner = app.extensions.get('report_jobs')
+    if runner is None:
+        with _runner_lock:
+            runner = app.extensions.get('report_jobs')
+            if runner is None:
+                runner = ReportJobRunner(
+                    app,
+                    executor=app.config.get('REPORT_JOB_EXECUTOR', 'process'),
+                    max_workers=app.config.get('REPORT_JOB_WORKERS', DEFAULT_MAX_WORKERS),
+                    cache_dir=app.config.get('REPORT_CACHE_DIR'),
+                    cache_max_age=app.config.get('REPORT_CACHE_MAX_AGE', DEFAULT_CACHE_MAX_AGE),
+                )
+                app.extensions['report_jobs'] = runner
+                atexit.register(runner.shutdown)
+    return runner
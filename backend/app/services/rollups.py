@@ -0,0 +1,235 @@
+# backend/app/services/rollups.py
+"""
+Per-user monthly earnings rollups (UserMonthlyRollup), maintained at write time.
+
+A change tracker (services/change_tracking.py) records the (user, month) of
+every work session written through the ORM and of verified check-ins added
+through the ORM; right after the flush the touched months are recomputed from that user's sessions for
+that month only (the payroll engine's per-day pricing with overtime) and
+check-in counters are incremented. ``record_punches`` reports the check-ins
+it bulk-inserts with ``count_checkins``, which counts them straight away. The
+cost of a write never depends on how much history the user has, and
+dashboards read a year of totals by primary key.
+
+Rows are written with one upsert per batch, and counters are added in SQL
+(``checkins = checkins + n``), so concurrent transactions neither lose
+increments nor collide inserting the same month.
+
+A rate change, a role or department change, or a bulk rewrite of
+work_sessions marks the affected rollups stale instead; stale rows are
+recomputed on the next read (``get_year_rollups``). ``rebuild_rollups``
+backfills everything from scratch.
+"""
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import delete, event, func, inspect, insert, select, tuple_, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from backend.app.extensions import db
+from backend.app.models import CheckIn, PayRate, User, UserMonthlyRollup, WorkSession
+from backend.app.services.change_tracking import track_changes
+from backend.app.services.payroll_engine import RECOMPUTE_CHUNK_SIZE, monthly_earnings
+
+_TOTALS = ('days_worked', 'hours_worked', 'overtime_hours', 'double_time_hours', 'pay')
+
+
+def month_start(value):
+    """First day of the month of a date or datetime."""
+    return date(value.year, value.month, 1)
+
+
+def next_month(month):
+    """First day of the month after month."""
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def count_checkins(rows):
+    """Add bulk-inserted check-in rows (column dicts) to their rollups. Does not commit."""
+    counts = Counter()
+    for row in rows:
+        if row.get('is_verified', True):
+            counts[(row['user_id'], month_start(row['timestamp']))] += 1
+    update_rollups(checkins=counts)
+
+
+def _upsert(rows, overwrite=(), add=()):
+    """
+    Insert rollup rows; where the (user_id, month) row exists, overwrite the
+    overwrite columns and add the add columns to it instead, in one statement.
+    """
+    table = UserMonthlyRollup.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('mysql', 'mariadb'):
+        statement = mysql.insert(table)
+        new = statement.inserted
+    elif dialect in ('postgresql', 'sqlite'):
+        statement = (postgresql if dialect == 'postgresql' else sqlite).insert(table)
+        new = statement.excluded
+    else:
+        raise NotImplementedError(f"Rollup upserts are not implemented for {dialect}")
+
+    values = {column: new[column] for column in (*overwrite, 'updated_at')}
+    values.update({column: table.c[column] + new[column] for column in add})
+    if dialect in ('mysql', 'mariadb'):
+        statement = statement.on_duplicate_key_update(values)
+    else:
+        statement = statement.on_conflict_do_update(index_elements=[table.c.user_id, table.c.month], set_=values)
+    db.session.execute(statement, rows)
+
+
+def _row(key, **values):
+    return {'user_id': key[0], 'month': key[1], 'checkins': 0, 'stale': False, 'updated_at': datetime.utcnow(),
+            **{column: 0 for column in _TOTALS}, **values}
+
+
+def _mark_session_months(changes, work_session):
+    """Queue the month of a work session, and the next month if its week spills into it."""
+    starts = {work_session.start_time}
+    history = inspect(work_session).attrs.start_time.history
+    starts.update(value for value in history.deleted if value is not None)
+    months = changes.setdefault('months', set())
+    spill = changes.setdefault('spill', set())
+    for start in starts:
+        if start is None:
+            continue
+        months.add((work_session.user_id, month_start(start)))
+        week_end = start + timedelta(days=6 - start.weekday())
+        if week_end.month != start.month:
+            spill.add((work_session.user_id, month_start(week_end)))
+
+
+def update_rollups(months=(), checkins=None, spill=()):
+    """
+    Apply collected changes. Does not commit.
+
+    Args:
+        months (iterable): (user_id, month) rollups to recompute, created if missing
+        checkins (Counter): (user_id, month) -> verified check-ins to add
+        spill (iterable): (user_id, month) rollups to recompute only if they exist
+            (weekly overtime of a week spanning two months)
+    """
+    checkins = +(checkins or Counter())
+    if checkins:
+        _upsert([_row(key, checkins=count) for key, count in sorted(checkins.items())], add=('checkins',))
+
+    refresh = set(months)
+    spill = set(spill) - refresh
+    if spill:
+        refresh.update(tuple(key) for key in db.session.execute(
+            select(UserMonthlyRollup.user_id, UserMonthlyRollup.month)
+            .where(tuple_(UserMonthlyRollup.user_id, UserMonthlyRollup.month).in_(sorted(spill)))
+        ))
+
+    if refresh:
+        refresh_users = sorted({user_id for user_id, _ in refresh})
+        refresh_first = min(month for _, month in refresh)
+        refresh_last = max(month for _, month in refresh)
+        earnings = monthly_earnings(
+            refresh_users,
+            datetime.combine(refresh_first, time()),
+            datetime.combine(next_month(refresh_last), time())
+        )
+        _upsert([_row(key, **{column: earnings.get(key, {}).get(column, 0) for column in _TOTALS})
+                 for key in sorted(refresh)],
+                overwrite=(*_TOTALS, 'stale'))
+
+
+def get_year_rollups(user_id, year):
+    """
+    A user's rollups for a calendar year, oldest first, in one primary-key
+    range read; stale rows are recomputed first. Does not commit.
+    """
+    query = select(UserMonthlyRollup).where(
+        UserMonthlyRollup.user_id == user_id,
+        UserMonthlyRollup.month >= date(year, 1, 1),
+        UserMonthlyRollup.month < date(year + 1, 1, 1)
+    ).order_by(UserMonthlyRollup.month)
+    rows = db.session.scalars(query).all()
+    stale = {(user_id, row.month) for row in rows if row.stale}
+    if stale:
+        update_rollups(spill=stale)
+        rows = db.session.scalars(query.execution_options(populate_existing=True)).all()
+    return rows
+
+
+def rebuild_rollups():
+    """
+    Rebuild every rollup from verified check-ins and work sessions. Does not commit.
+
+    Used to backfill the table for data recorded before rollups existed.
+    """
+    db.session.flush()
+    db.session.execute(delete(UserMonthlyRollup))
+
+    checkins = Counter()
+    day_counts = db.session.execute(
+        select(CheckIn.user_id, func.date(CheckIn.timestamp), func.count(CheckIn.id))
+        .where(CheckIn.is_verified == True)
+        .group_by(CheckIn.user_id, func.date(CheckIn.timestamp))
+    )
+    for user_id, day, count in day_counts:
+        checkins[(user_id, month_start(date.fromisoformat(str(day)[:10])))] += count
+
+    first, last = db.session.execute(
+        select(func.min(WorkSession.start_time), func.max(WorkSession.start_time))
+    ).one()
+    totals = {}
+    if first is not None:
+        user_ids = db.session.scalars(select(WorkSession.user_id).distinct().order_by(WorkSession.user_id)).all()
+        start = datetime.combine(month_start(first), time())
+        end = datetime.combine(next_month(month_start(last)), time())
+        for i in range(0, len(user_ids), RECOMPUTE_CHUNK_SIZE):
+            totals.update(monthly_earnings(user_ids[i:i + RECOMPUTE_CHUNK_SIZE], start, end))
+
+    rows = [
+        {'user_id': user_id, 'month': month, 'checkins': checkins.get((user_id, month), 0), 'stale': False,
+         'updated_at': datetime.utcnow(),
+         **{column: totals.get((user_id, month), {}).get(column, 0) for column in _TOTALS}}
+        for user_id, month in sorted(checkins.keys() | totals.keys())
+    ]
+    if rows:
+        db.session.execute(insert(UserMonthlyRollup), rows)
+    return len(rows)
+
+
+def _collect_changes(changes, session, obj):
+    if isinstance(obj, WorkSession):
+        _mark_session_months(changes, obj)
+    elif obj in session.new and obj.is_verified:
+        timestamp = obj.__dict__.get('timestamp') or datetime.utcnow()
+        changes.setdefault('checkins', Counter())[(obj.user_id, month_start(timestamp))] += 1
+
+
+def _on_bulk_write(changes, orm_execute_state, table):
+    if table == WorkSession.__tablename__:
+        orm_execute_state.session.execute(update(UserMonthlyRollup.__table__).values(stale=True))
+
+
+def _apply_changes(changes):
+    update_rollups(changes.get('months', ()), changes.get('checkins'), changes.get('spill', ()))
+
+
+# Bulk check-in inserts are counted by count_checkins
+track_changes('rollups', {WorkSession.__tablename__, CheckIn.__tablename__}, _apply_changes,
+              collect=_collect_changes, bulk=_on_bulk_write, bulk_kinds=('update', 'delete'), after='flush')
+
+
+@event.listens_for(PayRate, 'after_insert')
+@event.listens_for(PayRate, 'after_update')
+@event.listens_for(PayRate, 'after_delete')
+def _pay_rate_changed(mapper, connection, target):
+    """Any rate can change anybody's pay: mark every rollup stale."""
+    connection.execute(update(UserMonthlyRollup.__table__).values(stale=True))
+
+
+@event.listens_for(User, 'after_update')
+def _user_changed(mapper, connection, target):
+    """Department and role select the rates a user is paid at."""
+    state = inspect(target)
+    if state.attrs.department.history.has_changes() or state.attrs.role.history.has_changes():
+        connection.execute(
+            update(UserMonthlyRollup.__table__)
+            .where(UserMonthlyRollup.__table__.c.user_id == target.id)
+            .values(stale=True)
+        )
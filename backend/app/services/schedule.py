@@ -0,0 +1,193 @@
+# backend/app/services/schedule.py
+"""
+Month views of a user's shifts for /dashboard/schedule.
+
+A month view lists every day of the month with the shifts starting on it,
+read with one range query on the (user_id, start_time) index. Rendered views
+are kept per (user, year, month) in an LRU together with an ETag of their
+content, so repeated polls are answered from memory and clients that send
+If-None-Match get a 304.
+
+A change tracker (services/change_tracking.py) keeps the views current: a
+shift written through the ORM drops the views of the months it starts in
+(before and after the change), bulk statements against shifts and location
+renames or deletes drop every view. Changes apply when the transaction
+commits; a view rendered from a snapshot taken before a concurrent commit is
+not stored. The tracker only sees this worker's commits, so views are also
+re-rendered once they are SCHEDULE_CACHE_MAX_AGE seconds old: shifts written
+by other workers show up within that time.
+"""
+import calendar
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict, namedtuple
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import inspect, select
+
+from backend.app.extensions import db
+from backend.app.models import Location, Shift
+from backend.app.services.change_tracking import track_changes
+
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_MAX_AGE = 60
+
+MonthView = namedtuple('MonthView', ['etag', 'days'])
+
+
+class ScheduleCache:
+    """LRU of rendered month views keyed by (user_id, year, month)."""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE, max_age=DEFAULT_MAX_AGE):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._views = OrderedDict()     # key -> (rendered at, view)
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a view rendered before a
+        # concurrent write is not stored over it
+        self.writes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._views.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.max_age:
+                del self._views[key]
+                return None
+            self._views.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, view, writes):
+        """Store a view unless an invalidation happened since ``writes`` was read."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if writes != self.writes:
+                return
+            self._views[key] = (time.monotonic(), view)
+            self._views.move_to_end(key)
+            while len(self._views) > self.max_entries:
+                self._views.popitem(last=False)
+
+    def invalidate(self, keys=None):
+        """Drop the given (user_id, year, month) views, or every view."""
+        with self._lock:
+            self.writes += 1
+            if keys is None:
+                self._views.clear()
+            else:
+                for key in keys:
+                    self._views.pop(key, None)
+
+
+_cache_lock = threading.Lock()
+
+
+def get_schedule_cache(app=None):
+    """Return the app's month view cache, creating it on first use."""
+    app = app or current_app
+    cache = app.extensions.get('schedule_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = app.extensions.get('schedule_cache')
+            if cache is None:
+                cache = ScheduleCache(app.config.get('SCHEDULE_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+                                      app.config.get('SCHEDULE_CACHE_MAX_AGE', DEFAULT_MAX_AGE))
+                app.extensions['schedule_cache'] = cache
+    return cache
+
+
+def _clock(value):
+    """9:00 AM style time of day."""
+    return value.strftime('%I:%M %p').lstrip('0')
+
+
+def render_month(user_id, year, month):
+    """
+    A user's schedule for a month: one entry per day, "Off" when no shift
+    starts that day.
+    """
+    first = datetime(year, month, 1)
+    following = datetime(year + month // 12, month % 12 + 1, 1)
+    rows = db.session.execute(
+        select(Shift.id, Shift.start_time, Shift.end_time, Shift.status, Location.name)
+        .outerjoin(Location, Location.id == Shift.location_id)
+        .where(Shift.user_id == user_id, Shift.start_time >= first, Shift.start_time < following)
+        .order_by(Shift.start_time, Shift.id)
+    ).all()
+    by_day = defaultdict(list)
+    for row in rows:
+        by_day[row.start_time.day].append(row)
+
+    days = []
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        date_str = f"{year}-{month:02d}-{day:02d}"
+        shifts = by_day.get(day)
+        if not shifts:
+            days.append({"date": date_str, "shift": "Off", "location": ""})
+            continue
+        days.append({
+            "date": date_str,
+            "shift": ", ".join(f"{_clock(row.start_time)} - {_clock(row.end_time)}" for row in shifts),
+            "location": ", ".join(dict.fromkeys(row.name or "Unknown Location" for row in shifts)),
+            "shifts": [{
+                "id": row.id,
+                "start_time": row.start_time.isoformat(),
+                "end_time": row.end_time.isoformat(),
+                "status": row.status,
+                "location": row.name or "Unknown Location"
+            } for row in shifts]
+        })
+    return days
+
+
+def month_view(user_id, year, month):
+    """The cached MonthView for a user's month, rendering it on a miss."""
+    cache = get_schedule_cache()
+    key = (user_id, year, month)
+    view = cache.get(key)
+    if view is None:
+        writes = cache.writes
+        days = render_month(user_id, year, month)
+        etag = hashlib.sha1(json.dumps(days, separators=(',', ':')).encode('utf-8')).hexdigest()
+        view = MonthView(etag, days)
+        cache.put(key, view, writes)
+    return view
+
+
+def _shift_months(shift):
+    """(user_id, year, month) of a shift, before and after pending changes."""
+    state = inspect(shift)
+    user_ids = {shift.user_id, *state.attrs.user_id.history.deleted}
+    starts = {shift.start_time, *state.attrs.start_time.history.deleted}
+    return {(user_id, start.year, start.month)
+            for user_id in user_ids if user_id is not None
+            for start in starts if start is not None}
+
+
+def _collect_changes(changes, session, obj):
+    if isinstance(obj, Shift):
+        changes.setdefault('months', set()).update(_shift_months(obj))
+    elif obj not in session.new:
+        # A renamed or deleted location shows in every view
+        changes['all'] = True
+
+
+def _on_bulk_write(changes, orm_execute_state, table):
+    if table == Shift.__tablename__ or not orm_execute_state.is_insert:
+        changes['all'] = True
+
+
+def _apply_changes(changes):
+    if changes.get('all'):
+        get_schedule_cache().invalidate()
+    elif changes.get('months'):
+        get_schedule_cache().invalidate(changes['months'])
+
+
+track_changes('schedule', {Shift.__tablename__, Location.__tablename__}, _apply_changes,
+              collect=_collect_changes, bulk=_on_bulk_write)
@@ -0,0 +1,186 @@
+# backend/app/services/shift_conflicts.py
+"""
+Shift conflict detection with per-user interval indexes.
+
+``load_shift_index`` reads the shifts of the given users that overlap a
+scheduling window in one query (served by the (user_id, start_time) index)
+and keeps each user's shifts sorted by start time, with a running maximum of
+their end times. Finding the shifts that overlap a proposed interval is then
+a binary search for the last shift starting before it ends, followed by a
+walk back that stops as soon as the running maximum shows nothing earlier
+can reach the proposed start. For a schedule without overlapping shifts that
+is O(log n) plus the conflicts returned; one long stored shift keeps the
+running maximum high, so the walk can pass over every later shift and the
+worst case is O(n). Results are correct either way.
+
+Intervals are half-open: a shift ending at 17:00 does not conflict with one
+starting at 17:00.
+
+``validate_shifts`` checks a batch of proposed shifts in one pass: one query
+each for the users, the locations and the existing shifts, an index lookup
+per proposal, and a sweep in start order that catches proposals overlapping
+each other.
+
+There is no database constraint against overlapping shifts: the check and
+the insert that follows it are separate statements. Both entry points lock
+the rows of the users they check (SELECT ... FOR UPDATE, in id order) so that
+concurrent writers for the same user take turns until the transaction ends.
+SQLite ignores FOR UPDATE, so there two workers can still both pass the check
+and insert overlapping shifts.
+"""
+import heapq
+from bisect import bisect_left
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from backend.app.extensions import db
+from backend.app.models import Location, Shift, User
+
+
+class UserShiftIndex:
+    """One user's shifts sorted by start, with the running maximum of their ends."""
+
+    def __init__(self, shifts=()):
+        shifts = sorted(shifts)
+        self.starts = [start for start, _, _ in shifts]
+        self.ends = [end for _, end, _ in shifts]
+        self.ids = [shift_id for _, _, shift_id in shifts]
+        self.max_end = []
+        running = None
+        for end in self.ends:
+            running = end if running is None or end > running else running
+            self.max_end.append(running)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def overlapping(self, start, end, exclude=None):
+        """
+        Indexes (into starts/ends/ids) of the shifts overlapping [start, end),
+        latest start first.
+        """
+        found = []
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_end[i] > start:
+            if self.ends[i] > start and self.ids[i] != exclude:
+                found.append(i)
+            i -= 1
+        return found
+
+    def conflicts(self, start, end, exclude=None):
+        """The shifts overlapping [start, end) as conflict dicts."""
+        return [
+            {"id": self.ids[i], "start_time": self.starts[i].isoformat(), "end_time": self.ends[i].isoformat()}
+            for i in reversed(self.overlapping(start, end, exclude))
+        ]
+
+
+def load_shift_index(user_ids, window_start, window_end):
+    """
+    Interval indexes of the given users' shifts overlapping [window_start,
+    window_end), in one query.
+
+    Returns:
+        dict: user_id -> UserShiftIndex (empty for users without shifts)
+    """
+    user_ids = sorted(set(user_ids))
+    shifts = defaultdict(list)
+    if user_ids:
+        rows = db.session.execute(
+            select(Shift.user_id, Shift.start_time, Shift.end_time, Shift.id)
+            .where(Shift.user_id.in_(user_ids), Shift.start_time < window_end, Shift.end_time > window_start)
+        )
+        for user_id, start, end, shift_id in rows:
+            shifts[user_id].append((start, end, shift_id))
+    return {user_id: UserShiftIndex(shifts.get(user_id, ())) for user_id in user_ids}
+
+
+def lock_users(user_ids):
+    """
+    Lock the given users' rows until the transaction ends, so shift writers
+    for the same user are serialised. Returns the ids that exist.
+    """
+    return set(db.session.scalars(
+        select(User.id).where(User.id.in_(sorted(set(user_ids)))).order_by(User.id).with_for_update()
+    ))
+
+
+def find_conflicts(user_id, start, end, exclude=None):
+    """Existing shifts of a user overlapping [start, end), optionally ignoring one shift."""
+    lock_users([user_id])
+    return load_shift_index([user_id], start, end)[user_id].conflicts(start, end, exclude)
+
+
+def validate_shifts(proposals):
+    """
+    Check proposed shifts against the database and against each other.
+
+    Args:
+        proposals (list): dicts with user_id, location_id, start_time and
+            end_time (datetimes), and optionally id (a shift being moved,
+            which is not counted as a conflict with itself)
+
+    Returns:
+        list: One dict per invalid proposal, in input order, with its
+        "index" and any of "errors" (list of messages), "conflicts" (existing
+        shifts it overlaps) and "batch_conflicts" (indexes of other proposals
+        it overlaps). Empty when every proposal is valid.
+    """
+    problems = defaultdict(dict)
+    if not proposals:
+        return []
+
+    user_ids = {p['user_id'] for p in proposals}
+    location_ids = {p['location_id'] for p in proposals if p.get('location_id') is not None}
+    known_users = lock_users(user_ids)
+    known_locations = set(db.session.scalars(select(Location.id).where(Location.id.in_(location_ids)))) \
+        if location_ids else set()
+
+    timed = []
+    for index, proposal in enumerate(proposals):
+        errors = []
+        if proposal['user_id'] not in known_users:
+            errors.append("User not found")
+        if proposal.get('location_id') is not None and proposal['location_id'] not in known_locations:
+            errors.append("Location not found")
+        if proposal['start_time'] >= proposal['end_time']:
+            errors.append("End time must be after start time")
+        else:
+            timed.append(index)
+        if errors:
+            problems[index]['errors'] = errors
+
+    if timed:
+        indexes = load_shift_index(
+            {proposals[i]['user_id'] for i in timed},
+            min(proposals[i]['start_time'] for i in timed),
+            max(proposals[i]['end_time'] for i in timed)
+        )
+
+        # Sweep each user's proposals in start order; the heap holds earlier
+        # proposals still running, keyed by end
+        by_user = defaultdict(list)
+        for i in timed:
+            by_user[proposals[i]['user_id']].append(i)
+        for user_id, batch in by_user.items():
+            index = indexes[user_id]
+            batch.sort(key=lambda i: (proposals[i]['start_time'], i))
+            running = []
+            for i in batch:
+                start, end = proposals[i]['start_time'], proposals[i]['end_time']
+                conflicts = index.conflicts(start, end, exclude=proposals[i].get('id'))
+                if conflicts:
+                    problems[i]['conflicts'] = conflicts
+                while running and running[0][0] <= start:
+                    heapq.heappop(running)
+                for _, other in running:
+                    problems[i].setdefault('batch_conflicts', []).append(other)
+                    problems[other].setdefault('batch_conflicts', []).append(i)
+                heapq.heappush(running, (end, i))
+
+    return [
+        {"index": i, **{key: sorted(value) if key == 'batch_conflicts' else value
+                        for key, value in problems[i].items()}}
+        for i in sorted(problems)
+    ]
@@ -0,0 +1,77 @@
+# backend/app/services/spreadsheet.py
+"""
+Constant-memory xlsx writing.
+
+xlsxwriter's ``constant_memory`` mode flushes each row to a temporary file as
+soon as the next row starts, so memory stays flat however many rows are
+written. Rows must therefore arrive in order, which suits a chunked DB cursor.
+"""
+import logging
+import os
+import tempfile
+
+import xlsxwriter
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def write_xlsx(rows, columns, sheet_name='Sheet1', path=None):
+    """
+    Write dict rows to an xlsx file without holding the sheet in memory.
+
+    Args:
+        rows (iterable): Dictionaries, consumed once in order
+        columns (list): (key, header) pairs giving column order and titles
+        sheet_name (str): Worksheet name
+        path (str): Destination; a new temporary file when omitted
+
+    Returns:
+        str: Path of the written workbook. The caller owns (and removes) it.
+    """
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix='export_', suffix='.xlsx')
+        os.close(fd)
+
+    try:
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        worksheet = workbook.add_worksheet(sheet_name)
+        header = workbook.add_format({'bold': True})
+        for col, (_, title) in enumerate(columns):
+            worksheet.write(0, col, title, header)
+
+        keys = [key for key, _ in columns]
+        for row_num, row in enumerate(rows, start=1):
+            for col, key in enumerate(keys):
+                value = row.get(key)
+                if value is not None:
+                    worksheet.write(row_num, col, value)
+        workbook.close()
+    except Exception:
+        logging.exception(f"Failed writing workbook {path}")
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    return path
+
+
+def stream_file(path, chunk_size=64 * 1024, remove=True):
+    """
+    Yield a file in chunks for a streamed response, removing it afterwards.
+
+    The file is removed when the generator finishes or is closed early
+    (e.g. the client disconnects), since WSGI servers close the iterator.
+    """
+    try:
+        with open(path, 'rb') as handle:
+            while True:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        if remove:
+            try:
+                os.remove(path)
+            except OSError:
+                logging.warning(f"Could not remove temporary export {path}")
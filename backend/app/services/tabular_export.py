@@ -0,0 +1,147 @@
+# backend/app/services/tabular_export.py
+"""
+Streaming CSV, Parquet and Arrow encoders fed by SQL result chunks.
+
+Each encoder takes an iterable of row chunks (sequences of tuples in column
+order, e.g. ``Result.partitions()``) and yields bytes as soon as a chunk is
+encoded, so only one chunk is in memory at a time and no DataFrame of the
+whole dataset is ever built. Parquet writes one row group per chunk; Arrow
+uses the IPC streaming format, one record batch per chunk.
+
+pyarrow is optional: without it only CSV is available.
+"""
+import csv
+import io
+from collections import namedtuple
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+# Rows per chunk pulled from the database and encoded at once
+EXPORT_CHUNK_SIZE = 10000
+
+# type is one of: int, float, str, bool, datetime
+Column = namedtuple('Column', 'name type')
+
+ExportFormat = namedtuple('ExportFormat', 'mimetype extension requires_arrow')
+
+FORMATS = {
+    'csv': ExportFormat('text/csv', '.csv', False),
+    'parquet': ExportFormat('application/vnd.apache.parquet', '.parquet', True),
+    'arrow': ExportFormat('application/vnd.apache.arrow.stream', '.arrow', True),
+}
+
+
+def format_error(fmt):
+    """Why fmt cannot be exported here (unknown, or pyarrow missing), or None if it can."""
+    if fmt not in FORMATS:
+        return f"Unsupported export format '{fmt}'."
+    if FORMATS[fmt].requires_arrow and pa is None:
+        return f"{fmt.capitalize()} export requires pyarrow, which is not installed."
+    return None
+
+
+def arrow_schema(columns):
+    types = {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'str': pa.string(),
+        'bool': pa.bool_(),
+        'datetime': pa.timestamp('us'),
+    }
+    return pa.schema([(column.name, types[column.type]) for column in columns])
+
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _record_batch(chunk, schema):
+    arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_csv(chunks, columns):
+    """Yield CSV bytes, header first, then one block per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in columns])
+    for chunk in chunks:
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in chunk
+        )
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_arrow(chunks, columns):
+    """Yield an Arrow IPC stream, one record batch per chunk."""
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for chunk in chunks:
+            if chunk:
+                writer.write_batch(_record_batch(chunk, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_parquet(chunks, columns):
+    """Yield a Parquet file, one row group per chunk."""
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in chunks:
+            if chunk:
+                writer.write_batch(_record_batch(chunk, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+ENCODERS = {'csv': iter_csv, 'arrow': iter_arrow, 'parquet': iter_parquet}
+
+
+def iter_encoded(fmt, chunks, columns):
+    """
+    Encode row chunks in the given format.
+
+    Raises:
+        ValueError: Unknown format, or one that needs pyarrow when it is missing
+    """
+    error = format_error(fmt)
+    if error:
+        raise ValueError(error)
+    return (data for data in ENCODERS[fmt](chunks, columns) if data)
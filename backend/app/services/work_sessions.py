@@ -0,0 +1,134 @@
+# backend/app/services/work_sessions.py
+"""
+Write-time maintenance of the work_sessions table.
+
+Every verified punch goes through ``record_punches``: the check-in rows are
+inserted with one executemany and, in the same transaction, each "in" opens a
+WorkSession and the user's next "out" closes it with its duration. Reports
+then aggregate closed sessions instead of rescanning raw check-ins, and the
+per-user monthly rollups (services.rollups) are brought up to date with them.
+"""
+import logging
+from collections import defaultdict
+
+from sqlalchemy import func
+
+from backend.app.extensions import db
+from backend.app.models import CheckIn, WorkSession
+from backend.app.services.recent_activity import note_checkins
+from backend.app.services.rollups import count_checkins
+
+# Sessions longer than this are treated as a missed check-out, not paid time
+MAX_SESSION_HOURS = 24
+
+
+def record_punches(rows):
+    """
+    Insert verified check-in rows and update work sessions. Does not commit.
+
+    Args:
+        rows (list): Column dictionaries for the checkins table; each must
+            carry user_id, location_id, timestamp and check_type.
+    """
+    if not rows:
+        return
+    if db.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = db.session.execute(
+            CheckIn.__table__.insert().returning(CheckIn.__table__.c.id, sort_by_parameter_order=True), rows
+        )
+        note_checkins(rows, result.scalars().all())
+    else:
+        db.session.execute(CheckIn.__table__.insert(), rows)
+        note_checkins(rows)
+    count_checkins(rows)
+    apply_punches(rows)
+
+
+def apply_punches(rows):
+    """
+    Open and close work sessions for a set of punches, oldest first per user.
+
+    Open sessions for every user in the batch are loaded with one query.
+    An "in" while a session is already open marks the old one 'unmatched'
+    (a missed check-out); an "out" with no open session is ignored.
+    """
+    by_user = defaultdict(list)
+    for row in rows:
+        if row.get('is_verified', True):
+            by_user[row['user_id']].append(row)
+    if not by_user:
+        return
+
+    open_sessions = {
+        session.user_id: session
+        for session in WorkSession.query.filter(
+            WorkSession.user_id.in_(list(by_user)),
+            WorkSession.status == 'open'
+        ).order_by(WorkSession.start_time)
+    }
+
+    for user_id, punches in by_user.items():
+        current = open_sessions.get(user_id)
+        for punch in sorted(punches, key=lambda p: p['timestamp']):
+            if punch.get('check_type', 'in') == 'out':
+                if current is None or punch['timestamp'] < current.start_time:
+                    logging.info(f"Check-out without open session for user {user_id} at {punch['timestamp']}")
+                    continue
+                close_session(current, punch['timestamp'])
+                current = None
+            else:
+                if current is not None:
+                    current.status = 'unmatched'
+                current = WorkSession(
+                    user_id=user_id,
+                    location_id=punch.get('location_id'),
+                    start_time=punch['timestamp'],
+                    status='open'
+                )
+                db.session.add(current)
+
+
+def close_session(session, end_time):
+    """Close a session at end_time, or mark it unmatched if it ran implausibly long."""
+    hours = (end_time - session.start_time).total_seconds() / 3600
+    session.end_time = end_time
+    if hours > MAX_SESSION_HOURS:
+        session.status = 'unmatched'
+        session.duration_hours = None
+    else:
+        session.status = 'closed'
+        session.duration_hours = round(hours, 4)
+
+
+def closed_hours(user_id, start=None, end=None):
+    """Sum of closed session hours for a user, optionally within [start, end)."""
+    query = db.session.query(func.coalesce(func.sum(WorkSession.duration_hours), 0.0)).filter(
+        WorkSession.user_id == user_id,
+        WorkSession.status == 'closed'
+    )
+    if start is not None:
+        query = query.filter(WorkSession.start_time >= start)
+    if end is not None:
+        query = query.filter(WorkSession.start_time < end)
+    return float(query.scalar())
+
+
+def rebuild_work_sessions(chunk_size=5000):
+    """
+    Rebuild every work session from the verified check-ins. Does not commit.
+
+    Used to backfill the table for check-ins recorded before sessions existed.
+    """
+    WorkSession.query.delete()
+    query = db.session.query(
+        CheckIn.user_id, CheckIn.location_id, CheckIn.timestamp, CheckIn.check_type
+    ).filter(CheckIn.is_verified == True).order_by(CheckIn.user_id, CheckIn.timestamp)
+
+    batch = []
+    for row in query.yield_per(chunk_size):
+        batch.append(row._asdict())
+        if len(batch) >= chunk_size:
+            apply_punches(batch)
+            db.session.flush()
+            batch = []
+    apply_punches(batch)
@@ -1,4 +1,9 @@
-from geopy.distance import distance as geopy_distance
+from backend.app.services.geo import vincenty_km
+from backend.app.services.spreadsheet import write_xlsx
+import base64
+import os
+import tempfile
+from datetime import datetime
 import pandas as pd
 from flask import jsonify
 
@@ -30,25 +35,24 @@ def calculate_distance(coord1, coord2):
     # Validate input types
     if not (isinstance(coord1, tuple) and isinstance(coord2, tuple)):
         raise ValueError("Coordinates must be tuples of (latitude, longitude).")
-    
+
     # Validate tuple length
     if len(coord1) != 2 or len(coord2) != 2:
         raise ValueError("Each coordinate must contain exactly two elements.")
-    
-    # Validate numerical values
-    if not all(isinstance(val, (int, float)) for val in coord1 + coord2):
-        raise ValueError("Coordinates must contain numerical values.")
 
-    # Validate latitude and longitude ranges
-    if not (-90 <= coord1[0] <= 90 and -90 <= coord2[0] <= 90):
-        raise ValueError("Latitude must be between -90 and 90.")
-    if not (-180 <= coord1[1] <= 180 and -180 <= coord2[1] <= 180):
-        raise ValueError("Longitude must be between -180 and 180.")
-    
+    lat1, lon1 = coord1
+    lat2, lon2 = coord2
+
+    # Validate numerical values and ranges in one pass (comparisons fail on non-numbers)
     try:
-        return round(geopy_distance(coord1, coord2).km, 2)
-    except Exception as e:
-        raise ValueError(f"Error calculating distance: {str(e)}")
+        if not (-90 <= lat1 <= 90 and -90 <= lat2 <= 90):
+            raise ValueError("Latitude must be between -90 and 90.")
+        if not (-180 <= lon1 <= 180 and -180 <= lon2 <= 180):
+            raise ValueError("Longitude must be between -180 and 180.")
+    except TypeError:
+        raise ValueError("Coordinates must contain numerical values.")
+
+    return round(float(vincenty_km(lat1, lon1, lat2, lon2)), 2)
 
 def success_response(data=None, message='Success'):
     response = {'success': True, 'message': message}
@@ -64,10 +68,12 @@ def export_to_excel(data, filename=None):
         raise ValueError("Data must be a list of dictionaries.")
     try:
         if not filename:
-            filename = f"export_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        df = pd.DataFrame(data)
-        df.to_excel(filename, index=False)
-        return filename
+            # Never write into the process CWD; callers own and remove the file
+            filename = os.path.join(
+                tempfile.gettempdir(), f"export_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S_%f')}.xlsx"
+            )
+        columns = list(dict.fromkeys(key for row in data for key in row))
+        return write_xlsx(data, [(key, key) for key in columns], path=filename)
     except Exception as e:
         raise IOError(f"Error exporting data to Excel: {str(e)}")
 
@@ -79,4 +85,28 @@ def api_response(data=None, message="Success", status_code=200):
     }
     if data is not None:
         response["data"] = data
-    return jsonify(response), status_code
\ No newline at end of file
+    return jsonify(response), status_code
+
+def encode_cursor(timestamp, row_id):
+    """Encode a (timestamp, id) keyset position as an opaque cursor string."""
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def validate_date_format(date_str):
+    """
+    Validate date format as YYYY-MM-DD.
+    """
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# backend/benchmarks/bench_export.py
+"""
+Peak-RSS benchmark: the old in-memory payroll export (DataFrame -> BytesIO ->
+getvalue) vs the constant-memory streaming export.
+
+Each path runs in its own spawned process so the ru_maxrss high-water marks
+don't leak into each other.
+
+Usage:
+    python -m backend.benchmarks.bench_export [--rows 100000]
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+
+def _rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run(mode, db_path, result):
+    import pandas as pd
+
+    from backend.app import create_app
+    from backend.app.services.payroll_engine import PAYROLL_EXPORT_COLUMNS, compute_payroll, iter_payroll
+    from backend.app.services.spreadsheet import stream_file, write_xlsx
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'})
+    with app.app_context():
+        baseline = _rss_mb()
+        start = time.perf_counter()
+        if mode == 'in-memory':
+            df = pd.DataFrame(compute_payroll())
+            output = io.BytesIO()
+            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+                df.to_excel(writer, index=False, sheet_name='Payroll')
+            output.seek(0)
+            size = len(output.getvalue())
+        else:
+            path = write_xlsx(iter_payroll(), PAYROLL_EXPORT_COLUMNS, sheet_name='Payroll')
+            size = sum(len(chunk) for chunk in stream_file(path))
+        result.update(mode=mode, seconds=time.perf_counter() - start,
+                      peak_mb=_rss_mb() - baseline, size_mb=size / 1e6)
+
+
+def seed(db_path, rows):
+    from backend.app import create_app
+    from backend.app.extensions import db
+    from backend.app.models import User
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'})
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [
+            {'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'x',
+             'role': 'Employee', 'department': f'Dept{i % 20}'}
+            for i in range(rows)
+        ])
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000, help='Payroll rows (users) in the report')
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp, ctx.Manager() as manager:
+        db_path = os.path.join(tmp, 'bench.db')
+        seed(db_path, args.rows)
+
+        print(f"{args.rows} payroll rows")
+        for mode in ('in-memory', 'streaming'):
+            result = manager.dict()
+            proc = ctx.Process(target=_run, args=(mode, db_path, result))
+            proc.start()
+            proc.join()
+            print(f"{result['mode']:>10}: peak RSS +{result['peak_mb']:7.1f} MB, "
+                  f"{result['seconds']:6.2f} s, {result['size_mb']:.1f} MB workbook")
+
+
+if __name__ == '__main__':
+    main()
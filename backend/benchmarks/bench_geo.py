@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# backend/benchmarks/bench_geo.py
+"""
+Throughput benchmark: per-call geopy vs the vectorized kernels in services.geo.
+
+Usage:
+    python -m backend.benchmarks.bench_geo [--points 20000] [--sites 300]
+"""
+import argparse
+import time
+
+import numpy as np
+from geopy.distance import geodesic
+
+from backend.app.services.geo import distance_matrix_km, haversine_km, vincenty_km
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--points', type=int, default=20000)
+    parser.add_argument('--sites', type=int, default=300)
+    parser.add_argument('--geopy-sample', type=int, default=2000,
+                        help='Number of pairs to run through geopy (it is slow)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    lat1 = rng.uniform(25, 49, args.points)
+    lon1 = rng.uniform(-124, -67, args.points)
+    lat2 = rng.uniform(25, 49, args.points)
+    lon2 = rng.uniform(-124, -67, args.points)
+
+    sample = min(args.geopy_sample, args.points)
+    _, geopy_time = _timed(lambda: [
+        geodesic((lat1[i], lon1[i]), (lat2[i], lon2[i])).km for i in range(sample)
+    ])
+    print(f"geopy geodesic      : {sample / geopy_time:>14,.0f} pairs/s")
+
+    _, t = _timed(lambda: vincenty_km(lat1, lon1, lat2, lon2))
+    print(f"vectorized vincenty : {args.points / t:>14,.0f} pairs/s")
+
+    _, t = _timed(lambda: haversine_km(lat1, lon1, lat2, lon2))
+    print(f"vectorized haversine: {args.points / t:>14,.0f} pairs/s")
+
+    points = np.column_stack([lat1, lon1])
+    sites = np.column_stack([lat2[:args.sites], lon2[:args.sites]])
+    matrix, t = _timed(lambda: distance_matrix_km(points, sites))
+    print(f"haversine matrix    : {matrix.size / t:>14,.0f} pairs/s "
+          f"({args.points} points x {args.sites} sites in {t * 1000:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# backend/benchmarks/bench_invoices.py
+"""
+Benchmark: closing a period for thousands of contractors, one ORM Invoice
+per contractor vs generate_invoices (one INSERT ... SELECT), plus a bulk
+status update.
+
+Usage:
+    python -m backend.benchmarks.bench_invoices [--contractors 10000] [--sessions 20]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import delete, update
+
+from backend.app import create_app
+from backend.app.extensions import db
+from backend.app.models import Invoice, Payroll, User
+from backend.app.services.invoices import generate_invoices, update_invoice_status
+from backend.app.services.payroll_engine import run_payroll
+from backend.benchmarks.bench_payroll import QueryCounter, seed
+
+PERIOD = ('2024-01-01', '2024-01-31')
+
+
+def per_invoice(period_start, period_end):
+    """The naive close: load payroll rows and add an Invoice per contractor."""
+    rows = (
+        db.session.query(Payroll)
+        .join(User, User.id == Payroll.user_id)
+        .filter(User.role == 'Contractor', Payroll.period_start == period_start,
+                Payroll.period_end == period_end, Payroll.pay > 0)
+        .all()
+    )
+    for payroll in rows:
+        db.session.add(Invoice(user_id=payroll.user_id, amount=payroll.pay, status='Pending',
+                               period_start=payroll.period_start, period_end=payroll.period_end))
+        db.session.flush()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--contractors', type=int, default=10000)
+    parser.add_argument('--sessions', type=int, default=20, help='Closed sessions per contractor')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            seed(args.contractors, args.sessions)
+            db.session.execute(update(User).values(role='Contractor'))
+            summary = run_payroll(*PERIOD)
+            db.session.commit()
+            period_start, period_end = db.session.query(Payroll.period_start, Payroll.period_end).first()
+            counter = QueryCounter(db.engine)
+
+            counter.count = 0
+            start = time.perf_counter()
+            created = per_invoice(period_start, period_end)
+            db.session.commit()
+            naive_time = time.perf_counter() - start
+            print(f"{args.contractors} contractors, {summary['recomputed']} payroll rows")
+            print(f"per-invoice ORM : {naive_time * 1000:>9.1f} ms, {counter.count} queries, {created} invoices")
+
+            db.session.execute(delete(Invoice))
+            db.session.commit()
+            counter.count = 0
+            start = time.perf_counter()
+            result = generate_invoices(*PERIOD)
+            db.session.commit()
+            bulk_time = time.perf_counter() - start
+            print(f"generate_invoices: {bulk_time * 1000:>9.1f} ms, {counter.count} queries, "
+                  f"{result['created']} invoices ({naive_time / bulk_time:.1f}x faster)")
+
+            start = time.perf_counter()
+            updated = update_invoice_status('Approved', period_start=period_start, period_end=period_end)
+            db.session.commit()
+            print(f"bulk approve     : {(time.perf_counter() - start) * 1000:>9.1f} ms, {updated} invoices")
+
+
+if __name__ == '__main__':
+    main()
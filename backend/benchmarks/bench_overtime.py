@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# backend/benchmarks/bench_overtime.py
+"""
+Benchmark: daily/weekly overtime for a whole population with the vectorized
+engine (services.overtime.apply_overtime) vs a per-employee Python loop.
+
+Usage:
+    python -m backend.benchmarks.bench_overtime [--employees 10000] [--days 365]
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from backend.app.services.overtime import DEFAULT_RULES, apply_overtime
+
+
+def synthesize(employees, days, seed=0):
+    """One row per employee-day worked, sorted by employee then day (~5 days a week)."""
+    rng = np.random.default_rng(seed)
+    calendar = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-01-01') + days)
+    worked = rng.random((employees, days)) < 5 / 7
+    employee, day = np.nonzero(worked)
+    hours = np.round(rng.normal(8.5, 1.5, len(employee)).clip(1, 16), 2)
+    rates = rng.uniform(15, 45, employees)[employee]
+    return employee, calendar[day], hours, rates
+
+
+def naive_overtime(employee, days, hours, rates, rules=DEFAULT_RULES):
+    """Reference implementation: walk each employee's days with per-week dicts."""
+    pay = []
+    weekly_regular = {}
+    epoch = date(1970, 1, 1)
+    for emp, day, worked, rate in zip(employee.tolist(), days.astype(np.int64).tolist(),
+                                      hours.tolist(), rates.tolist()):
+        current = epoch + timedelta(days=day)
+        week = (emp, current - timedelta(days=current.weekday()))
+        double_time = max(worked - rules.double_threshold, 0.0)
+        overtime = max(worked - double_time - rules.daily_threshold, 0.0)
+        regular = worked - overtime - double_time
+        before = weekly_regular.get(week, 0.0)
+        weekly_regular[week] = before + regular
+        weekly = max(before + regular - rules.weekly_threshold, 0.0) - max(before - rules.weekly_threshold, 0.0)
+        regular -= weekly
+        overtime += weekly
+        pay.append(rate * (regular + overtime * rules.overtime_multiplier
+                           + double_time * rules.double_time_multiplier))
+    return pay
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=365)
+    args = parser.parse_args()
+
+    employee, days, hours, rates = synthesize(args.employees, args.days)
+    print(f"{args.employees} employees x {args.days} days: {len(hours)} employee-days")
+
+    start = time.perf_counter()
+    reference = naive_overtime(employee, days, hours, rates)
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = apply_overtime(employee, days, hours, rates)
+    vector_time = time.perf_counter() - start
+
+    assert np.allclose(result.pay, reference)
+    print(f"python loop: {naive_time * 1000:>9.1f} ms")
+    print(f"vectorized : {vector_time * 1000:>9.1f} ms ({naive_time / vector_time:.1f}x faster)")
+    print(f"overtime hours: {result.overtime.sum():.0f}, double time: {result.double_time.sum():.0f}, "
+          f"pay: {result.pay.sum():,.2f}")
+
+
+if __name__ == '__main__':
+    main()
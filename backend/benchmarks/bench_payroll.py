@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# backend/benchmarks/bench_payroll.py
+"""
+Benchmark: per-user payroll (one query per user) vs the single grouped aggregate,
+and a full persisted payroll run vs an incremental re-run after a small delta.
+
+Usage:
+    python -m backend.benchmarks.bench_payroll [--users 5000] [--sessions 40]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from backend.app import create_app
+from backend.app.extensions import db
+from backend.app.models import User, WorkSession
+from backend.app.routes.payroll import calculate_payroll
+from backend.app.services.payroll_engine import compute_payroll, run_payroll
+
+
+def seed(users, sessions_per_user):
+    """Bulk-load users and closed work sessions."""
+    db.session.execute(User.__table__.insert(), [
+        {'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'x',
+         'role': 'Employee', 'department': f'Dept{i % 20}'}
+        for i in range(users)
+    ])
+    base = datetime(2024, 1, 1, 9)
+    rows = []
+    for user_id in range(1, users + 1):
+        for day in range(sessions_per_user):
+            start = base + timedelta(days=day)
+            rows.append({'user_id': user_id, 'location_id': 1, 'start_time': start,
+                         'end_time': start + timedelta(hours=8), 'duration_hours': 8.0,
+                         'status': 'closed', 'updated_at': start})
+    db.session.execute(WorkSession.__table__.insert(), rows)
+    db.session.commit()
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--sessions', type=int, default=40, help='Closed sessions per user')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            seed(args.users, args.sessions)
+            counter = QueryCounter(db.engine)
+
+            db.session.expire_all()
+            counter.count = 0
+            start = time.perf_counter()
+            legacy = [calculate_payroll(user) for user in User.query.all()]
+            legacy_time = time.perf_counter() - start
+            legacy_queries = counter.count
+
+            counter.count = 0
+            start = time.perf_counter()
+            aggregated = compute_payroll()
+            aggregate_time = time.perf_counter() - start
+            aggregate_queries = counter.count
+
+            assert [r['hours_worked'] for r in legacy] == [r['hours_worked'] for r in aggregated]
+
+            print(f"{args.users} users x {args.sessions} sessions")
+            print(f"per-user path : {legacy_time * 1000:>9.1f} ms, {legacy_queries} queries")
+            print(f"aggregate path: {aggregate_time * 1000:>9.1f} ms, {aggregate_queries} queries "
+                  f"({legacy_time / aggregate_time:.1f}x faster)")
+
+            counter.count = 0
+            start = time.perf_counter()
+            compute_payroll('2024-01-01', '2024-01-15')
+            print(f"aggregate, 15-day period: {(time.perf_counter() - start) * 1000:.1f} ms, "
+                  f"{counter.count} queries")
+
+            start = time.perf_counter()
+            summary = run_payroll('2024-01-01', '2024-12-31')
+            db.session.commit()
+            print(f"payroll run, first : {(time.perf_counter() - start) * 1000:>9.1f} ms, "
+                  f"{summary['recomputed']} users recomputed")
+
+            changed = db.session.query(WorkSession).filter(WorkSession.user_id <= 10).all()
+            for session in changed:
+                session.duration_hours = 7.5
+            db.session.commit()
+
+            start = time.perf_counter()
+            summary = run_payroll('2024-01-01', '2024-12-31')
+            db.session.commit()
+            print(f"payroll run, re-run: {(time.perf_counter() - start) * 1000:>9.1f} ms, "
+                  f"{summary['recomputed']} users recomputed")
+
+
+if __name__ == '__main__':
+    main()
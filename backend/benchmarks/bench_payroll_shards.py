@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# backend/benchmarks/bench_payroll_shards.py
+"""
+Benchmark: serial compute_payroll vs compute_payroll_sharded across worker
+counts. Each pool is warmed up once so process start-up is not measured.
+
+Usage:
+    python -m backend.benchmarks.bench_payroll_shards [--users 10000] [--sessions 120]
+        [--workers 1,2,4,8] [--shard-by department]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from backend.app import create_app
+from backend.app.extensions import db
+from backend.app.services.payroll_engine import compute_payroll
+from backend.app.services.payroll_shards import compute_payroll_sharded, shutdown_payroll_pool
+from backend.benchmarks.bench_payroll import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--sessions', type=int, default=120, help='Closed sessions per user')
+    parser.add_argument('--workers', default=f"1,2,4,{os.cpu_count()}")
+    parser.add_argument('--shard-by', default='department', choices=('department', 'id'))
+    args = parser.parse_args()
+    counts = sorted({int(count) for count in args.workers.split(',')})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app = create_app({'SQLALCHEMY_DATABASE_URI': uri})
+        with app.app_context():
+            seed(args.users, args.sessions)
+
+            start = time.perf_counter()
+            expected = compute_payroll()
+            serial_time = time.perf_counter() - start
+            print(f"{args.users} users x {args.sessions} sessions, {os.cpu_count()} CPUs, "
+                  f"sharded by {args.shard_by}")
+            print(f"serial     : {serial_time * 1000:>9.1f} ms")
+
+        for workers in counts:
+            app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'PAYROLL_WORKERS': workers})
+            with app.app_context():
+                try:
+                    compute_payroll_sharded('2024-01-01', '2024-01-07', shard_by=args.shard_by)  # Warm-up
+                    start = time.perf_counter()
+                    result = compute_payroll_sharded(shard_by=args.shard_by)
+                    elapsed = time.perf_counter() - start
+                finally:
+                    shutdown_payroll_pool(app)
+                    db.session.remove()
+            assert result == expected
+            print(f"{workers:>2} workers : {elapsed * 1000:>9.1f} ms ({serial_time / elapsed:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
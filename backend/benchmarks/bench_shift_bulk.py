@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# backend/benchmarks/bench_shift_bulk.py
+"""
+Benchmark: scheduling a weekday template for a quarter, one create per shift
+(lookup user and location, conflict check, ORM add) vs bulk_create_shifts
+(one IN query each for users, locations and shifts, one executemany INSERT).
+
+Usage:
+    python -m backend.benchmarks.bench_shift_bulk [--users 2000] [--days 91] [--naive-users 200]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from backend.app import create_app
+from backend.app.extensions import db
+from backend.app.models import Location, Shift, User
+from backend.app.services.shift_conflicts import find_conflicts
+from backend.app.services.shift_templates import bulk_create_shifts, expand_template, template_from_json
+from backend.benchmarks.bench_payroll import QueryCounter
+
+TEMPLATE = {"name": "Weekday days", "location_id": 1, "start_time": "09:00", "end_time": "17:00",
+            "weekdays": ["MO", "TU", "WE", "TH", "FR"]}
+
+
+def seed_users(users):
+    """Bulk-load users and one location."""
+    db.session.execute(User.__table__.insert(), [
+        {'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'x', 'role': 'Employee'}
+        for i in range(users)
+    ])
+    db.session.add(Location(name='Site', latitude=0.0, longitude=0.0, radius=1.0))
+    db.session.commit()
+
+
+def per_shift(template, user_ids, start_date, end_date):
+    """What looping over POST /shifts/ amounts to: lookups, a conflict check and an add per shift."""
+    created = 0
+    for user_id in user_ids:
+        for start, end in expand_template(template, start_date, end_date):
+            if db.session.get(User, user_id) is None or db.session.get(Location, 1) is None:
+                continue
+            if find_conflicts(user_id, start, end):
+                continue
+            db.session.add(Shift(user_id=user_id, location_id=1, start_time=start, end_time=end))
+            db.session.commit()
+            created += 1
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=91, help='Length of the range (a quarter)')
+    parser.add_argument('--naive-users', type=int, default=200,
+                        help='Users scheduled one shift at a time (extrapolated to --users)')
+    args = parser.parse_args()
+
+    template = template_from_json(TEMPLATE)
+    start_date = date(2024, 1, 1)
+    end_date = start_date + timedelta(days=args.days - 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            seed_users(args.users)
+            counter = QueryCounter(db.engine)
+
+            counter.count = 0
+            start = time.perf_counter()
+            created = per_shift(template, range(1, args.naive_users + 1), start_date, end_date)
+            naive_time = time.perf_counter() - start
+            projected = naive_time * args.users / args.naive_users
+            print(f"per-shift create   : {naive_time * 1000:>9.1f} ms, {counter.count} queries, "
+                  f"{created} shifts for {args.naive_users} users (~{projected:.1f} s for {args.users})")
+            db.session.execute(Shift.__table__.delete())
+            db.session.commit()
+
+            counter.count = 0
+            start = time.perf_counter()
+            summary = bulk_create_shifts(template, range(1, args.users + 1), start_date, end_date)
+            db.session.commit()
+            bulk_time = time.perf_counter() - start
+            print(f"bulk_create_shifts : {bulk_time * 1000:>9.1f} ms, {counter.count} queries, "
+                  f"{summary['created']} shifts for {args.users} users "
+                  f"({projected / bulk_time:.1f}x faster than projected)")
+
+
+if __name__ == '__main__':
+    main()
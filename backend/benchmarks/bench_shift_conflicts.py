@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# backend/benchmarks/bench_shift_conflicts.py
+"""
+Benchmark: checking a batch of proposed shifts for double-booking, one
+overlap query per proposal vs validate_shifts (interval indexes loaded in one
+query, one pass over the batch).
+
+Usage:
+    python -m backend.benchmarks.bench_shift_conflicts [--users 500] [--shifts 200] [--proposals 5000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from backend.app import create_app
+from backend.app.extensions import db
+from backend.app.models import Location, Shift, User
+from backend.app.services.shift_conflicts import validate_shifts
+from backend.benchmarks.bench_payroll import QueryCounter
+
+BASE = datetime(2024, 1, 1, 9)
+
+
+def seed_shifts(users, shifts_per_user):
+    """Bulk-load users, one location and a day shift per user per day."""
+    db.session.execute(User.__table__.insert(), [
+        {'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'x', 'role': 'Employee'}
+        for i in range(users)
+    ])
+    db.session.add(Location(name='Site', latitude=0.0, longitude=0.0, radius=1.0))
+    db.session.flush()
+    db.session.execute(Shift.__table__.insert(), [
+        {'user_id': user_id, 'location_id': 1, 'start_time': BASE + timedelta(days=day),
+         'end_time': BASE + timedelta(days=day, hours=8), 'status': 'Scheduled'}
+        for user_id in range(1, users + 1) for day in range(shifts_per_user)
+    ])
+    db.session.commit()
+
+
+def per_proposal(proposals):
+    """The naive check: one overlap query per proposed shift."""
+    conflicts = 0
+    for proposal in proposals:
+        hit = Shift.query.filter(
+            Shift.user_id == proposal['user_id'],
+            Shift.start_time < proposal['end_time'],
+            Shift.end_time > proposal['start_time']
+        ).first()
+        conflicts += hit is not None
+    return conflicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--shifts', type=int, default=200, help='Stored shifts per user')
+    parser.add_argument('--proposals', type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    proposals = []
+    for _ in range(args.proposals):
+        start = BASE + timedelta(days=rng.randrange(args.shifts + 30), hours=rng.choice((-2, 6, 10)))
+        proposals.append({'user_id': rng.randint(1, args.users), 'location_id': 1,
+                          'start_time': start, 'end_time': start + timedelta(hours=4)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            seed_shifts(args.users, args.shifts)
+            counter = QueryCounter(db.engine)
+            print(f"{args.users * args.shifts} stored shifts, {args.proposals} proposals")
+
+            counter.count = 0
+            start = time.perf_counter()
+            naive = per_proposal(proposals)
+            naive_time = time.perf_counter() - start
+            print(f"per-proposal query: {naive_time * 1000:>9.1f} ms, {counter.count} queries, {naive} conflicts")
+
+            counter.count = 0
+            start = time.perf_counter()
+            invalid = validate_shifts(proposals)
+            indexed_time = time.perf_counter() - start
+            conflicts = sum('conflicts' in problem for problem in invalid)
+            print(f"validate_shifts   : {indexed_time * 1000:>9.1f} ms, {counter.count} queries, "
+                  f"{conflicts} conflicts ({naive_time / indexed_time:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
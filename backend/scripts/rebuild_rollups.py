@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# backend/scripts/rebuild_rollups.py
+
+import os
+import sys
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app import create_app
+from backend.app.models import db
+from backend.app.services.rollups import rebuild_rollups
+
+
+def main():
+    """Rebuild the user_monthly_rollups table from check-ins and work sessions."""
+    app = create_app()
+    with app.app_context():
+        count = rebuild_rollups()
+        db.session.commit()
+        print(f"Rebuilt {count} monthly rollups.")
+
+if __name__ == "__main__":
+    main()
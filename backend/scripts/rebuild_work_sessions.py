@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+# backend/scripts/rebuild_work_sessions.py
+
+import os
+import sys
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app import create_app
+from backend.app.models import WorkSession, db
+from backend.app.services.work_sessions import rebuild_work_sessions
+
+
+def main():
+    """Rebuild the work_sessions table from existing verified check-ins."""
+    app = create_app()
+    with app.app_context():
+        rebuild_work_sessions()
+        db.session.commit()
+        print(f"Rebuilt {WorkSession.query.count()} work sessions "
+              f"({WorkSession.query.filter_by(status='closed').count()} closed).")
+
+if __name__ == "__main__":
+    main()
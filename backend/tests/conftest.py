@@ -1,4 +1,5 @@
 import pytest
+from flask_jwt_extended import create_access_token
 from backend.app import create_app
 from backend.app.extensions import db
 from backend.app.models import User
@@ -30,4 +31,46 @@ def client(app):
 
 @pytest.fixture
 def new_user():
-    return User(username="testuser", email="test@example.com", role="Employee", password="SecureP@ssw0rd")
\ No newline at end of file
+    return User(username="testuser", email="test@example.com", role="Employee", password="SecureP@ssw0rd")
+@pytest.fixture
+def app_config():
+    """Extra create_app config for memory_app; override in a module to change it."""
+    return {}
+
+@pytest.fixture
+def memory_app(app_config):
+    """
+    An app on an in-memory database with an admin (id 1) and an employee (id 2).
+
+    Modules seed their own data on top by overriding app:
+
+        @pytest.fixture
+        def app(memory_app):
+            db.session.add(...)
+            db.session.commit()
+            return memory_app
+    """
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:", **app_config})
+    with app.app_context():
+        db.create_all()
+        admin = User(username="admin", email="admin@example.com", role="Admin")
+        admin.set_password("Admin@1234")
+        employee = User(username="employee", email="employee@example.com", role="Employee")
+        employee.set_password("Employee@1234")
+        db.session.add_all([admin, employee])
+        db.session.commit()
+
+        yield app
+
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def admin_headers(app):
+    """Authorization headers for the seeded admin."""
+    return {"Authorization": f"Bearer {create_access_token(identity={'id': 1, 'role': 'Admin'})}"}
+
+@pytest.fixture
+def employee_headers(app):
+    """Authorization headers for the seeded employee."""
+    return {"Authorization": f"Bearer {create_access_token(identity={'id': 2, 'role': 'Employee'})}"}
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import update
+from backend.app import db
+from backend.app.models import Location
+from backend.app.services import change_tracking
+from backend.app.services.change_tracking import track_changes
+
+
+@pytest.fixture
+def seen(memory_app):
+    """A tracker on locations recording what it is handed; removed afterwards."""
+    seen = {'applied': [], 'discarded': []}
+    tracker = track_changes('test_locations', {Location.__tablename__}, seen['applied'].append,
+                            discard=seen['discarded'].append)
+    yield seen
+    change_tracking._trackers.remove(tracker)
+
+
+def test_changes_are_handed_over_after_commit(seen):
+    db.session.add(Location(name="Office", latitude=40.0, longitude=-74.0, radius=0.5))
+    db.session.flush()
+    assert seen['applied'] == []
+    db.session.commit()
+    assert seen['applied'] == [{'changed': True}]
+
+    db.session.execute(update(Location).values(radius=1.0))
+    db.session.commit()
+    assert seen['applied'][-1] == {'all': True}
+
+
+def test_rollback_discards_changes(seen):
+    db.session.add(Location(name="Office", latitude=40.0, longitude=-74.0, radius=0.5))
+    db.session.flush()
+    db.session.rollback()
+    assert seen == {'applied': [], 'discarded': [{'changed': True}]}
+
+    db.session.commit()
+    assert seen['applied'] == []
@@ -0,0 +1,50 @@
+import pytest
+from backend.app import db
+from backend.app.models import Location, CheckIn
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with a warehouse and a depot."""
+    db.session.add(Location(name="Warehouse", latitude=40.7128, longitude=-74.0060, radius=0.5))
+    db.session.add(Location(name="Depot", latitude=40.7549, longitude=-73.9840, radius=0.5))
+    db.session.commit()
+    return memory_app
+
+
+def test_batch_records_verified_punches(client, employee_headers):
+    response = client.post('/checkins/batch', json={"punches": [
+        {"latitude": 40.7128, "longitude": -74.0060, "location_id": 1,
+         "check_type": "in", "timestamp": "2024-05-01T08:58:00Z"},
+        {"latitude": 40.7550, "longitude": -73.9841,
+         "check_type": "out", "timestamp": "2024-05-01T17:02:00+00:00"},
+        {"latitude": 40.80, "longitude": -74.0060, "location_id": 1},
+        {"latitude": 40.7128, "longitude": -74.0060, "location_id": 999},
+        {"latitude": "north", "longitude": -74.0060},
+        {"latitude": 40.7128, "longitude": -74.0060, "timestamp": "2999-01-01T00:00:00Z"},
+    ]}, headers=employee_headers)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["recorded"] == 2
+    assert body["rejected"] == 4
+
+    results = body["results"]
+    assert [r["success"] for r in results] == [True, True, False, False, False, False]
+    assert results[1]["location_id"] == 2
+    assert "outside the allowed radius" in results[2]["error"]
+    assert "Invalid location ID" in results[3]["error"]
+    assert "in the future" in results[5]["error"]
+
+    stored = CheckIn.query.order_by(CheckIn.timestamp).all()
+    assert [(c.location_id, c.check_type, c.timestamp.hour) for c in stored] == [(1, "in", 8), (2, "out", 17)]
+    assert all(c.is_verified for c in stored)
+
+
+def test_batch_rejects_empty_and_oversized(app, client, employee_headers):
+    response = client.post('/checkins/batch', json={"punches": []}, headers=employee_headers)
+    assert response.status_code == 400
+
+    app.config["CHECKIN_BATCH_MAX_SIZE"] = 2
+    response = client.post('/checkins/batch', json=[{"latitude": 0, "longitude": 0}] * 3, headers=employee_headers)
+    assert response.status_code == 413
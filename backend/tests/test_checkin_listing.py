@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from backend.app import db
+from backend.app.models import Location, CheckIn
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with five days of check-ins by both users."""
+    db.session.add(Location(name="Office", latitude=40.7128, longitude=-74.0060, radius=0.5))
+    db.session.commit()
+
+    base = datetime(2024, 5, 1, 9, 0)
+    rows = []
+    for day in range(5):
+        for user_id in (1, 2):
+            # Two punches share each timestamp to exercise the id tie-breaker
+            rows.append(CheckIn(user_id=user_id, location_id=1, latitude=40.7128, longitude=-74.0060,
+                                timestamp=base + timedelta(days=day), is_verified=True, check_type='in'))
+    db.session.add_all(rows)
+    db.session.commit()
+    return memory_app
+
+
+def test_keyset_pages_cover_all_rows_once(client, admin_headers):
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        query = {"limit": 3}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get('/checkins/', query_string=query, headers=admin_headers)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= 3
+        seen.extend(page)
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+
+    assert pages == 4
+    assert len({c["id"] for c in seen}) == 10
+    keys = [(c["timestamp"], c["id"]) for c in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters_by_user_and_date_range(client, admin_headers):
+    response = client.get('/checkins/', query_string={
+        "user_id": 2, "start_date": "2024-05-02", "end_date": "2024-05-03"
+    }, headers=admin_headers)
+    rows = response.get_json()
+    assert len(rows) == 2
+    assert {r["user_id"] for r in rows} == {2}
+    assert response.headers.get('X-Next-Cursor') is None
+
+
+def test_invalid_cursor_and_dates(client, admin_headers):
+    assert client.get('/checkins/?cursor=bogus', headers=admin_headers).status_code == 400
+    assert client.get('/checkins/?start_date=yesterday', headers=admin_headers).status_code == 400
+
+
+def test_ndjson_stream(client, admin_headers):
+    response = client.get('/checkins/', query_string={"format": "ndjson", "location_id": 1},
+                          headers=admin_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 10
+    assert lines[0]["timestamp"].startswith("2024-05-05")
@@ -0,0 +1,125 @@
+import json
+from datetime import datetime
+
+import pytest
+from backend.app import db
+from backend.app.models import Location, CheckIn
+from backend.app.services.checkin_queue import (
+    CheckInWriteBehindQueue, QueueFullError, _claim_journal_slot, get_checkin_queue
+)
+
+
+@pytest.fixture
+def app_config():
+    """Write-behind queue enabled (in-memory durability)."""
+    return {
+        "CHECKIN_WRITE_BEHIND": True,
+        "CHECKIN_QUEUE_DURABILITY": "memory",
+        "CHECKIN_QUEUE_FLUSH_INTERVAL": 0.01,
+    }
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with an office; stops the queue afterwards."""
+    db.session.add(Location(name="Office", latitude=40.7128, longitude=-74.0060, radius=0.5))
+    db.session.commit()
+
+    yield memory_app
+
+    get_checkin_queue(memory_app).stop()
+
+
+def _row(minute):
+    return {
+        'user_id': 2, 'location_id': 1, 'latitude': 40.7128, 'longitude': -74.0060,
+        'timestamp': datetime(2024, 5, 1, 9, minute), 'is_verified': True, 'check_type': 'in'
+    }
+
+
+def test_check_in_is_queued_and_group_committed(app, client, admin_headers, employee_headers):
+    for _ in range(3):
+        response = client.post('/checkins/', json={"latitude": 40.7128, "longitude": -74.0060},
+                               headers=employee_headers)
+        assert response.status_code == 202
+        assert response.get_json()["queued"] is True
+
+    checkin_queue = get_checkin_queue(app)
+    checkin_queue.flush()
+    assert CheckIn.query.count() == 3
+
+    metrics = checkin_queue.metrics()
+    assert metrics["depth"] == 0
+    assert metrics["flushed"] == 3
+    assert metrics["flushes"] >= 1
+    assert metrics["avg_flush_ms"] is not None
+
+    response = client.get('/checkins/queue/metrics', headers=admin_headers)
+    assert response.get_json()["enabled"] is True
+    assert client.get('/checkins/queue/metrics', headers=employee_headers).status_code == 403
+
+
+def test_backpressure_when_full(app):
+    checkin_queue = CheckInWriteBehindQueue(app, max_size=1, durability='memory', put_timeout=0.01)
+    checkin_queue.submit(_row(0))
+    with pytest.raises(QueueFullError):
+        checkin_queue.submit(_row(1))
+    assert checkin_queue.metrics()["rejected"] == 1
+    checkin_queue.flush()
+    assert CheckIn.query.count() == 1
+
+
+def test_journal_replayed_after_crash(app, tmp_path):
+    journal = str(tmp_path / "checkins.journal")
+    crashed = CheckInWriteBehindQueue(app, durability='journal', journal_path=journal, flush_interval=0.01)
+    crashed.start()
+    # Stop the worker without flushing so acknowledged punches only live in the journal
+    crashed._stop.set()
+    crashed._thread.join()
+    crashed.submit(_row(0))
+    crashed.submit(_row(1))
+    assert CheckIn.query.count() == 0
+    crashed._journal_lock.close()  # The lock dies with the crashed process
+
+    recovered = CheckInWriteBehindQueue(app, durability='journal', journal_path=journal)
+    recovered.start()
+    assert CheckIn.query.count() == 2
+    recovered.stop()
+
+    # The journal is compacted once everything in it is committed
+    with open(journal) as fh:
+        assert fh.read() == ""
+
+
+def test_each_process_needs_its_own_journal(app, tmp_path):
+    journal = str(tmp_path / "checkins.journal")
+    running = CheckInWriteBehindQueue(app, durability='journal', journal_path=journal)
+    running.start()
+    with pytest.raises(RuntimeError):
+        CheckInWriteBehindQueue(app, durability='journal', journal_path=journal).start()
+    running.stop()
+
+    first, first_lock = _claim_journal_slot(str(tmp_path))
+    second, second_lock = _claim_journal_slot(str(tmp_path))
+    assert (first, second) == (str(tmp_path / "checkin_queue.0.journal"), str(tmp_path / "checkin_queue.1.journal"))
+    first_lock.close()
+    assert _claim_journal_slot(str(tmp_path))[0] == first
+    second_lock.close()
+
+
+def test_failed_batch_is_dead_lettered_and_journal_compacts(app, tmp_path):
+    journal = str(tmp_path / "checkins.journal")
+    checkin_queue = CheckInWriteBehindQueue(app, durability='journal', journal_path=journal, flush_interval=0.01)
+    checkin_queue.start()
+    checkin_queue.submit(dict(_row(0), user_id=None))  # Violates NOT NULL on every attempt
+    checkin_queue.flush()
+    assert checkin_queue.metrics()["dead_lettered"] == 1
+    with open(journal + ".failed") as fh:
+        assert [json.loads(line)["row"]["user_id"] for line in fh] == [None]
+
+    checkin_queue.submit(_row(1))
+    checkin_queue.flush()
+    checkin_queue.stop()
+    assert CheckIn.query.count() == 1
+    with open(journal) as fh:
+        assert fh.read() == ""
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from backend.app import create_app, db
+from backend.app.models import Location, User
+from backend.app.services.work_sessions import record_punches
+
+
+def _seed_activity(user_id):
+    """Three sites and a six-hour shift at Site 1 yesterday."""
+    db.session.add_all([Location(name=f"Site {i}", latitude=40.0 + i, longitude=-74.0, radius=0.5)
+                        for i in range(3)])
+    db.session.commit()
+
+    start = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    record_punches([
+        {'user_id': user_id, 'location_id': 2, 'latitude': 41.0, 'longitude': -74.0, 'timestamp': start,
+         'is_verified': True, 'check_type': 'in'},
+        {'user_id': user_id, 'location_id': 2, 'latitude': 41.0, 'longitude': -74.0,
+         'timestamp': start + timedelta(hours=6), 'is_verified': True, 'check_type': 'out'},
+    ])
+    db.session.commit()
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with the employee's shift yesterday."""
+    _seed_activity(user_id=2)
+    return memory_app
+
+
+def _without_clock(data):
+    """Drop the mock values that follow the wall clock."""
+    data["employee"].pop("joinDate")
+    data["activity"] = [entry for entry in data["activity"] if entry["type"] != "payroll"]
+    return data
+
+
+def test_bootstrap_matches_the_individual_endpoints(client, employee_headers):
+    today = datetime.now()
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        response = client.get('/dashboard/bootstrap', query_string={"limit": 5}, headers=employee_headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert sum('FROM users' in statement for statement in statements) == 1
+    data = response.get_json()
+    assert data["cache"]["earnings"] == {"maxAge": 60}
+    assert "errors" not in data
+
+    separate = {
+        "employee": client.get('/dashboard/employee', headers=employee_headers),
+        "earnings": client.get('/dashboard/earnings', headers=employee_headers),
+        "activity": client.get('/dashboard/activity/recent', query_string={"limit": 5}, headers=employee_headers),
+        "schedule": client.get(f'/dashboard/schedule/{today.year}/{today.month}', headers=employee_headers),
+        "locations": client.get('/locations/', headers=employee_headers),
+    }
+    assert separate["earnings"].headers["Cache-Control"] == "private, max-age=60"
+    expected = {name: response.get_json() for name, response in separate.items()}
+    assert _without_clock(dict(data, cache=None)) == _without_clock(dict(expected, cache=None))
+    assert data["earnings"]["hoursThisPeriod"] > 0 or today.day == 1
+    assert [entry["location"] for entry in data["activity"][:2]] == ["Site 1", "Site 1"]
+
+
+def test_bootstrap_sections_subset(client, employee_headers):
+    response = client.get('/dashboard/bootstrap', query_string={"sections": "employee,locations"},
+                          headers=employee_headers)
+    assert response.headers["Cache-Control"] == "private, max-age=300"
+
+    response = client.get('/dashboard/bootstrap', query_string={"sections": "schedule,locations",
+                                                               "year": 2024, "month": 2}, headers=employee_headers)
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    data = response.get_json()
+    assert set(data) == {"schedule", "locations", "cache"}
+    assert len(data["schedule"]) == 29
+
+    assert client.get('/dashboard/bootstrap', query_string={"sections": "payroll"},
+                      headers=employee_headers).status_code == 400
+    assert client.get('/dashboard/bootstrap', query_string={"month": 13}, headers=employee_headers).status_code == 400
+
+
+def test_bootstrap_runs_sections_concurrently(tmp_path):
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'dashboard.db'}",
+                      "DASHBOARD_BOOTSTRAP_WORKERS": 4})
+    with app.app_context():
+        db.create_all()
+        employee = User(username="employee", email="employee@example.com", role="Employee")
+        employee.set_password("Employee@1234")
+        db.session.add(employee)
+        db.session.commit()
+        _seed_activity(user_id=employee.id)
+        headers = {"Authorization": f"Bearer {create_access_token(identity={'id': employee.id, 'role': 'Employee'})}"}
+        client = app.test_client()
+        serial = client.get('/dashboard/employee', headers=headers).get_json()
+
+        data = client.get('/dashboard/bootstrap', headers=headers).get_json()
+        assert "dashboard_pool" in app.extensions
+        assert "errors" not in data
+        assert data["employee"]["name"] == serial["name"]
+        assert [location["name"] for location in data["locations"]] == ["Site 0", "Site 1", "Site 2"]
+        assert data["activity"][0]["type"] == "check-out"
+
+        app.extensions.pop("dashboard_pool").shutdown()
+        db.session.remove()
@@ -0,0 +1,57 @@
+# backend/tests/test_geo.py
+import numpy as np
+import pytest
+from geopy.distance import geodesic, great_circle
+from backend.app.services.geo import (
+    distance_matrix_km, haversine_km, haversine_scalar_km, vincenty_km, within_radius
+)
+
+
+@pytest.fixture
+def random_pairs():
+    rng = np.random.default_rng(42)
+    n = 500
+    return (rng.uniform(-80, 80, n), rng.uniform(-180, 180, n),
+            rng.uniform(-80, 80, n), rng.uniform(-180, 180, n))
+
+
+def test_vincenty_matches_geopy_geodesic(random_pairs):
+    lat1, lon1, lat2, lon2 = random_pairs
+    ours = vincenty_km(lat1, lon1, lat2, lon2)
+    expected = np.array([geodesic((a, b), (c, d)).km for a, b, c, d in zip(lat1, lon1, lat2, lon2)])
+    # Sub-meter agreement everywhere, including short geofence-scale distances
+    assert np.max(np.abs(ours - expected)) < 1e-3
+
+
+def test_vincenty_short_distances_and_coincident_points():
+    lat = np.array([40.7128, 40.7128, 0.0])
+    lon = np.array([-74.0060, -74.0060, 0.0])
+    lat2 = np.array([40.7128, 40.7138, 0.0])
+    lon2 = np.array([-74.0060, -74.0060, 0.001])
+    ours = vincenty_km(lat, lon, lat2, lon2)
+    assert ours[0] == 0.0
+    assert ours[1] == pytest.approx(geodesic((lat[1], lon[1]), (lat2[1], lon2[1])).km, abs=1e-6)
+    assert ours[2] == pytest.approx(geodesic((0.0, 0.0), (0.0, 0.001)).km, abs=1e-6)
+
+
+def test_haversine_matches_geopy_great_circle(random_pairs):
+    lat1, lon1, lat2, lon2 = random_pairs
+    ours = haversine_km(lat1, lon1, lat2, lon2)
+    expected = np.array([great_circle((a, b), (c, d)).km for a, b, c, d in zip(lat1, lon1, lat2, lon2)])
+    # geopy uses a slightly different mean radius; relative error stays tiny
+    assert np.max(np.abs(ours - expected) / np.maximum(expected, 1e-9)) < 1e-4
+    assert haversine_scalar_km(lat1[0], lon1[0], lat2[0], lon2[0]) == pytest.approx(ours[0])
+
+
+def test_distance_matrix_shape_and_geofence_check():
+    points = [(40.7128, -74.0060), (34.0522, -118.2437), (51.5074, -0.1278)]
+    sites = [(40.7128, -74.0060), (34.0522, -118.2437)]
+    matrix = distance_matrix_km(points, sites, method='vincenty')
+    assert matrix.shape == (3, 2)
+    assert matrix[0, 0] == 0.0 and matrix[1, 1] == 0.0
+    assert matrix[0, 1] == pytest.approx(geodesic(points[0], sites[1]).km, abs=1e-3)
+
+    distances, inside = within_radius([40.7128, 40.80], [-74.0060, -74.0060],
+                                      [40.7128, 40.7128], [-74.0060, -74.0060], [0.5, 0.5])
+    assert inside.tolist() == [True, False]
+    assert distances[1] > 9
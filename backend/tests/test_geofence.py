@@ -0,0 +1,73 @@
+import pytest
+from backend.app import db
+from backend.app.models import Location
+from backend.app.services.geofence import GeofenceIndex, GeofenceSite, get_geofence_index
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with two Manhattan locations."""
+    db.session.add(Location(name="Downtown", latitude=40.7128, longitude=-74.0060, radius=0.5))
+    db.session.add(Location(name="Midtown", latitude=40.7549, longitude=-73.9840, radius=0.5))
+    db.session.commit()
+    return memory_app
+
+
+def test_index_resolves_nearest_containing_site():
+    index = GeofenceIndex([
+        GeofenceSite(1, "A", 40.0, -74.0, 1.0),
+        GeofenceSite(2, "B", 40.005, -74.0, 1.0),
+        GeofenceSite(3, "Far", 41.0, -74.0, 1.0),
+    ])
+
+    site, distance = index.nearest(40.004, -74.0)
+    assert site.id == 2
+    assert distance < 0.2
+
+    # Far site never makes it past the grid / bounding-box prefilter
+    assert [s.id for s in index.candidates(40.0, -74.0)] == [1, 2]
+
+    assert index.nearest(45.0, -74.0) == (None, None)
+
+
+def test_index_large_radius_spans_cells():
+    index = GeofenceIndex([GeofenceSite(1, "Campus", 10.0, 10.0, 20.0)], cell_size=0.05)
+    site, distance = index.nearest(10.15, 10.0)
+    assert site.id == 1
+    assert distance == pytest.approx(16.68, abs=0.05)
+
+
+def test_check_in_without_location_id(client, employee_headers):
+    response = client.post('/checkins/', json={
+        "latitude": 40.7550,
+        "longitude": -73.9841
+    }, headers=employee_headers)
+    assert response.status_code == 201
+    assert response.get_json()["location_id"] == 2
+
+
+def test_check_in_outside_all_geofences(client, employee_headers):
+    response = client.post('/checkins/', json={
+        "latitude": 34.0522,
+        "longitude": -118.2437
+    }, headers=employee_headers)
+    assert response.status_code == 400
+    assert "not within any registered location" in response.get_json()["error"]
+
+
+def test_index_invalidated_on_location_write(app):
+    assert len(get_geofence_index()) == 2
+    db.session.add(Location(name="Uptown", latitude=40.8, longitude=-73.95, radius=0.5))
+    db.session.commit()
+    index = get_geofence_index()
+    assert len(index) == 3
+    assert index.nearest(40.8, -73.95)[0].name == "Uptown"
+
+
+def test_index_ignores_rolled_back_locations(app):
+    assert len(get_geofence_index()) == 2
+    db.session.add(Location(name="Uptown", latitude=40.8, longitude=-73.95, radius=0.5))
+    db.session.flush()
+    assert len(get_geofence_index()) == 2
+    db.session.rollback()
+    assert len(get_geofence_index()) == 2
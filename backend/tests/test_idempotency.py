@@ -0,0 +1,78 @@
+import time
+import uuid
+
+import pytest
+from backend.app import db
+from backend.app.models import Location, CheckIn
+from backend.app.middleware.idempotency import TTLCache
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with an office."""
+    db.session.add(Location(name="Office", latitude=40.7128, longitude=-74.0060, radius=0.5))
+    db.session.commit()
+    return memory_app
+
+
+@pytest.fixture
+def headers(employee_headers):
+    """employee_headers with a fresh Idempotency-Key."""
+    return {**employee_headers, "Idempotency-Key": str(uuid.uuid4())}
+
+
+PUNCH = {"latitude": 40.7128, "longitude": -74.0060, "location_id": 1}
+
+
+def test_retry_replays_stored_response(client, headers):
+    first = client.post('/checkins/', json=PUNCH, headers=headers)
+    retry = client.post('/checkins/', json=PUNCH, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers.get('Idempotent-Replayed') == 'true'
+    assert 'Idempotent-Replayed' not in first.headers
+    assert CheckIn.query.count() == 1
+
+
+def test_key_reused_with_different_body(client, headers):
+    client.post('/checkins/', json=PUNCH, headers=headers)
+    response = client.post('/checkins/', json={**PUNCH, "check_type": "out"}, headers=headers)
+    assert response.status_code == 422
+    assert CheckIn.query.count() == 1
+
+
+def test_requests_without_key_are_not_deduplicated(client, headers):
+    del headers["Idempotency-Key"]
+    client.post('/checkins/', json=PUNCH, headers=headers)
+    client.post('/checkins/', json=PUNCH, headers=headers)
+    assert CheckIn.query.count() == 2
+
+
+def test_ttl_cache_expiry_and_lru_eviction():
+    cache = TTLCache(max_entries=2)
+    assert cache.add("a", 1, ttl=60)
+    assert not cache.add("a", 2, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")              # touch "a" so "b" is least recently used
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    cache.set("short", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+
+
+def test_batch_skips_punches_already_accepted(client, headers, employee_headers):
+    single = client.post('/checkins/', json=PUNCH, headers=headers)
+    assert single.status_code == 201
+
+    response = client.post('/checkins/batch', headers=employee_headers, json={"punches": [
+        {**PUNCH, "timestamp": "2024-05-01T08:58:00Z", "idempotency_key": headers["Idempotency-Key"]},
+        {**PUNCH, "check_type": "out", "timestamp": "2024-05-01T17:02:00Z", "idempotency_key": str(uuid.uuid4())},
+    ]})
+    data = response.get_json()
+    assert (data["recorded"], data["rejected"]) == (1, 0)
+    assert data["results"][0] == {"index": 0, "success": True, "duplicate": True}
+    assert CheckIn.query.count() == 2
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from backend.app import db
+from backend.app.models import Invoice, User, WorkSession
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with contractors 2-6 (the seeded employee among them) and an employee, 7."""
+    db.session.get(User, 2).role = "Contractor"
+    for i in range(1, 5):
+        contractor = User(username=f"contractor{i}", email=f"contractor{i}@example.com", role="Contractor")
+        contractor.set_password("Contractor@1234")
+        db.session.add(contractor)
+    employee = User(username="staff", email="staff@example.com", role="Employee")
+    employee.set_password("Employee@1234")
+    db.session.add(employee)
+    db.session.commit()
+
+    # Contractors 2-5 and the employee worked; contractor 6 did not
+    for user_id in (2, 3, 4, 5, 7):
+        start = datetime(2024, 4, 2, 9)
+        db.session.add(WorkSession(user_id=user_id, location_id=1, start_time=start,
+                                   end_time=start + timedelta(hours=user_id),
+                                   duration_hours=float(user_id), status='closed'))
+    db.session.commit()
+    return memory_app
+
+
+@pytest.fixture
+def contractor_headers(app):
+    return {"Authorization": f"Bearer {create_access_token(identity={'id': 2, 'role': 'Contractor'})}"}
+
+
+PERIOD = {"start_date": "2024-04-01", "end_date": "2024-04-30"}
+
+
+def test_generate_invoices_in_one_insert(client, admin_headers, contractor_headers):
+    client.post('/payroll/runs', json=PERIOD, headers=admin_headers)
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        response = client.post('/invoices/generate', json=PERIOD, headers=admin_headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert response.status_code == 201
+    assert response.get_json()["created"] == 4
+    assert sum(statement.lstrip().upper().startswith("INSERT INTO INVOICES") for statement in statements) == 1
+
+    invoices = {invoice.user_id: invoice for invoice in Invoice.query}
+    assert sorted(invoices) == [2, 3, 4, 5]
+    assert invoices[3].amount == 3 * 15 and invoices[3].status == 'Pending'
+    assert str(invoices[3].period_end) == "2024-04-30"
+
+    # Closing the period again does not duplicate invoices
+    response = client.post('/invoices/generate', json=PERIOD, headers=admin_headers)
+    assert response.get_json()["created"] == 0
+    assert client.post('/invoices/generate', json=PERIOD, headers=contractor_headers).status_code == 403
+
+
+def test_bulk_status_transitions(client, admin_headers):
+    client.post('/invoices/generate', json=PERIOD, headers=admin_headers)
+    ids = [invoice.id for invoice in Invoice.query.order_by(Invoice.id)]
+
+    response = client.post('/invoices/status', json={"status": "Approved", "ids": ids[:3]}, headers=admin_headers)
+    assert response.get_json()["updated"] == 3
+    # Only approved invoices can be paid
+    response = client.post('/invoices/status', json={"status": "Paid", **PERIOD}, headers=admin_headers)
+    assert response.get_json()["updated"] == 3
+    assert sorted(invoice.status for invoice in Invoice.query) == ['Paid', 'Paid', 'Paid', 'Pending']
+
+    assert client.post('/invoices/status', json={"status": "Paid"}, headers=admin_headers).status_code == 400
+    assert client.post('/invoices/status', json={"status": "Lost", "ids": ids},
+                       headers=admin_headers).status_code == 400
+
+
+def test_list_invoices_pages_with_cursor(client, admin_headers, contractor_headers):
+    client.post('/invoices/generate', json=PERIOD, headers=admin_headers)
+
+    seen = []
+    query = {"limit": 3, "status": "Pending"}
+    while True:
+        response = client.get('/invoices/', query_string=query, headers=admin_headers)
+        assert response.status_code == 200
+        seen.extend(invoice["id"] for invoice in response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        query["cursor"] = cursor
+    assert seen == [4, 3, 2, 1]
+
+    own = client.get('/invoices/', query_string={"user_id": 3}, headers=contractor_headers).get_json()
+    assert [invoice["user_id"] for invoice in own] == [2]
+    assert client.get('/invoices/', query_string={"cursor": "bad"}, headers=admin_headers).status_code == 400
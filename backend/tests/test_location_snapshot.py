@@ -0,0 +1,86 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from backend.app import create_app, db
+from backend.app.models import Location
+from backend.app.services.geofence import get_geofence_index
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with three sites."""
+    db.session.add_all([Location(name=f"Site {i}", latitude=40.0 + i, longitude=-74.0, radius=0.5)
+                        for i in range(3)])
+    db.session.commit()
+    return memory_app
+
+
+def _locations(client, headers, etag=None):
+    if etag:
+        headers = dict(headers, **{"If-None-Match": etag})
+    return client.get('/locations/', headers=headers)
+
+
+def test_snapshot_is_served_without_queries(client, admin_headers):
+    first = _locations(client, admin_headers)
+    assert first.status_code == 200
+    assert [location["name"] for location in first.get_json()] == ["Site 0", "Site 1", "Site 2"]
+    assert first.get_json()[0] == {"id": 1, "name": "Site 0", "latitude": 40.0, "longitude": -74.0, "radius": 0.5}
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        again = _locations(client, admin_headers)
+        not_modified = _locations(client, admin_headers, first.headers["ETag"].strip('"'))
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert statements == []
+    assert again.data == first.data
+    assert not_modified.status_code == 304 and not_modified.data == b""
+
+
+def test_writes_replace_the_snapshot(client, admin_headers):
+    etag = _locations(client, admin_headers).headers["ETag"].strip('"')
+
+    response = client.post('/locations/', json={"name": "Depot", "latitude": 42.0, "longitude": -74.0,
+                                                "radius": 1.0}, headers=admin_headers)
+    assert response.status_code == 201
+    response = _locations(client, admin_headers, etag)
+    assert response.status_code == 200
+    assert response.get_json()[-1]["name"] == "Depot"
+
+    client.put('/locations/2', json={"name": "Store"}, headers=admin_headers)
+    assert _locations(client, admin_headers).get_json()[1]["name"] == "Store"
+
+    client.delete('/locations/4', headers=admin_headers)
+    etag = _locations(client, admin_headers).headers["ETag"].strip('"')
+    assert len(_locations(client, admin_headers).get_json()) == 3
+
+    db.session.get(Location, 1).name = "Renamed"
+    db.session.flush()
+    db.session.rollback()
+    assert _locations(client, admin_headers, etag).status_code == 304
+
+
+def test_file_feed_reaches_other_workers(tmp_path):
+    config = {"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'locations.db'}",
+              "LOCATION_FEED_FILE": str(tmp_path / 'feed' / 'locations.version')}
+    worker_a, worker_b = create_app(dict(config)), create_app(dict(config))
+    with worker_a.app_context():
+        db.session.add(Location(name="Site", latitude=40.0, longitude=-74.0, radius=0.5))
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity={'id': 1, 'role': 'Admin'})}"}
+        assert worker_a.test_client().get('/locations/', headers=headers).get_json()[0]["name"] == "Site"
+        assert get_geofence_index().get(1).name == "Site"
+        db.session.remove()
+
+    with worker_b.app_context():
+        db.session.get(Location, 1).name = "Moved"
+        db.session.commit()
+        db.session.remove()
+
+    with worker_a.app_context():
+        assert worker_a.test_client().get('/locations/', headers=headers).get_json()[0]["name"] == "Moved"
+        assert get_geofence_index().get(1).name == "Moved"
+        db.session.remove()
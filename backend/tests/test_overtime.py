@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from backend.app import db
+from backend.app.models import WorkSession
+from backend.app.services.overtime import DEFAULT_RULES, apply_overtime, iso_week_start
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with the employee working 8 hours a day, Monday 2024-02-26 to Saturday 2024-03-02."""
+    for day in range(6):
+        start = datetime(2024, 2, 26, 8) + timedelta(days=day)
+        db.session.add(WorkSession(user_id=2, location_id=1, start_time=start,
+                                   end_time=start + timedelta(hours=8),
+                                   duration_hours=8.0, status='closed'))
+    db.session.commit()
+    return memory_app
+
+
+def _days(*values):
+    return np.array(values, dtype='datetime64[D]')
+
+
+def test_daily_overtime_and_double_time():
+    result = apply_overtime([1, 1], _days('2024-03-04', '2024-03-05'), [10.0, 14.0], [20.0, 20.0])
+    assert result.regular.tolist() == [8.0, 8.0]
+    assert result.overtime.tolist() == [2.0, 4.0]
+    assert result.double_time.tolist() == [0.0, 2.0]
+    assert result.pay.tolist() == [20 * 8 + 30 * 2, 20 * 8 + 30 * 4 + 40 * 2]
+
+
+def test_weekly_overtime_restarts_per_employee_and_week():
+    # Employee 1 works 6 x 8h Monday to Saturday, then Monday of the next week;
+    # employee 2 works 5 x 9h and only crosses the daily threshold
+    employee = [1] * 7 + [2] * 5
+    days = _days('2024-03-04', '2024-03-05', '2024-03-06', '2024-03-07', '2024-03-08', '2024-03-09',
+                 '2024-03-11', '2024-03-04', '2024-03-05', '2024-03-06', '2024-03-07', '2024-03-08')
+    hours = [8.0] * 7 + [9.0] * 5
+    result = apply_overtime(employee, days, hours, [10.0] * 12)
+    assert result.overtime.tolist() == [0, 0, 0, 0, 0, 8, 0] + [1.0] * 5
+    assert result.regular.sum() == 40 + 8 + 5 * 8
+    assert apply_overtime([], [], [], []).pay.tolist() == []
+
+    flat = apply_overtime(employee, days, hours, [10.0] * 12, DEFAULT_RULES._replace(
+        daily_threshold=None, double_threshold=None, weekly_threshold=None
+    ))
+    assert flat.pay.sum() == sum(hours) * 10
+
+
+def test_iso_week_start():
+    assert iso_week_start(_days('2024-03-03', '2024-03-04', '2024-03-10')).tolist() == \
+        _days('2024-02-26', '2024-03-04', '2024-03-04').tolist()
+
+
+def test_payroll_counts_the_week_spanning_the_period_start(client, admin_headers):
+    response = client.get('/payroll/', query_string={"start_date": "2024-03-01", "end_date": "2024-03-31"},
+                          headers=admin_headers)
+    entry = response.get_json()["payroll_data"][1]
+    # Only Fri 1 and Sat 2 March are paid, but the week started on Monday:
+    # Friday brings the week to 40 hours and all of Saturday is overtime
+    assert entry["hours_worked"] == 16.0
+    assert entry["overtime_hours"] == 8.0
+    assert entry["double_time_hours"] == 0.0
+    assert entry["pay"] == 15 * 8 + 22.5 * 8
+
+
+def test_dashboard_earnings_report_engine_overtime(client, employee_headers):
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    db.session.add(WorkSession(user_id=2, location_id=1, start_time=today, end_time=today + timedelta(hours=13),
+                               duration_hours=13.0, status='closed'))
+    db.session.commit()
+
+    data = client.get('/dashboard/earnings', headers=employee_headers).get_json()
+    assert data["overtimeHours"] == 4.0
+    assert data["doubleTimeHours"] == 1.0
+    assert data["currentPay"] == 15 * 8 + 22.5 * 4 + 30 * 1
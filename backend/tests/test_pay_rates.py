@@ -0,0 +1,126 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from backend.app import create_app, db
+from backend.app.models import User, PayRate, WorkSession
+from backend.app.services.pay_rates import RateTable, get_rate_table
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with the employee in Ops and two March work sessions."""
+    db.session.get(User, 2).department = "Ops"
+    for start, hours in ((datetime(2024, 3, 1, 9), 8.0), (datetime(2024, 3, 15, 9), 7.5)):
+        db.session.add(WorkSession(user_id=2, location_id=1, start_time=start,
+                                   end_time=start + timedelta(hours=hours),
+                                   duration_hours=hours, status='closed'))
+    db.session.commit()
+    return memory_app
+
+
+def test_rate_table_precedence_and_intervals():
+    table = RateTable([
+        PayRate(hourly_rate=20, effective_from=date(2024, 1, 1)),
+        PayRate(role='Employee', hourly_rate=22, effective_from=date(2024, 1, 1)),
+        PayRate(department='Ops', hourly_rate=25, effective_from=date(2024, 2, 1), effective_to=date(2024, 2, 29)),
+        PayRate(user_id=7, hourly_rate=40, effective_from=date(2024, 6, 1)),
+        PayRate(user_id=7, hourly_rate=30, effective_from=date(2024, 3, 1), effective_to=date(2024, 5, 31)),
+    ], fallback=15)
+
+    assert table.rate_for(7, 'Ops', 'Employee', date(2023, 12, 31)) == 15
+    assert table.rate_for(7, 'Ops', 'Employee', date(2024, 1, 15)) == 22
+    assert table.rate_for(7, 'Ops', 'Employee', date(2024, 2, 29)) == 25
+    assert table.rate_for(7, 'Ops', 'Employee', date(2024, 5, 31)) == 30
+    assert table.rate_for(7, 'Ops', 'Employee', '2024-06-01') == 40
+    assert table.rate_for(8, 'Sales', 'Admin', datetime(2024, 6, 1, 12)) == 20
+
+
+def test_payroll_pays_each_day_at_its_effective_rate(client, admin_headers):
+    response = client.post('/payroll/rates', json={"hourly_rate": 20, "effective_from": "2024-01-01"},
+                           headers=admin_headers)
+    assert response.status_code == 201
+    response = client.post('/payroll/rates', json={"user_id": 2, "hourly_rate": 30, "effective_from": "2024-03-10"},
+                           headers=admin_headers)
+    assert response.status_code == 201
+    user_rate_id = response.get_json()["id"]
+
+    response = client.post('/payroll/rates', json={"user_id": 2, "hourly_rate": 35, "effective_from": "2024-04-01"},
+                           headers=admin_headers)
+    assert response.status_code == 400 and "Overlaps" in response.get_json()["error"]
+
+    payroll = client.get('/payroll/', headers=admin_headers).get_json()["payroll_data"]
+    assert payroll[1]["pay"] == 8.0 * 20 + 7.5 * 30
+
+    # Editing a rate invalidates the cached table
+    response = client.put(f'/payroll/rates/{user_rate_id}', json={"hourly_rate": 32}, headers=admin_headers)
+    assert response.status_code == 200
+    payroll = client.get('/payroll/', headers=admin_headers).get_json()["payroll_data"]
+    assert payroll[1]["pay"] == 8.0 * 20 + 7.5 * 32
+
+    assert client.delete(f'/payroll/rates/{user_rate_id}', headers=admin_headers).status_code == 200
+    payroll = client.get('/payroll/', headers=admin_headers).get_json()["payroll_data"]
+    assert payroll[1]["pay"] == 15.5 * 20
+
+
+def test_rate_change_recomputes_stored_runs(client, admin_headers):
+    period = {"start_date": "2024-03-01", "end_date": "2024-03-31"}
+    client.post('/payroll/runs', json=period, headers=admin_headers)
+    assert client.post('/payroll/runs', json=period, headers=admin_headers).get_json()["recomputed"] == 0
+
+    client.post('/payroll/rates', json={"department": "Ops", "hourly_rate": 18, "effective_from": "2024-01-01"},
+                headers=admin_headers)
+    assert client.post('/payroll/runs', json=period, headers=admin_headers).get_json()["recomputed"] == 2
+
+    rows = client.get('/payroll/runs', query_string=period, headers=admin_headers).get_json()["payroll_data"]
+    assert rows[1]["pay"] == 15.5 * 18
+
+
+def test_rate_validation(client, admin_headers):
+    response = client.post('/payroll/rates', json={"user_id": 2, "role": "Employee", "hourly_rate": 20,
+                                                  "effective_from": "2024-01-01"}, headers=admin_headers)
+    assert response.status_code == 400
+    response = client.post('/payroll/rates', json={"hourly_rate": 20, "effective_from": "2024-02-01",
+                                                  "effective_to": "2024-01-01"}, headers=admin_headers)
+    assert response.status_code == 400
+    response = client.post('/payroll/rates', json={"hourly_rate": "abc", "effective_from": "2024-01-01"},
+                           headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_dashboard_earnings_use_effective_rate(client, employee_headers):
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    db.session.add(WorkSession(user_id=2, location_id=1, start_time=today, end_time=today + timedelta(hours=4),
+                               duration_hours=4.0, status='closed'))
+    db.session.add(PayRate(user_id=2, hourly_rate=28, effective_from=date(2020, 1, 1)))
+    db.session.commit()
+
+    data = client.get('/dashboard/earnings', headers=employee_headers).get_json()
+    assert data["hourlyRate"] == 28
+    assert data["hoursThisPeriod"] == 4.0
+    assert data["currentPay"] == 4.0 * 28
+
+
+def test_uncommitted_rates_do_not_outlive_a_rollback(app):
+    db.session.add(PayRate(hourly_rate=99, effective_from=date(2024, 1, 1)))
+    db.session.flush()
+    assert get_rate_table().rate_for(2, 'Ops', 'Employee', date(2024, 3, 1)) == 99
+    db.session.rollback()
+    assert get_rate_table().rate_for(2, 'Ops', 'Employee', date(2024, 3, 1)) == 15
+
+
+def test_other_workers_rate_writes_rebuild_the_table(tmp_path):
+    config = {"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'rates.db'}"}
+    worker_a, worker_b = create_app(dict(config)), create_app(dict(config))
+    with worker_a.app_context():
+        db.create_all()
+        assert get_rate_table().rate_for(1, None, 'Employee', date(2024, 3, 1)) == 15
+        db.session.remove()
+
+    with worker_b.app_context():
+        db.session.add(PayRate(role='Employee', hourly_rate=21, effective_from=date(2024, 1, 1)))
+        db.session.commit()
+        db.session.remove()
+
+    with worker_a.app_context():
+        assert get_rate_table().rate_for(1, None, 'Employee', date(2024, 3, 1)) == 21
+        db.session.remove()
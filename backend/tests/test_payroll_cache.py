@@ -0,0 +1,96 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import update
+from backend.app import create_app, db
+from backend.app.models import CheckIn, Location, PayRate, User, WorkSession
+from backend.app.services.payroll_cache import get_payroll_cache
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with a six-hour work session for the employee."""
+    start = datetime(2024, 6, 3, 9)
+    db.session.add(WorkSession(user_id=2, location_id=1, start_time=start, end_time=start + timedelta(hours=6),
+                               duration_hours=6.0, status='closed'))
+    db.session.commit()
+    return memory_app
+
+
+def _pay(client, headers, **query):
+    response = client.get('/payroll/', query_string=query, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()["payroll_data"][1]["pay"]
+
+
+def test_unchanged_data_is_served_from_cache(client, admin_headers):
+    cache = get_payroll_cache()
+    assert _pay(client, admin_headers) == 90.0
+    assert _pay(client, admin_headers) == 90.0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Filters are part of the key
+    _pay(client, admin_headers, start_date="2024-06-01", end_date="2024-06-30")
+    assert cache.misses == 2
+
+    # Writes to tables payroll does not read leave the version alone
+    version = cache.version()
+    db.session.add(Location(name="Office", latitude=0, longitude=0, radius=1))
+    db.session.commit()
+    assert cache.version() == version
+    _pay(client, admin_headers)
+    assert cache.hits == 2
+
+
+def test_tracked_writes_invalidate(client, admin_headers):
+    cache = get_payroll_cache()
+    _pay(client, admin_headers)
+
+    # Unit-of-work write
+    version = cache.version()
+    db.session.add(CheckIn(user_id=2, location_id=1, latitude=0, longitude=0, check_type='in'))
+    db.session.commit()
+    assert cache.version() > version
+
+    # Bulk UPDATE through the session
+    db.session.execute(update(WorkSession).values(duration_hours=8.0))
+    db.session.commit()
+    assert _pay(client, admin_headers) == 120.0
+
+    # Rate change through the API
+    client.post('/payroll/rates', json={"hourly_rate": 20, "effective_from": "2024-01-01"}, headers=admin_headers)
+    assert _pay(client, admin_headers) == 160.0
+
+    db.session.add(PayRate(user_id=2, hourly_rate=25, effective_from=date(2024, 6, 1)))
+    db.session.rollback()
+    assert _pay(client, admin_headers) == 160.0
+    assert cache.misses == 3
+
+
+def test_other_workers_writes_invalidate(tmp_path):
+    config = {"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'payroll.db'}"}
+    worker_a, worker_b = create_app(dict(config)), create_app(dict(config))
+    with worker_a.app_context():
+        admin = User(username="admin", email="admin@example.com", role="Admin")
+        admin.set_password("Admin@1234")
+        employee = User(username="employee", email="employee@example.com", role="Employee")
+        employee.set_password("Employee@1234")
+        db.session.add_all([admin, employee])
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity={'id': 1, 'role': 'Admin'})}"}
+        assert _pay(worker_a.test_client(), headers) == 0
+        assert _pay(worker_a.test_client(), headers) == 0
+        assert get_payroll_cache().hits == 1
+        db.session.remove()
+
+    with worker_b.app_context():
+        start = datetime(2024, 6, 3, 9)
+        db.session.add(WorkSession(user_id=2, location_id=1, start_time=start, end_time=start + timedelta(hours=6),
+                                   duration_hours=6.0, status='closed'))
+        db.session.commit()
+        db.session.remove()
+
+    with worker_a.app_context():
+        assert _pay(worker_a.test_client(), headers) == 90.0
+        db.session.remove()
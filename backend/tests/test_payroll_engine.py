@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from backend.app import db
+from backend.app.models import User, WorkSession
+from backend.app.services.pay_rates import get_rate_table
+from backend.app.services.payroll_engine import compute_payroll
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with three more employees (alice 3, bob 4, carol 5); alice and bob worked in March 2024."""
+    for name in ("alice", "bob", "carol"):
+        user = User(username=name, email=f"{name}@example.com", role="Employee")
+        user.set_password("Password@1234")
+        db.session.add(user)
+    db.session.commit()
+
+    def session(user_id, day, hours, status='closed'):
+        start = datetime(2024, 3, day, 9)
+        return WorkSession(user_id=user_id, location_id=1, start_time=start,
+                           end_time=start + timedelta(hours=hours),
+                           duration_hours=hours if status == 'closed' else None, status=status)
+
+    db.session.add_all([
+        session(3, 1, 8), session(3, 15, 7.5), session(3, 31, 4),
+        session(4, 10, 6), session(4, 11, 9, status='unmatched'),
+    ])
+    db.session.commit()
+    return memory_app
+
+
+def test_compute_payroll_includes_users_without_sessions(app):
+    result = {row['username']: row for row in compute_payroll()}
+    assert result['alice']['hours_worked'] == 19.5
+    assert result['alice']['pay'] == 19.5 * 15
+    assert result['bob']['hours_worked'] == 6.0
+    assert result['carol'] == {'user_id': 5, 'username': 'carol', 'hours_worked': 0.0,
+                               'overtime_hours': 0.0, 'double_time_hours': 0.0, 'pay': 0.0}
+
+
+def test_compute_payroll_period_end_is_inclusive(app):
+    result = {row['username']: row['hours_worked']
+              for row in compute_payroll('2024-03-10', '2024-03-31', hourly_rate=20)}
+    assert result == {'admin': 0.0, 'employee': 0.0, 'alice': 11.5, 'bob': 6.0, 'carol': 0.0}
+
+
+def test_compute_payroll_is_a_single_query(app):
+    get_rate_table()  # Built once per app, then served from memory
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        compute_payroll('2024-03-01', '2024-03-15')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert len(statements) == 1
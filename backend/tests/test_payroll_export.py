@@ -0,0 +1,56 @@
+import glob
+import io
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import openpyxl
+import pytest
+from backend.app import db
+from backend.app.models import WorkSession
+from backend.app.services.spreadsheet import write_xlsx
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with thirteen hours worked by the employee in March 2024."""
+    for day, hours in ((1, 8), (20, 5)):
+        start = datetime(2024, 3, day, 9)
+        db.session.add(WorkSession(user_id=2, location_id=1, start_time=start,
+                                   end_time=start + timedelta(hours=hours),
+                                   duration_hours=hours, status='closed'))
+    db.session.commit()
+    return memory_app
+
+
+def _sheet_rows(data):
+    sheet = openpyxl.load_workbook(io.BytesIO(data), read_only=True)['Payroll']
+    return [list(row) for row in sheet.iter_rows(values_only=True)]
+
+
+def test_export_streams_workbook_and_removes_temp_file(client, admin_headers):
+    before = set(glob.glob(os.path.join(tempfile.gettempdir(), 'export_*.xlsx')))
+
+    response = client.get('/payroll/export', query_string={"start_date": "2024-03-01", "end_date": "2024-03-15"},
+                          headers=admin_headers)
+    assert response.status_code == 200
+    assert 'payroll_report.xlsx' in response.headers['Content-Disposition']
+    rows = _sheet_rows(response.data)
+    response.close()
+
+    assert rows == [['user_id', 'username', 'hours_worked', 'pay'],
+                    [1, 'admin', 0, 0],
+                    [2, 'employee', 8, 120]]
+    assert set(glob.glob(os.path.join(tempfile.gettempdir(), 'export_*.xlsx'))) == before
+
+
+def test_write_xlsx_consumes_a_generator(tmp_path):
+    rows = ({'id': i, 'name': f'row{i}', 'missing': None} for i in range(3000))
+    path = write_xlsx(rows, [('id', 'ID'), ('name', 'Name'), ('missing', 'Missing')],
+                      sheet_name='Data', path=str(tmp_path / 'out.xlsx'))
+
+    sheet = openpyxl.load_workbook(path, read_only=True)['Data']
+    values = list(sheet.iter_rows(values_only=True))
+    assert values[0] == ('ID', 'Name', 'Missing')
+    assert len(values) == 3001
+    assert values[-1][:2] == (2999, 'row2999')
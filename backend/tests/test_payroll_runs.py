@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+from backend.app import db
+from backend.app.models import User, Payroll, WorkSession
+
+
+def _session(user_id, day, hours):
+    start = datetime(2024, 3, day, 9)
+    return WorkSession(user_id=user_id, location_id=1, start_time=start,
+                       end_time=start + timedelta(hours=hours), duration_hours=hours,
+                       status='closed', updated_at=start + timedelta(hours=hours))
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with bob (id 3); the employee and bob worked in early March 2024."""
+    bob = User(username="bob", email="bob@example.com", role="Employee")
+    bob.set_password("Password@1234")
+    db.session.add(bob)
+    db.session.commit()
+
+    db.session.add_all([_session(2, 1, 8), _session(2, 2, 8), _session(3, 4, 6)])
+    db.session.commit()
+    return memory_app
+
+
+PERIOD = {"start_date": "2024-03-01", "end_date": "2024-03-15"}
+
+
+def test_first_run_persists_every_user(client, admin_headers):
+    response = client.post('/payroll/runs', json=PERIOD, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json() == {"period_start": "2024-03-01", "period_end": "2024-03-15",
+                                   "recomputed": 3, "unchanged": 0}
+
+    rows = client.get('/payroll/runs', query_string=PERIOD, headers=admin_headers).get_json()["payroll_data"]
+    assert {row["username"]: row["hours_worked"] for row in rows} == {"admin": 0.0, "employee": 16.0, "bob": 6.0}
+
+    runs = client.get('/payroll/runs', headers=admin_headers).get_json()["runs"]
+    assert runs[0]["users"] == 3 and runs[0]["total_pay"] == 22.0 * 15
+
+
+def test_rerun_only_recomputes_changed_users(app, client, admin_headers):
+    client.post('/payroll/runs', json=PERIOD, headers=admin_headers)
+
+    response = client.post('/payroll/runs', json=PERIOD, headers=admin_headers)
+    assert response.get_json()["recomputed"] == 0
+
+    # A new session for bob (stamped now) and a new employee
+    db.session.add(WorkSession(user_id=3, location_id=1, start_time=datetime(2024, 3, 5, 9),
+                               end_time=datetime(2024, 3, 5, 13), duration_hours=4.0, status='closed'))
+    carol = User(username="carol", email="carol@example.com", role="Employee")
+    carol.set_password("Password@1234")
+    db.session.add(carol)
+    db.session.commit()
+
+    response = client.post('/payroll/runs', json=PERIOD, headers=admin_headers)
+    assert response.get_json()["recomputed"] == 2
+    assert response.get_json()["unchanged"] == 2
+
+    bob = Payroll.query.filter_by(user_id=3).one()
+    assert bob.hours_worked == 10.0
+    assert Payroll.query.count() == 4
+
+    response = client.post('/payroll/runs', json={**PERIOD, "full": True}, headers=admin_headers)
+    assert response.get_json()["recomputed"] == 4
+
+
+def test_run_requires_valid_period(client, admin_headers):
+    response = client.post('/payroll/runs', json={"start_date": "2024-03-15", "end_date": "2024-03-01"},
+                           headers=admin_headers)
+    assert response.status_code == 400
+    response = client.post('/payroll/runs', json={"start_date": "2024-03-01"}, headers=admin_headers)
+    assert response.status_code == 400
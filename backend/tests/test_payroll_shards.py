@@ -0,0 +1,85 @@
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from backend.app import create_app, db
+from backend.app.models import PayRate, User, WorkSession
+from backend.app.services.payroll_engine import compute_payroll
+from backend.app.services.payroll_shards import (
+    compute_payroll_sharded, plan_shards, shard_filter, shutdown_payroll_pool
+)
+
+# Department of each user id; memory_app's admin and employee are ids 1 and 2
+DEPARTMENTS = ["General"] * 2 + ["Ops"] * 5 + ["Sales"] * 3 + ["Support"] * 2
+
+
+def _seed(first_user=1):
+    for i, department in enumerate(DEPARTMENTS[first_user - 1:], start=first_user):
+        user = User(username=f"user{i}", email=f"user{i}@example.com", role="Employee", department=department)
+        user.set_password("Password@1234")
+        db.session.add(user)
+    db.session.commit()
+    for user_id in range(1, len(DEPARTMENTS) + 1):
+        for day in range(user_id % 4 + 1):
+            start = datetime(2024, 3, 4, 9) + timedelta(days=day)
+            hours = 6.0 + user_id % 5
+            db.session.add(WorkSession(user_id=user_id, location_id=1, start_time=start,
+                                       end_time=start + timedelta(hours=hours),
+                                       duration_hours=hours, status='closed'))
+    db.session.commit()
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with ten more users across four departments, and their work sessions."""
+    _seed(first_user=3)
+    return memory_app
+
+
+@pytest.mark.parametrize("shard_by", ["department", "id"])
+def test_shards_cover_every_user_once(app, shard_by):
+    shards = plan_shards(3, shard_by)
+    assert len(shards) == 3
+    covered = [user_id for shard in shards
+               for user_id in db.session.scalars(db.select(User.id).where(shard_filter(shard)))]
+    assert sorted(covered) == list(range(1, len(DEPARTMENTS) + 1))
+    assert plan_shards(3, shard_by) == shards
+
+
+def test_departments_are_packed_by_size(app):
+    shards = plan_shards(2)
+    assert shards == [('department', ('Ops', 'Support')), ('department', ('Sales', 'General'))]
+
+
+def test_in_memory_database_falls_back_to_serial(app):
+    assert compute_payroll_sharded('2024-03-01', '2024-03-31', workers=4) == \
+        compute_payroll('2024-03-01', '2024-03-31')
+
+
+def test_process_pool_matches_serial(tmp_path):
+    app = create_app({"TESTING": True,
+                      "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp_path, 'shards.db')}",
+                      "PAYROLL_WORKERS": 2, "OVERTIME_WEEKLY_THRESHOLD": 20})
+    with app.app_context():
+        db.create_all()
+        _seed()
+        try:
+            expected = compute_payroll('2024-03-01', '2024-03-31')
+            assert any(entry['overtime_hours'] for entry in expected)
+            assert compute_payroll_sharded('2024-03-01', '2024-03-31') == expected
+            assert compute_payroll_sharded(shard_by='id') == compute_payroll()
+
+            # Workers keep their app between tasks but must not keep stale rates
+            db.session.add(PayRate(hourly_rate=40, effective_from=date(2024, 1, 1)))
+            db.session.commit()
+            repriced = compute_payroll('2024-03-01', '2024-03-31')
+            assert repriced[0]['pay'] == 14 * 40 and repriced != expected
+            assert compute_payroll_sharded('2024-03-01', '2024-03-31') == repriced
+
+            token = create_access_token(identity={"id": 1, "role": "Admin"})
+            response = app.test_client().get('/payroll/', headers={"Authorization": f"Bearer {token}"})
+            assert response.get_json()["payroll_data"] == compute_payroll()
+        finally:
+            shutdown_payroll_pool(app)
+            db.session.remove()
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, event
+from backend.app import db
+from backend.app.models import CheckIn, Location
+from backend.app.services.recent_activity import RecentActivityBuffer, get_recent_activity_buffer
+from backend.app.services.work_sessions import record_punches
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with three sites and twelve check-ins by the employee."""
+    db.session.add_all([Location(name=f"Site {i}", latitude=40.0 + i, longitude=-74.0, radius=0.5)
+                        for i in range(3)])
+    db.session.commit()
+
+    base = datetime(2024, 5, 1, 9)
+    record_punches([
+        {'user_id': 2, 'location_id': i % 3 + 1, 'latitude': 40.0, 'longitude': -74.0,
+         'timestamp': base + timedelta(hours=i), 'is_verified': True,
+         'check_type': 'in' if i % 2 == 0 else 'out'}
+        for i in range(12)
+    ])
+    db.session.commit()
+    return memory_app
+
+
+def _get(client, headers, limit):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        data = client.get('/dashboard/activity/recent', query_string={"limit": limit}, headers=headers).get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return data, [statement for statement in statements if 'FROM checkins' in statement]
+
+
+def test_first_read_is_one_joined_query_then_buffered(client, employee_headers):
+    data, queries = _get(client, employee_headers, 10)
+    assert len(queries) == 1 and 'JOIN locations' in queries[0]
+    assert [entry["time"] for entry in data] == [
+        (datetime(2024, 5, 1, 9) + timedelta(hours=i)).isoformat() for i in range(11, 1, -1)
+    ]
+    assert data[0] == {"id": 12, "type": "check-out", "time": "2024-05-01T20:00:00", "location": "Site 2"}
+
+    cached, queries = _get(client, employee_headers, 10)
+    assert queries == []
+    assert cached == data
+
+
+def test_new_checkins_are_appended_on_commit(client, employee_headers):
+    _get(client, employee_headers, 5)
+    record_punches([{'user_id': 2, 'location_id': 2, 'latitude': 41.0, 'longitude': -74.0,
+                     'timestamp': datetime(2024, 5, 2, 8), 'is_verified': True, 'check_type': 'in'}])
+    db.session.rollback()
+    data, _ = _get(client, employee_headers, 1)
+    assert data[0]["id"] == 12
+
+    record_punches([{'user_id': 2, 'location_id': 2, 'latitude': 41.0, 'longitude': -74.0,
+                     'timestamp': datetime(2024, 5, 2, 8), 'is_verified': True, 'check_type': 'in'}])
+    db.session.commit()
+    db.session.add(CheckIn(user_id=2, location_id=1, latitude=40.0, longitude=-74.0,
+                           timestamp=datetime(2024, 5, 2, 12), is_verified=True, check_type='out'))
+    db.session.commit()
+
+    data, queries = _get(client, employee_headers, 3)
+    assert queries == []
+    assert [(entry["type"], entry["location"]) for entry in data] == [
+        ("check-out", "Site 0"), ("check-in", "Site 1"), ("check-out", "Site 2")
+    ]
+
+
+def test_buffer_merges_out_of_order_and_is_bounded():
+    buffer = RecentActivityBuffer(size=3, max_users=2)
+    buffer.seed(1, [(5, 5, 'in', 1), (3, 3, 'out', 1)], buffer.writes)
+    buffer.append(1, [(4, 6, 'in', 1), (9, 7, 'out', 1)])
+    assert [entry[0] for entry in buffer.get(1, 3)] == [9, 5, 4]
+    assert buffer.get(1, 4) is None
+
+    writes = buffer.writes
+    buffer.append(2, [(1, 1, 'in', 1)])
+    buffer.seed(2, [], writes)
+    assert buffer.get(2, 1) is None
+
+    buffer.seed(2, [], buffer.writes)
+    buffer.seed(3, [], buffer.writes)
+    assert buffer.get(1, 1) is None and buffer.get(3, 1) == []
+
+
+def test_bulk_delete_drops_buffers(client, employee_headers):
+    _get(client, employee_headers, 5)
+    db.session.execute(delete(CheckIn).where(CheckIn.id > 10))
+    db.session.commit()
+    data, queries = _get(client, employee_headers, 5)
+    assert len(queries) == 1
+    assert data[0]["id"] == 10
+
+
+def test_buffers_expire_for_other_workers_checkins(client, employee_headers):
+    _get(client, employee_headers, 5)
+    # Another worker's insert: this worker's session events never see it
+    with db.engine.begin() as connection:
+        connection.execute(CheckIn.__table__.insert(), [{
+            'user_id': 2, 'location_id': 2, 'latitude': 41.0, 'longitude': -74.0,
+            'timestamp': datetime(2024, 5, 2, 8), 'is_verified': True, 'check_type': 'in'
+        }])
+    data, queries = _get(client, employee_headers, 1)
+    assert queries == [] and data[0]["id"] == 12
+
+    get_recent_activity_buffer().max_age = 0
+    data, queries = _get(client, employee_headers, 1)
+    assert len(queries) == 1 and data[0]["id"] == 13
@@ -0,0 +1,156 @@
+import io
+import os
+import time
+from datetime import datetime, timedelta
+
+import openpyxl
+import pytest
+from flask_jwt_extended import create_access_token
+from backend.app import create_app, db
+from backend.app.models import User, WorkSession
+from backend.app.services.report_jobs import ReportJobRunner
+
+
+def _seed():
+    admin = User(username="admin", email="admin@example.com", role="Admin")
+    admin.set_password("Admin@1234")
+    employee = User(username="employee", email="employee@example.com", role="Employee")
+    employee.set_password("Employee@1234")
+    db.session.add_all([admin, employee])
+    db.session.commit()
+    _add_session(day=1, hours=8)
+
+
+def _add_session(day, hours):
+    start = datetime(2024, 3, day, 9)
+    db.session.add(WorkSession(user_id=2, location_id=1, start_time=start,
+                               end_time=start + timedelta(hours=hours),
+                               duration_hours=hours, status='closed'))
+    db.session.commit()
+
+
+@pytest.fixture(params=["serial", "thread"])
+def app_config(request, tmp_path):
+    return {"REPORT_JOB_EXECUTOR": request.param, "REPORT_CACHE_DIR": str(tmp_path / "report_cache")}
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with eight hours worked by the employee."""
+    _add_session(day=1, hours=8)
+
+    yield memory_app
+
+    if 'report_jobs' in memory_app.extensions:
+        memory_app.extensions['report_jobs'].shutdown(wait=True)
+
+
+def _wait_for(client, headers, job):
+    deadline = time.time() + 60
+    while job["status"] not in ("done", "failed") and time.time() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/reports/jobs/{job['job_id']}", headers=headers).get_json()
+    return job
+
+
+def _submit(client, headers, **params):
+    response = client.post('/reports/jobs', json={"kind": "payroll_export", "params": params}, headers=headers)
+    assert response.status_code in (200, 202)
+    return _wait_for(client, headers, response.get_json())
+
+
+def test_job_builds_downloadable_report(client, admin_headers):
+    job = _submit(client, admin_headers, start_date="2024-03-01", end_date="2024-03-31")
+    assert job["status"] == "done" and job["cached"] is False
+
+    response = client.get(job["download_url"], headers=admin_headers)
+    assert response.status_code == 200
+    sheet = openpyxl.load_workbook(io.BytesIO(response.data), read_only=True)['Payroll']
+    assert list(sheet.iter_rows(values_only=True))[2] == (2, 'employee', 8, 120)
+
+
+def test_identical_parameters_reuse_artifact_until_data_changes(client, admin_headers):
+    first = _submit(client, admin_headers, start_date="2024-03-01")
+    again = _submit(client, admin_headers, start_date="2024-03-01")
+    assert again["cached"] is True and again["job_id"] != first["job_id"]
+
+    other_params = _submit(client, admin_headers, start_date="2024-03-02")
+    assert other_params["cached"] is False
+
+    _add_session(day=2, hours=4)
+    rebuilt = _submit(client, admin_headers, start_date="2024-03-01")
+    assert rebuilt["cached"] is False
+
+    response = client.get(rebuilt["download_url"], headers=admin_headers)
+    sheet = openpyxl.load_workbook(io.BytesIO(response.data), read_only=True)['Payroll']
+    assert list(sheet.iter_rows(values_only=True))[2][2] == 12
+
+
+def test_rates_roles_and_pricing_config_invalidate_artifacts(app, client, admin_headers):
+    first = _submit(client, admin_headers, start_date="2024-03-01")
+
+    response = client.post('/payroll/rates', json={"hourly_rate": 20, "effective_from": "2024-01-01"},
+                           headers=admin_headers)
+    assert response.status_code == 201
+    repriced = _submit(client, admin_headers, start_date="2024-03-01")
+    assert repriced["cached"] is False and repriced["job_id"] != first["job_id"]
+    sheet = openpyxl.load_workbook(io.BytesIO(client.get(repriced["download_url"], headers=admin_headers).data),
+                                   read_only=True)['Payroll']
+    assert list(sheet.iter_rows(values_only=True))[2][3] == 160
+
+    db.session.get(User, 2).department = "Warehouse"
+    db.session.commit()
+    assert _submit(client, admin_headers, start_date="2024-03-01")["cached"] is False
+
+    app.config["OVERTIME_DAILY_THRESHOLD"] = 4
+    assert _submit(client, admin_headers, start_date="2024-03-01")["cached"] is False
+    assert _submit(client, admin_headers, start_date="2024-03-01")["cached"] is True
+
+
+def test_invalid_requests(client, admin_headers):
+    response = client.post('/reports/jobs', json={"kind": "nope"}, headers=admin_headers)
+    assert response.status_code == 400
+    response = client.post('/reports/jobs', json={"kind": "payroll_export", "params": {"start_date": "03/01/2024"}},
+                           headers=admin_headers)
+    assert response.status_code == 400
+    assert client.get('/reports/jobs/unknown', headers=admin_headers).status_code == 404
+
+
+def test_process_pool_executor(tmp_path):
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'reports.db'}",
+                      "REPORT_JOB_EXECUTOR": "process", "REPORT_CACHE_DIR": str(tmp_path / "report_cache")})
+    with app.app_context():
+        _seed()
+        client = app.test_client()
+        headers = {"Authorization": f"Bearer {create_access_token(identity={'id': 1, 'role': 'Admin'})}"}
+        try:
+            job = _submit(client, headers)
+            assert job["status"] == "done", job
+            assert client.get(job["download_url"], headers=headers).status_code == 200
+        finally:
+            app.extensions['report_jobs'].shutdown(wait=True)
+            db.session.remove()
+
+
+def test_jobs_are_visible_to_other_workers_sharing_the_cache(app, client, admin_headers):
+    job = _submit(client, admin_headers, start_date="2024-03-01")
+    other = ReportJobRunner(app, executor="serial", cache_dir=app.config["REPORT_CACHE_DIR"])
+
+    assert other.get(job["job_id"])["status"] == "done"
+    path, kind = other.artifact(job["job_id"])
+    assert os.path.exists(path) and kind.extension == ".xlsx"
+    assert other.get("../../etc/passwd") is None
+
+
+def test_pruning_keeps_artifacts_of_finished_jobs(app, client, admin_headers):
+    job = _submit(client, admin_headers, start_date="2024-03-01")
+    runner = app.extensions["report_jobs"]
+    path, _ = runner.artifact(job["job_id"])
+    os.utime(path, (0, 0))
+
+    runner.prune(time.time() - 60)
+    assert runner.artifact(job["job_id"]) is not None
+    assert client.get(job["download_url"], headers=admin_headers).status_code == 200
+
+    runner.prune(time.time() + 60)
+    assert runner.get(job["job_id"]) is None and not os.path.exists(path)
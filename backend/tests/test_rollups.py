@@ -0,0 +1,118 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, update
+from backend.app import db
+from backend.app.models import PayRate, UserMonthlyRollup, WorkSession
+from backend.app.services.payroll_engine import run_payroll
+from backend.app.services.rollups import rebuild_rollups
+from backend.app.services.work_sessions import record_punches
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app; the tests punch and pay the employee (id 2)."""
+    return memory_app
+
+
+def _punch(timestamp, check_type):
+    return {'user_id': 2, 'location_id': 1, 'latitude': 0.0, 'longitude': 0.0,
+            'timestamp': timestamp, 'is_verified': True, 'check_type': check_type}
+
+
+def _work(day, hours):
+    start = datetime.combine(day, datetime.min.time()).replace(hour=8)
+    record_punches([_punch(start, 'in'), _punch(start + timedelta(hours=hours), 'out')])
+    db.session.commit()
+
+
+def _rollups():
+    return {row.month: row for row in UserMonthlyRollup.query.filter_by(user_id=2)}
+
+
+def test_punches_update_the_month(app):
+    _work(date(2024, 5, 6), 10)
+    _work(date(2024, 5, 7), 6)
+    may = _rollups()[date(2024, 5, 1)]
+    assert (may.checkins, may.days_worked, may.hours_worked, may.overtime_hours) == (4, 2, 16.0, 2.0)
+    assert may.pay == 15 * 14 + 22.5 * 2
+
+    # An open session is not paid yet, but the check-in counts
+    record_punches([_punch(datetime(2024, 6, 3, 8), 'in')])
+    db.session.commit()
+    june = _rollups()[date(2024, 6, 1)]
+    assert (june.checkins, june.hours_worked) == (1, 0.0)
+
+
+def test_checkin_counters_are_added_in_sql(app):
+    _work(date(2024, 5, 6), 4)
+    may = _rollups()[date(2024, 5, 1)]
+    # Another writer moves the counter behind the loaded row's back
+    db.session.execute(update(UserMonthlyRollup.__table__).values(checkins=10))
+    assert may.checkins == 2
+
+    record_punches([_punch(datetime(2024, 5, 7, 8), 'in')])
+    db.session.commit()
+    assert _rollups()[date(2024, 5, 1)].checkins == 11
+
+
+def test_week_spanning_two_months(app):
+    # Mon 29 Apr to Thu 2 May, 10 regular hours a day; Friday crosses 40 hours
+    for day in range(4):
+        _work(date(2024, 4, 29) + timedelta(days=day), 8)
+    _work(date(2024, 5, 3), 8)
+    _work(date(2024, 5, 4), 8)
+    rollups = _rollups()
+    assert rollups[date(2024, 4, 1)].hours_worked == 16.0
+    assert rollups[date(2024, 5, 1)].overtime_hours == 8.0
+
+    incremental = {month: row.serialize() for month, row in rollups.items()}
+    assert rebuild_rollups() == 2
+    db.session.commit()
+    db.session.expire_all()
+    assert {month: row.serialize() for month, row in _rollups().items()} == incremental
+
+
+def test_earnings_read_rollups_only(client, employee_headers):
+    today = date.today()
+    for days_ago in range(0, 400, 3):
+        start = datetime.combine(today - timedelta(days=days_ago), datetime.min.time()).replace(hour=8)
+        db.session.add(WorkSession(user_id=2, location_id=1, start_time=start, end_time=start + timedelta(hours=4),
+                                   duration_hours=4.0, status='closed'))
+    db.session.commit()
+    month = _rollups()[date(today.year, today.month, 1)]
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        data = client.get('/dashboard/earnings', headers=employee_headers).get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert len(statements) == 3  # user, rollups, last payroll
+    assert not any('FROM work_sessions' in statement or 'FROM checkins' in statement for statement in statements)
+    assert data["hoursThisPeriod"] == month.hours_worked
+    assert data["ytdEarnings"] == round(sum(row.pay for row in _rollups().values()
+                                            if row.month.year == today.year), 2)
+    assert data["lastPaycheck"] == 0.0
+
+    # A rate change marks rollups stale; the next read recomputes them
+    db.session.add(PayRate(user_id=2, hourly_rate=30, effective_from=date(2000, 1, 1)))
+    db.session.commit()
+    data = client.get('/dashboard/earnings', headers=employee_headers).get_json()
+    assert data["currentPay"] == month.hours_worked * 30
+    assert not any(row.stale for row in _rollups().values() if row.month.year == today.year)
+
+    # The last paycheck comes from the latest finished payroll run
+    last_month_end = date(today.year, today.month, 1) - timedelta(days=1)
+    run_payroll(date(last_month_end.year, last_month_end.month, 1).isoformat(), last_month_end.isoformat())
+    db.session.commit()
+    data = client.get('/dashboard/earnings', headers=employee_headers).get_json()
+    assert data["lastPaycheck"] == _rollups()[date(last_month_end.year, last_month_end.month, 1)].pay
+
+
+def test_bulk_session_rewrite_marks_rollups_stale(app):
+    _work(date(2024, 5, 6), 6)
+    db.session.execute(update(WorkSession).values(duration_hours=9.0))
+    db.session.commit()
+    assert _rollups()[date(2024, 5, 1)].stale
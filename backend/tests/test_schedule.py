@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, update
+from backend.app import db
+from backend.app.models import Location, Shift
+from backend.app.services.schedule import get_schedule_cache
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with two locations, two June shifts for the employee and one for the admin."""
+    db.session.add_all([Location(name="Warehouse", latitude=40.0, longitude=-74.0, radius=0.5),
+                        Location(name="Store", latitude=41.0, longitude=-74.0, radius=0.5)])
+    db.session.add_all([
+        Shift(user_id=2, location_id=1, start_time=datetime(2024, 6, 3, 9), end_time=datetime(2024, 6, 3, 17)),
+        Shift(user_id=2, location_id=2, start_time=datetime(2024, 6, 4, 13, 30),
+              end_time=datetime(2024, 6, 4, 22)),
+        Shift(user_id=1, location_id=1, start_time=datetime(2024, 6, 5, 9), end_time=datetime(2024, 6, 5, 17)),
+    ])
+    db.session.commit()
+    return memory_app
+
+
+def _schedule(client, headers, etag=None):
+    if etag:
+        headers = dict(headers, **{"If-None-Match": etag})
+    return client.get('/dashboard/schedule/2024/6', headers=headers)
+
+
+def test_schedule_comes_from_shifts(client, employee_headers):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        response = _schedule(client, employee_headers)
+        again = _schedule(client, employee_headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert [statement for statement in statements if 'FROM shifts' in statement] == [statements[0]]
+    assert 'FROM checkins' not in ''.join(statements)
+
+    days = response.get_json()
+    assert len(days) == 30
+    assert days[0] == {"date": "2024-06-01", "shift": "Off", "location": ""}
+    assert (days[2]["shift"], days[2]["location"]) == ("9:00 AM - 5:00 PM", "Warehouse")
+    assert (days[3]["shift"], days[3]["location"]) == ("1:30 PM - 10:00 PM", "Store")
+    assert days[4]["shift"] == "Off"  # Another user's shift
+    assert again.get_json() == days
+
+
+def test_etag_revalidation_and_invalidation(client, employee_headers, admin_headers):
+    etag = _schedule(client, employee_headers).headers["ETag"].strip('"')
+    assert _schedule(client, employee_headers, etag).status_code == 304
+
+    # Create, update and delete through the API each change the month
+    created = client.post('/shifts/', json={"user_id": 2, "location_id": 1, "start_time": "2024-06-10T08:00:00",
+                                            "end_time": "2024-06-10T12:00:00"}, headers=admin_headers)
+    assert created.status_code == 201
+    response = _schedule(client, employee_headers, etag)
+    assert response.status_code == 200
+    assert response.get_json()[9]["shift"] == "8:00 AM - 12:00 PM"
+
+    shift_id = created.get_json()["id"]
+    client.put(f'/shifts/{shift_id}', json={"start_time": "2024-07-01T08:00:00",
+                                            "end_time": "2024-07-01T12:00:00"}, headers=admin_headers)
+    assert _schedule(client, employee_headers).get_json()[9]["shift"] == "Off"
+    july = client.get('/dashboard/schedule/2024/7', headers=employee_headers).get_json()
+    assert july[0]["shift"] == "8:00 AM - 12:00 PM"
+
+    client.delete(f'/shifts/{shift_id}', headers=admin_headers)
+    assert client.get('/dashboard/schedule/2024/7', headers=employee_headers).get_json()[0]["shift"] == "Off"
+    assert _schedule(client, employee_headers, etag).status_code == 304
+
+    # Location renames and bulk statements drop every view
+    db.session.get(Location, 1).name = "Depot"
+    db.session.commit()
+    assert _schedule(client, employee_headers).get_json()[2]["location"] == "Depot"
+    db.session.execute(update(Shift).where(Shift.id == 1).values(status='Missed'))
+    db.session.rollback()
+    assert _schedule(client, employee_headers).get_json()[2]["shifts"][0]["status"] == "Scheduled"
+    db.session.execute(update(Shift).where(Shift.id == 1).values(status='Missed'))
+    db.session.commit()
+    assert _schedule(client, employee_headers).get_json()[2]["shifts"][0]["status"] == "Missed"
+
+
+def test_views_expire_for_other_workers_writes(client, employee_headers):
+    etag = _schedule(client, employee_headers).headers["ETag"].strip('"')
+    # Another worker's write: this worker's session events never see it
+    with db.engine.begin() as connection:
+        connection.execute(Shift.__table__.update().where(Shift.id == 1).values(status='Missed'))
+    assert _schedule(client, employee_headers, etag).status_code == 304
+
+    get_schedule_cache().max_age = 0
+    response = _schedule(client, employee_headers, etag)
+    assert response.status_code == 200
+    assert response.get_json()[2]["shifts"][0]["status"] == "Missed"
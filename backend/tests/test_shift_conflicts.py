@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from backend.app import db
+from backend.app.models import Location, Shift
+from backend.app.services.shift_conflicts import UserShiftIndex
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with a warehouse and two shifts for the employee."""
+    db.session.add(Location(name="Warehouse", latitude=40.0, longitude=-74.0, radius=0.5))
+    db.session.add_all([
+        Shift(user_id=2, location_id=1, start_time=datetime(2024, 6, 3, 9), end_time=datetime(2024, 6, 3, 17)),
+        Shift(user_id=2, location_id=1, start_time=datetime(2024, 6, 4, 9), end_time=datetime(2024, 6, 4, 17)),
+    ])
+    db.session.commit()
+    return memory_app
+
+
+def _shift(start, hours, user_id=2, **extra):
+    return {"user_id": user_id, "location_id": 1, "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=hours)).isoformat(), **extra}
+
+
+def test_index_finds_overlaps_behind_a_long_shift():
+    t = datetime(2024, 1, 1)
+    index = UserShiftIndex([
+        (t, t + timedelta(hours=48), 1),                                  # Spans the others
+        (t + timedelta(hours=2), t + timedelta(hours=3), 2),
+        (t + timedelta(hours=10), t + timedelta(hours=12), 3),
+    ])
+    hits = lambda start, end, exclude=None: [index.ids[i] for i in index.overlapping(
+        t + timedelta(hours=start), t + timedelta(hours=end), exclude)]
+    assert hits(11, 13) == [3, 1]
+    assert hits(4, 5) == [1]
+    assert hits(4, 5, exclude=1) == []
+    assert hits(48, 50) == []           # Touching is not overlapping
+    assert hits(-2, 0) == []
+
+
+def test_create_and_update_refuse_double_booking(client, admin_headers):
+    response = client.post('/shifts/', json=_shift(datetime(2024, 6, 3, 16), 4), headers=admin_headers)
+    assert response.status_code == 409
+    assert response.get_json()["conflicts"] == [
+        {"id": 1, "start_time": "2024-06-03T09:00:00", "end_time": "2024-06-03T17:00:00"}
+    ]
+
+    # Back to back is fine, and so is another employee at the same time
+    assert client.post('/shifts/', json=_shift(datetime(2024, 6, 3, 17), 4),
+                       headers=admin_headers).status_code == 201
+    assert client.post('/shifts/', json=_shift(datetime(2024, 6, 3, 9), 8, user_id=1),
+                       headers=admin_headers).status_code == 201
+
+    response = client.put('/shifts/2', json={"start_time": "2024-06-03T12:00:00Z"}, headers=admin_headers)
+    assert response.status_code == 409
+    assert db.session.get(Shift, 2).start_time == datetime(2024, 6, 4, 9)
+
+    # Moving a shift within its own slot does not conflict with itself
+    assert client.put('/shifts/2', json={"start_time": "2024-06-04T08:00:00"},
+                      headers=admin_headers).status_code == 200
+
+
+def test_validate_batch_in_one_pass(client, admin_headers, employee_headers):
+    proposals = [
+        _shift(datetime(2024, 6, 3, 12), 2),                 # 0: overlaps stored shift 1
+        _shift(datetime(2024, 6, 5, 9), 8),                  # 1: overlaps 2
+        _shift(datetime(2024, 6, 5, 16), 4),                 # 2: overlaps 1
+        _shift(datetime(2024, 6, 6, 9), 8, user_id=99),      # 3: unknown user
+        _shift(datetime(2024, 6, 7, 9), 8, location_id=9),   # 4: unknown location
+        _shift(datetime(2024, 6, 8, 9), 0),                  # 5: empty
+        _shift(datetime(2024, 6, 5, 9), 8, user_id=1),       # 6: fine
+        _shift(datetime(2024, 6, 4, 10), 2, id=2),           # 7: moving shift 2 within itself
+    ]
+    response = client.post('/shifts/validate', json={"shifts": proposals}, headers=admin_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert (data["valid"], data["checked"]) == (False, 8)
+    assert data["invalid"] == [
+        {"index": 0, "conflicts": [{"id": 1, "start_time": "2024-06-03T09:00:00",
+                                    "end_time": "2024-06-03T17:00:00"}]},
+        {"index": 1, "batch_conflicts": [2]},
+        {"index": 2, "batch_conflicts": [1]},
+        {"index": 3, "errors": ["User not found"]},
+        {"index": 4, "errors": ["Location not found"]},
+        {"index": 5, "errors": ["End time must be after start time"]},
+    ]
+
+    assert client.post('/shifts/validate', json={"shifts": []}, headers=employee_headers).status_code == 403
+    assert client.post('/shifts/validate', json={"shifts": [{"user_id": 2}]},
+                       headers=admin_headers).status_code == 400
+
+    # Ids sent as strings still match the stored shift; junk ids are rejected
+    moved = client.post('/shifts/validate', json={"shifts": [_shift(datetime(2024, 6, 4, 10), 2, id="2")]},
+                        headers=admin_headers)
+    assert moved.get_json()["valid"] is True
+    assert client.post('/shifts/validate', json={"shifts": [_shift(datetime(2024, 6, 4, 10), 2, id="two")]},
+                       headers=admin_headers).status_code == 400
+
+
+def test_validate_query_count_is_constant(client, admin_headers):
+    base = datetime(2024, 7, 1, 9)
+    proposals = [_shift(base + timedelta(days=day), 8) for day in range(2000)]
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        data = client.post('/shifts/validate', json={"shifts": proposals}, headers=admin_headers).get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert data["valid"] and data["checked"] == 2000
+    assert len(statements) == 3  # users, locations, shifts
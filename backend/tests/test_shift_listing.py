@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from backend.app import db
+from backend.app.models import Location, Shift, User
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with two more employees (ids 3 and 4), two locations and 30 shifts across the three."""
+    for i in (1, 2):
+        employee = User(username=f"employee{i}", email=f"employee{i}@example.com", role="Employee")
+        employee.set_password("Employee@1234")
+        db.session.add(employee)
+    db.session.add_all([Location(name="Warehouse", latitude=40.0, longitude=-74.0, radius=0.5),
+                        Location(name="Store", latitude=41.0, longitude=-74.0, radius=0.5)])
+    base = datetime(2024, 6, 3, 9)
+    db.session.add_all([
+        Shift(user_id=2 + i % 3, location_id=1 + i % 2, start_time=base + timedelta(days=i // 3),
+              end_time=base + timedelta(days=i // 3, hours=8), notes=f"shift {i}")
+        for i in range(30)
+    ])
+    db.session.commit()
+    return memory_app
+
+
+def _headers(user_id, role):
+    return {"Authorization": f"Bearer {create_access_token(identity={'id': user_id, 'role': role})}"}
+
+
+def test_listing_is_a_single_query(client, admin_headers):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        shifts = client.get('/shifts/', headers=admin_headers).get_json()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert len(statements) == 1
+    assert len(shifts) == 30
+    assert shifts[0] == {"id": 1, "user_id": 2, "username": "employee", "location_id": 1,
+                         "location_name": "Warehouse", "start_time": "2024-06-03T09:00:00",
+                         "end_time": "2024-06-03T17:00:00", "status": "Scheduled", "notes": "shift 0"}
+    assert shifts == [shift.serialize() for shift in Shift.query.order_by(Shift.start_time, Shift.id)]
+
+    own = client.get('/shifts/?user_id=2', headers=_headers(3, 'Employee')).get_json()
+    assert len(own) == 10 and {shift["user_id"] for shift in own} == {3}
+
+
+def test_keyset_pages_cover_the_range(client, admin_headers):
+    seen, cursor = [], None
+    while True:
+        params = {"start_date": "2024-06-04", "end_date": "2024-06-10", "limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get('/shifts/', query_string=params, headers=admin_headers)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= 4
+        seen.extend(shift["id"] for shift in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == list(range(4, 25))
+    assert client.get('/shifts/?cursor=bogus', headers=admin_headers).status_code == 400
+
+
+def test_columnar_format(client, admin_headers):
+    response = client.get('/shifts/', query_string={"format": "columns", "limit": 3, "user_id": 3},
+                          headers=admin_headers)
+    data = response.get_json()
+    assert data["columns"]["id"] == [2, 5, 8]
+    assert data["columns"]["start_time"][0] == "2024-06-03T09:00:00"
+    assert data["columns"]["location_id"] == [2, 1, 2]
+    assert data["users"] == {"3": "employee1"}
+    assert data["locations"] == {"1": "Warehouse", "2": "Store"}
+    assert response.headers["X-Next-Cursor"]
@@ -0,0 +1,103 @@
+from datetime import date, datetime, time
+
+import pytest
+from sqlalchemy import event
+from backend.app import db
+from backend.app.models import Location, Shift, ShiftTemplate, User
+from backend.app.services.shift_templates import expand_template
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with two more employees (ids 3 and 4), a warehouse and one shift for the employee."""
+    for i in (1, 2):
+        employee = User(username=f"employee{i}", email=f"employee{i}@example.com", role="Employee")
+        employee.set_password("Employee@1234")
+        db.session.add(employee)
+    db.session.add(Location(name="Warehouse", latitude=40.0, longitude=-74.0, radius=0.5))
+    db.session.add(Shift(user_id=2, location_id=1, start_time=datetime(2024, 6, 5, 12),
+                         end_time=datetime(2024, 6, 5, 20)))
+    db.session.commit()
+    return memory_app
+
+
+WEEKDAY_TEMPLATE = {"name": "Weekday days", "location_id": 1, "start_time": "09:00", "end_time": "17:00",
+                    "weekdays": ["MO", "TU", "WE", "TH", "FR"]}
+
+
+def test_expand_weekdays_intervals_and_rotations():
+    def starts(**pattern):
+        template = ShiftTemplate(location_id=1, start_time=time(22), end_time=time(6), **pattern)
+        return [start.day for start, _ in expand_template(template, date(2024, 6, 1), date(2024, 6, 30))]
+
+    # June 2024 starts on a Saturday
+    assert starts(weekdays="MO,WE") == [3, 5, 10, 12, 17, 19, 24, 26]
+    assert starts(weekdays="MO,WE", interval_weeks=2, anchor_date=date(2024, 6, 12)) == [10, 12, 24, 26]
+    assert starts(rotation="1100", anchor_date=date(2024, 6, 3)) == [3, 4, 7, 8, 11, 12, 15, 16,
+                                                                    19, 20, 23, 24, 27, 28]
+    assert starts(weekdays="SA,SU", rotation="10") == [1, 9, 15, 23, 29]
+
+    # Night shifts run into the next day
+    template = ShiftTemplate(location_id=1, start_time=time(22), end_time=time(6))
+    assert expand_template(template, date(2024, 6, 30), date(2024, 6, 30)) == [
+        (datetime(2024, 6, 30, 22), datetime(2024, 7, 1, 6))
+    ]
+
+
+def test_bulk_schedules_in_one_insert(client, admin_headers):
+    response = client.post('/shifts/templates', json=WEEKDAY_TEMPLATE, headers=admin_headers)
+    assert response.status_code == 201
+    template = response.get_json()["template"]
+    assert template["weekdays"] == ["MO", "TU", "WE", "TH", "FR"] and template["start_time"] == "09:00"
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        response = client.post('/shifts/bulk', json={
+            "template_id": template["id"], "user_ids": [3, 4], "start_date": "2024-06-03",
+            "end_date": "2024-06-30", "notes": "June rota"
+        }, headers=admin_headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert response.status_code == 201
+    assert response.get_json()["created"] == 40
+    inserts = [statement for statement in statements if statement.startswith("INSERT")]
+    assert len(inserts) == 1
+
+    shifts = Shift.query.filter_by(user_id=3).order_by(Shift.start_time).all()
+    assert len(shifts) == 20 and shifts[0].notes == "June rota" and shifts[0].created_by == 1
+    assert (shifts[0].start_time, shifts[0].end_time) == (datetime(2024, 6, 3, 9), datetime(2024, 6, 3, 17))
+
+
+def test_bulk_conflicts_reject_or_skip(client, admin_headers, employee_headers):
+    body = {"template": WEEKDAY_TEMPLATE, "user_ids": [2, 3, 99], "start_date": "2024-06-03",
+            "end_date": "2024-06-07"}
+    response = client.post('/shifts/bulk', json=body, headers=admin_headers)
+    assert response.status_code == 409
+    data = response.get_json()
+    assert (data["created"], data["invalid_count"]) == (0, 6)
+    assert data["invalid"][0] == {"index": 2, "conflicts": [
+        {"id": 1, "start_time": "2024-06-05T12:00:00", "end_time": "2024-06-05T20:00:00"}]}
+    assert data["invalid"][1] == {"index": 10, "errors": ["User not found"]}
+    assert Shift.query.count() == 1
+
+    response = client.post('/shifts/bulk', json=dict(body, on_conflict="skip"), headers=admin_headers)
+    assert response.status_code == 201
+    assert (response.get_json()["created"], response.get_json()["skipped"]) == (9, 6)
+    assert Shift.query.filter_by(user_id=2).count() == 5
+
+    bad = [
+        dict(body, template=dict(WEEKDAY_TEMPLATE, weekdays=["XX"])),
+        dict(body, template=dict(WEEKDAY_TEMPLATE, rotation="1a")),
+        dict(body, end_date="2024-06-01"),
+        dict(body, start_date="2024-01-01", end_date="2025-06-01"),
+        dict(body, on_conflict="merge"),
+        dict(body, user_ids=[]),
+    ]
+    for payload in bad:
+        assert client.post('/shifts/bulk', json=payload, headers=admin_headers).status_code == 400
+    assert client.post('/shifts/bulk', json=dict(body, template_id=42),
+                       headers=admin_headers).status_code == 404
+
+    assert client.post('/shifts/bulk', json=body, headers=employee_headers).status_code == 403
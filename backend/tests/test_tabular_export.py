@@ -0,0 +1,83 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from backend.app import db
+from backend.app.models import Location, CheckIn, WorkSession
+from backend.app.services import tabular_export
+from backend.app.services.tabular_export import Column, iter_encoded
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with an office, 25 check-ins and a six-hour work session."""
+    db.session.add(Location(name="Office", latitude=40.7128, longitude=-74.0060, radius=0.5))
+    db.session.commit()
+
+    base = datetime(2024, 5, 1, 9)
+    for i in range(25):
+        db.session.add(CheckIn(user_id=2, location_id=1, latitude=40.7128, longitude=-74.0060,
+                               timestamp=base + timedelta(hours=i), is_verified=True,
+                               check_type='in' if i % 2 == 0 else 'out'))
+    db.session.add(WorkSession(user_id=2, location_id=1, start_time=base, end_time=base + timedelta(hours=6),
+                               duration_hours=6.0, status='closed'))
+    db.session.commit()
+    return memory_app
+
+
+def test_checkin_csv_export_streams_every_row(client, admin_headers, employee_headers):
+    response = client.get('/checkins/export', query_string={"start_date": "2024-05-01", "end_date": "2024-05-01"},
+                          headers=admin_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 15
+    assert rows[0]["timestamp"] == "2024-05-01T09:00:00" and rows[0]["check_type"] == "in"
+
+    assert client.get('/checkins/export', headers=employee_headers).status_code == 403
+    assert client.get('/checkins/export', query_string={"format": "xml"},
+                      headers=admin_headers).status_code == 400
+
+
+def test_columnar_exports(client, admin_headers):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    response = client.get('/checkins/export', query_string={"format": "parquet"}, headers=admin_headers)
+    table = pq.read_table(io.BytesIO(response.data))
+    assert table.num_rows == 25
+    assert table.schema.field("timestamp").type == pa.timestamp('us')
+
+    response = client.get('/payroll/export', query_string={"format": "arrow"}, headers=admin_headers)
+    table = pa.ipc.open_stream(response.data).read_all()
+    assert table.to_pylist()[1] == {"user_id": 2, "username": "employee", "hours_worked": 6.0, "pay": 90.0}
+
+
+def test_payroll_csv_export(client, admin_headers):
+    response = client.get('/payroll/export', query_string={"format": "csv"}, headers=admin_headers)
+    assert response.headers['Content-Disposition'].endswith('payroll_report.csv')
+    assert response.get_data(as_text=True).splitlines() == [
+        "user_id,username,hours_worked,pay", "1,admin,0.0,0.0", "2,employee,6.0,90.0"
+    ]
+
+
+def test_encoders_emit_one_batch_per_chunk():
+    pa = pytest.importorskip("pyarrow")
+    columns = [Column('id', 'int'), Column('name', 'str')]
+    chunks = [[(i, f'row{i}') for i in range(start, start + 4)] for start in (0, 4, 8)]
+    reader = pa.ipc.open_stream(b''.join(iter_encoded('arrow', iter(chunks), columns)))
+    assert [batch.num_rows for batch in reader] == [4, 4, 4]
+
+    with pytest.raises(ValueError):
+        iter_encoded('xml', iter(chunks), columns)
+
+
+def test_arrow_formats_without_pyarrow_say_so(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(tabular_export, 'pa', None)
+    for url, fmt in (('/checkins/export', 'parquet'), ('/payroll/export', 'arrow')):
+        response = client.get(url, query_string={"format": fmt}, headers=admin_headers)
+        assert response.status_code == 400
+        assert "requires pyarrow" in response.get_json()["error"]
+    with pytest.raises(ValueError, match="requires pyarrow"):
+        iter_encoded('parquet', iter(()), [Column('id', 'int')])
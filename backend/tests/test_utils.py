@@ -5,6 +5,7 @@ from geopy.distance import distance as geopy_distance
 from backend.app.utils import validate_fields, calculate_distance, success_response, error_response, export_to_excel
 import pandas as pd
 import os
+import tempfile
 
 
 def test_validate_fields():
@@ -90,3 +91,14 @@ def test_export_to_excel(tmpdir):
     # Test invalid data
     with pytest.raises(ValueError, match="Data must be a list of dictionaries."):
         export_to_excel(None, filename)
+
+
+def test_export_to_excel_default_path_is_not_cwd():
+    result = export_to_excel([{'name': 'John'}, {'name': 'Jane', 'age': 25}])
+    try:
+        assert os.path.dirname(result) == tempfile.gettempdir()
+        df = pd.read_excel(result)
+        assert list(df.columns) == ['name', 'age']
+        assert len(df) == 2
+    finally:
+        os.remove(result)
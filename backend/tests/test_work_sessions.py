@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+from backend.app import db
+from backend.app.models import Location, CheckIn, WorkSession
+from backend.app.services.work_sessions import record_punches, rebuild_work_sessions
+
+
+@pytest.fixture
+def app(memory_app):
+    """memory_app with an office."""
+    db.session.add(Location(name="Office", latitude=40.7128, longitude=-74.0060, radius=0.5))
+    db.session.commit()
+    return memory_app
+
+
+def _punch(user_id, check_type, hour, day=1):
+    return {'user_id': user_id, 'location_id': 1, 'latitude': 40.7128, 'longitude': -74.0060,
+            'timestamp': datetime(2024, 5, day, hour), 'is_verified': True, 'check_type': check_type}
+
+
+def test_in_and_out_pair_into_closed_session(app):
+    record_punches([_punch(2, 'in', 9)])
+    db.session.commit()
+    session = WorkSession.query.one()
+    assert session.status == 'open'
+
+    record_punches([_punch(2, 'out', 17)])
+    db.session.commit()
+    assert session.status == 'closed'
+    assert session.duration_hours == 8.0
+
+
+def test_missed_checkout_and_orphan_checkout(app):
+    record_punches([
+        _punch(2, 'out', 7),          # no open session: ignored
+        _punch(2, 'in', 8),
+        _punch(2, 'in', 9, day=2),    # previous "in" never closed
+        _punch(2, 'out', 12, day=2),
+    ])
+    db.session.commit()
+    sessions = WorkSession.query.order_by(WorkSession.start_time).all()
+    assert [(s.status, s.duration_hours) for s in sessions] == [('unmatched', None), ('closed', 3.0)]
+
+
+def test_batch_upload_maintains_sessions_and_payroll_uses_them(client, admin_headers, employee_headers):
+    response = client.post('/checkins/batch', json={"punches": [
+        {"latitude": 40.7128, "longitude": -74.0060, "check_type": "in", "timestamp": "2024-05-01T09:00:00"},
+        {"latitude": 40.7128, "longitude": -74.0060, "check_type": "out", "timestamp": "2024-05-01T15:30:00"},
+    ]}, headers=employee_headers)
+    assert response.get_json()["recorded"] == 2
+
+    payroll = client.get('/payroll/', headers=admin_headers).get_json()["payroll_data"]
+    employee = next(p for p in payroll if p["username"] == "employee")
+    assert employee["hours_worked"] == 6.5
+    assert employee["pay"] == 6.5 * 15
+
+
+def test_rebuild_from_existing_checkins(app):
+    for punch in (_punch(2, 'in', 9), _punch(2, 'out', 13)):
+        db.session.add(CheckIn(**punch))
+    db.session.commit()
+    assert WorkSession.query.count() == 0
+
+    rebuild_work_sessions()
+    db.session.commit()
+    assert WorkSession.query.one().duration_hours == 4.0
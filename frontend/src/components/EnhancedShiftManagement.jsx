@@ -180,67 +180,30 @@ const ShiftManagement = () => {
     }
     
     try {
-      // Calculate all dates in the range based on repeat pattern
-      const startDate = new Date(batchForm.startDate);
-      const endDate = new Date(batchForm.endDate);
-      const scheduleDates = [];
-      
-      // Generate dates based on repeat pattern
-      const currentDate = new Date(startDate);
-      while (currentDate <= endDate) {
-        // For weekly pattern, check if day is selected
-        if (batchForm.repeat === 'daily' || 
-            (batchForm.repeat === 'weekly' && batchForm.daysOfWeek.includes(currentDate.getDay()))) {
-          scheduleDates.push(new Date(currentDate));
-        }
-        
-        // Move to next day
-        currentDate.setDate(currentDate.getDate() + 1);
-      }
-      
-      // Track successful and failed shift creations
-      let successCount = 0;
-      let conflictCount = 0;
+      // The server expands the pattern, checks every shift against stored
+      // shifts and inserts the valid ones in one transaction
+      const weekdayCodes = ['SU', 'MO', 'TU', 'WE', 'TH', 'FR', 'SA']; // Indexed by Date.getDay()
+      const result = await api.shifts.bulk({
+        template: {
+          location_id: parseInt(batchForm.locationId),
+          start_time: batchForm.startTime,
+          end_time: batchForm.endTime,
+          weekdays: batchForm.repeat === 'weekly'
+            ? batchForm.daysOfWeek.map(day => weekdayCodes[day])
+            : null
+        },
+        user_ids: batchForm.employeeIds.map(id => parseInt(id)),
+        start_date: batchForm.startDate,
+        end_date: batchForm.endDate,
+        on_conflict: 'skip',
+        notes: batchForm.notes
+      });
       
-      // Create shifts for each employee and date
-      for (const employeeId of batchForm.employeeIds) {
-        for (const date of scheduleDates) {
-          // Format date
-          const dateString = date.toISOString().split('T')[0];
-          
-          // Format start and end times
-          const startDateTime = `${dateString}T${batchForm.startTime}:00`;
-          const endDateTime = `${dateString}T${batchForm.endTime}:00`;
-          
-          // Check for conflicts
-          const { hasConflict } = checkForConflicts(employeeId, startDateTime, endDateTime);
-          
-          if (hasConflict) {
-            conflictCount++;
-            continue;
-          }
-          
-          // Create shift data
-          const shiftData = {
-            user_id: parseInt(employeeId),
-            location_id: parseInt(batchForm.locationId),
-            start_time: startDateTime,
-            end_time: endDateTime,
-            notes: batchForm.notes
-          };
-          
-          try {
-            // Create the shift
-            const response = await api.shifts.create(shiftData);
-            
-            if (response && response.id) {
-              successCount++;
-            }
-          } catch (shiftError) {
-            console.error("Error creating individual shift:", shiftError);
-            // Continue with the next shift
-          }
-        }
+      const successCount = result.created || 0;
+      const conflictCount = result.invalid_count || 0;
+      if (result.error && !conflictCount) {
+        setError(result.error);
+        return;
       }
       
       // Refresh shifts
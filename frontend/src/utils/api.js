@@ -251,6 +251,17 @@ const api = {
         console.error(`Error deleting shift ${shiftId}:`, error);
         return { error: error.error || 'Failed to delete shift' };
       }
+    },
+    
+    // Expand a recurring template for many employees in one request;
+    // returns { created, skipped, invalid_count, invalid, ... }
+    bulk: async (payload) => {
+      try {
+        return await apiClient.post('/shifts/bulk', payload);
+      } catch (error) {
+        console.error('Error bulk scheduling shifts:', error);
+        return { ...error, error: error.error || 'Failed to schedule shifts' };
+      }
     }
   },
   
@@ -48,6 +48,140 @@ apiClient.interceptors.response.use(
   }
 );
 
+// Unique key per punch, generated once when the user punches
+function newIdempotencyKey() {
+  if (window.crypto && window.crypto.randomUUID) {
+    return window.crypto.randomUUID();
+  }
+  return `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+}
+
+// Punches the server has not acknowledged yet. Each keeps the time the user
+// punched and the Idempotency-Key it was first sent with. Queued punches are
+// replayed through POST /checkins/batch with that time, grouped into batches
+// whose key is saved before the first attempt, so every retry (including after
+// a reload) resends the same batch under the same key; each entry also carries
+// its own key, so a punch the server accepted before the connection dropped is
+// not recorded twice.
+const PENDING_PUNCHES_KEY = 'pending_punches';
+const PUNCH_RETRY_DELAYS_MS = [500, 2000];
+const PUNCH_BATCH_SIZE = 100;
+let pendingPunchFlush = null;
+
+function newPunch(checkData) {
+  return {
+    key: newIdempotencyKey(),
+    userId: localStorage.getItem('user_id'),
+    punchedAt: new Date().toISOString(),
+    data: checkData
+  };
+}
+
+function loadPendingPunches() {
+  try {
+    return JSON.parse(localStorage.getItem(PENDING_PUNCHES_KEY)) || [];
+  } catch (e) {
+    return [];
+  }
+}
+
+function savePendingPunches(punches) {
+  localStorage.setItem(PENDING_PUNCHES_KEY, JSON.stringify(punches));
+}
+
+// No response, or the first attempt with this key is still being processed
+function isRetryablePunchError(error) {
+  return error.error === 'Network Error' || /still in progress/.test(error.error || '');
+}
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+function postPunch(punch) {
+  return apiClient.post('/checkins/', punch.data, {
+    headers: { 'Idempotency-Key': punch.key }
+  });
+}
+
+// Send a punch, retrying with its own key; queue it if the server stays unreachable
+async function sendPunch(punch) {
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await postPunch(punch);
+    } catch (error) {
+      if (!isRetryablePunchError(error)) {
+        throw error;
+      }
+      if (attempt >= PUNCH_RETRY_DELAYS_MS.length) {
+        savePendingPunches([...loadPendingPunches(), punch]);
+        return { queued: true, message: 'Saved offline; it will be sent when the connection returns' };
+      }
+      await sleep(PUNCH_RETRY_DELAYS_MS[attempt]);
+    }
+  }
+}
+
+// The user's oldest queued batch, assigning the next punches to a new one if needed
+function nextPunchBatch(userId) {
+  const pending = loadPendingPunches();
+  const mine = pending.filter(p => p.userId === userId);
+  if (!mine.length) {
+    return null;
+  }
+  let batchKey = mine[0].batchKey;
+  if (!batchKey) {
+    batchKey = newIdempotencyKey();
+    mine.slice(0, PUNCH_BATCH_SIZE).filter(p => !p.batchKey).forEach(p => {
+      p.batchKey = batchKey;
+    });
+    savePendingPunches(pending);
+  }
+  return { key: batchKey, punches: mine.filter(p => p.batchKey === batchKey) };
+}
+
+function postPunchBatch(batch) {
+  const punches = batch.punches.map(punch => ({
+    ...punch.data,
+    timestamp: punch.punchedAt,
+    idempotency_key: punch.key
+  }));
+  return apiClient.post('/checkins/batch', { punches }, {
+    headers: { 'Idempotency-Key': batch.key }
+  });
+}
+
+// Resend the current user's queued punches in order, with the time each was made
+function flushPendingPunches() {
+  if (!pendingPunchFlush) {
+    pendingPunchFlush = (async () => {
+      const userId = localStorage.getItem('user_id');
+      for (let batch = nextPunchBatch(userId); batch; batch = nextPunchBatch(userId)) {
+        try {
+          const response = await postPunchBatch(batch);
+          (response.results || []).filter(result => !result.success).forEach(result => {
+            console.error('Queued check-in/out was rejected:', result);
+          });
+        } catch (error) {
+          if (isRetryablePunchError(error)) {
+            break;
+          }
+          console.error('Queued check-ins/outs were rejected:', error);
+        }
+        savePendingPunches(loadPendingPunches().filter(p => p.batchKey !== batch.key));
+      }
+      return loadPendingPunches().length;
+    })().finally(() => {
+      pendingPunchFlush = null;
+    });
+  }
+  return pendingPunchFlush;
+}
+
+window.addEventListener('online', () => {
+  if (localStorage.getItem('access_token')) {
+    flushPendingPunches();
+  }
+});
+
 // Helper function to calculate distance between two points
 function calculateDistance(point1, point2) {
   // Simple Haversine formula implementation
@@ -78,6 +212,90 @@ function calculateDistance(point1, point2) {
   return distance;
 }
 
+// Dashboard sections returned by /dashboard/bootstrap: cache key -> { data, expires }
+const dashboardSectionCache = {};
+let bootstrapRequest = null;
+
+function dashboardSectionKey(section, params) {
+  const userId = localStorage.getItem('user_id');
+  if (section === 'activity') return `${userId}:activity:${params.limit}`;
+  if (section === 'schedule') return `${userId}:schedule:${params.year}-${params.month}`;
+  return `${userId}:${section}`;
+}
+
+// Fetch the named sections in one request, asking only for those not cached
+async function loadDashboardSections(sections, params, forceRefresh) {
+  const now = Date.now();
+  const stale = sections.filter(section => {
+    const cached = dashboardSectionCache[dashboardSectionKey(section, params)];
+    return forceRefresh || !cached || cached.expires <= now;
+  });
+  
+  if (stale.length > 0) {
+    const response = await apiClient.get('/dashboard/bootstrap', {
+      params: { ...params, sections: stale.join(',') }
+    });
+    Object.entries(response.errors || {}).forEach(([section, message]) => {
+      console.error(`Dashboard section ${section} failed:`, message);
+    });
+    stale.forEach(section => {
+      if (section in response) {
+        const maxAge = (response.cache && response.cache[section] && response.cache[section].maxAge) || 0;
+        dashboardSectionCache[dashboardSectionKey(section, params)] = {
+          data: response[section],
+          expires: Date.now() + maxAge * 1000
+        };
+      }
+    });
+  }
+  
+  const result = {};
+  sections.forEach(section => {
+    const cached = dashboardSectionCache[dashboardSectionKey(section, params)];
+    result[section] = cached ? cached.data : undefined;
+  });
+  return result;
+}
+
+async function loadUnifiedDashboardData(forceRefresh) {
+  try {
+    const today = new Date();
+    const params = { limit: 10, year: today.getFullYear(), month: today.getMonth() + 1 };
+    const userRole = localStorage.getItem('user_role');
+    
+    if (userRole === 'Admin') {
+      // For admin, get all employees and shifts alongside the bootstrap
+      const [sections, employees, shifts] = await Promise.all([
+        loadDashboardSections(['employee', 'activity', 'locations'], params, forceRefresh),
+        enhancedApi.users.getAll(),
+        enhancedApi.shifts.getAll()
+      ]);
+      
+      return {
+        userData: sections.employee,
+        activityData: Array.isArray(sections.activity) ? sections.activity : [],
+        employees: Array.isArray(employees) ? employees : [],
+        locations: Array.isArray(sections.locations) ? sections.locations : [],
+        shifts: Array.isArray(shifts) ? shifts : []
+      };
+    }
+    
+    const sections = await loadDashboardSections(
+      ['employee', 'earnings', 'activity', 'schedule', 'locations'], params, forceRefresh
+    );
+    return {
+      userData: sections.employee,
+      activityData: Array.isArray(sections.activity) ? sections.activity : [],
+      earnings: sections.earnings,
+      schedule: Array.isArray(sections.schedule) ? sections.schedule : [],
+      locations: Array.isArray(sections.locations) ? sections.locations : []
+    };
+  } catch (error) {
+    console.error('Error fetching unified dashboard data:', error);
+    return { error: error.error || 'Failed to fetch dashboard data' };
+  }
+}
+
 /**
  * Enhanced API service that improves connectivity between admin and employee components
  * This extends the base API with additional methods and error handling
@@ -254,7 +472,7 @@ checkins: {
   // Create new check-in or check-out
   create: async (checkData) => {
     try {
-      return await apiClient.post('/checkins/', checkData);
+      return await sendPunch(newPunch(checkData));
     } catch (error) {
       console.error('Error creating check-in/out:', error);
       return { error: error.error || 'Failed to process check-in/out' };
@@ -302,7 +520,7 @@ checkins: {
       }
       
       // Proceed with check-in/out
-      const response = await apiClient.post('/checkins/', checkData);
+      const response = await sendPunch(newPunch(checkData));
       
       // Update recent activity in the background
       try {
@@ -327,6 +545,9 @@ checkins: {
     }
   },
   
+  // Resend punches queued while offline; resolves to the number still pending
+  flushPending: () => flushPendingPunches(),
+  
   // Get recent check-ins/outs
   getRecent: async (limit = 10) => {
     try {
@@ -408,7 +629,8 @@ checkins: {
         const { hasConflicts, conflicts } = await enhancedApi.shifts.checkConflicts(
           shiftData.user_id,
           shiftData.start_time,
-          shiftData.end_time
+          shiftData.end_time,
+          shiftData.location_id
         );
         
         if (hasConflicts) {
@@ -426,40 +648,31 @@ checkins: {
       }
     },
     
-    // Check for scheduling conflicts
-    checkConflicts: async (employeeId, startTime, endTime) => {
+    // Check for scheduling conflicts against the employee's stored shifts
+    checkConflicts: async (employeeId, startTime, endTime, locationId = null) => {
+      const result = await enhancedApi.shifts.validate([{
+        user_id: employeeId,
+        location_id: locationId,
+        start_time: startTime,
+        end_time: endTime
+      }]);
+      if (result.error) {
+        return result;
+      }
+      const conflicts = result.invalid.length ? (result.invalid[0].conflicts || []) : [];
+      return {
+        hasConflicts: conflicts.length > 0,
+        conflicts
+      };
+    },
+    
+    // Validate many proposed shifts in one request; returns { valid, checked, invalid }
+    validate: async (shifts) => {
       try {
-        // Get employee's shifts
-        const params = { user_id: employeeId };
-        const shifts = await enhancedApi.shifts.getAll(params);
-        
-        if (!Array.isArray(shifts)) {
-          return { hasConflicts: false, conflicts: [] };
-        }
-        
-        // Parse dates for comparison
-        const start = new Date(startTime);
-        const end = new Date(endTime);
-        
-        // Check for overlaps
-        const conflicts = shifts.filter(shift => {
-          const shiftStart = new Date(shift.start_time);
-          const shiftEnd = new Date(shift.end_time);
-          
-          return (
-            (start >= shiftStart && start < shiftEnd) || // Start during existing shift
-            (end > shiftStart && end <= shiftEnd) || // End during existing shift
-            (start <= shiftStart && end >= shiftEnd) // Contains existing shift
-          );
-        });
-        
-        return {
-          hasConflicts: conflicts.length > 0,
-          conflicts
-        };
+        return await apiClient.post('/shifts/validate', { shifts });
       } catch (error) {
-        console.error('Error checking for conflicts:', error);
-        return { error: error.error || 'Failed to check for conflicts' };
+        console.error('Error validating shifts:', error);
+        return { error: error.error || 'Failed to validate shifts' };
       }
     },
     
@@ -583,51 +796,21 @@ getRecentActivity: async (limit = 10, forceRefresh = false) => {
       }
     },
     
-    // New unified method that works with your existing data structure
-    getUnifiedDashboardData: async () => {
+    // Everything the dashboard shows, from one /dashboard/bootstrap request.
+    // Sections are reused until the max age the server sent for them passes,
+    // and concurrent callers share the request in flight.
+    getUnifiedDashboardData: async (forceRefresh = false) => {
+      if (bootstrapRequest && !forceRefresh) {
+        return bootstrapRequest;
+      }
+      const request = loadUnifiedDashboardData(forceRefresh);
+      bootstrapRequest = request;
       try {
-        const userData = await enhancedApi.dashboard.getEmployeeData();
-        const activityData = await enhancedApi.dashboard.getRecentActivity();
-        
-        // Get appropriate role-specific data
-        const userRole = localStorage.getItem('user_role');
-        let roleSpecificData = {};
-        
-        if (userRole === 'Admin') {
-          // For admin, get all employees and locations
-          const [employees, locations, shifts] = await Promise.all([
-            enhancedApi.users.getAll(),
-            enhancedApi.locations.getAll(),
-            enhancedApi.shifts.getAll()
-          ]);
-          
-          roleSpecificData = {
-            employees: Array.isArray(employees) ? employees : [],
-            locations: Array.isArray(locations) ? locations : [],
-            shifts: Array.isArray(shifts) ? shifts : []
-          };
-        } else {
-          // For employee, get earnings and schedule
-          const today = new Date();
-          const [earningsData, scheduleData] = await Promise.all([
-            enhancedApi.dashboard.getEarningsData(),
-            enhancedApi.dashboard.getScheduleData(today.getFullYear(), today.getMonth() + 1)
-          ]);
-          
-          roleSpecificData = {
-            earnings: earningsData,
-            schedule: Array.isArray(scheduleData) ? scheduleData : []
-          };
+        return await request;
+      } finally {
+        if (bootstrapRequest === request) {
+          bootstrapRequest = null;
         }
-        
-        return {
-          userData,
-          activityData: Array.isArray(activityData) ? activityData : [],
-          ...roleSpecificData
-        };
-      } catch (error) {
-        console.error('Error fetching unified dashboard data:', error);
-        return { error: error.error || 'Failed to fetch dashboard data' };
       }
     }
   },
@@ -0,0 +1,40 @@
+"""Index check-ins for keyset pagination and per-user history
+
+Revision ID: 35357bc5c74d
+Revises: 
+Create Date: 2026-10-18 09:00:00
+
+db.create_all() creates missing tables but never alters existing ones, so
+databases created before these indexes existed need them added here. Every
+step checks the live schema first, so the revision is safe to run on a
+database create_all() has already brought up to date.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '35357bc5c74d'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_checkins_timestamp_id': ['timestamp', 'id'],
+    'ix_checkins_user_timestamp': ['user_id', 'timestamp'],
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'checkins' not in inspector.get_table_names():
+        return
+    existing = {index['name'] for index in inspector.get_indexes('checkins')}
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'checkins', columns)
+
+
+def downgrade():
+    for name in INDEXES:
+        op.drop_index(name, table_name='checkins')
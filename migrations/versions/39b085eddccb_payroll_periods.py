@@ -0,0 +1,53 @@
+"""Add pay periods and source timestamps to payroll rows
+
+Revision ID: 39b085eddccb
+Revises: 35357bc5c74d
+Create Date: 2026-10-18 09:10:00
+
+Payroll rows written before persisted payroll runs have no period. They
+keep NULL period_start/period_end: GET /payroll/runs lists only rows with a
+period, the dashboard's last paycheck only considers ended periods, and
+NULLs never collide under uq_payroll_user_period. There is nothing to
+backfill them from, since legacy rows only record when they were generated.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '39b085eddccb'
+down_revision = '35357bc5c74d'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    sa.Column('period_start', sa.Date(), nullable=True),
+    sa.Column('period_end', sa.Date(), nullable=True),
+    sa.Column('source_updated_at', sa.DateTime(), nullable=True),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'payroll' not in inspector.get_table_names():
+        return
+    columns = {column['name'] for column in inspector.get_columns('payroll')}
+    for column in COLUMNS:
+        if column.name not in columns:
+            op.add_column('payroll', column.copy())
+
+    if 'ix_payroll_period' not in {index['name'] for index in inspector.get_indexes('payroll')}:
+        op.create_index('ix_payroll_period', 'payroll', ['period_start', 'period_end'])
+
+    # SQLite cannot add a constraint in place; batch mode rebuilds the table
+    if 'uq_payroll_user_period' not in {uq['name'] for uq in inspector.get_unique_constraints('payroll')}:
+        with op.batch_alter_table('payroll') as batch_op:
+            batch_op.create_unique_constraint('uq_payroll_user_period', ['user_id', 'period_start', 'period_end'])
+
+
+def downgrade():
+    with op.batch_alter_table('payroll') as batch_op:
+        batch_op.drop_constraint('uq_payroll_user_period', type_='unique')
+        batch_op.drop_index('ix_payroll_period')
+        for column in COLUMNS:
+            batch_op.drop_column(column.name)
@@ -0,0 +1,50 @@
+"""Add pay periods to invoices
+
+Revision ID: 89dd6d4d6728
+Revises: 39b085eddccb
+Create Date: 2026-10-18 09:20:00
+
+Invoices created before bulk invoicing have no period and keep NULL
+period_start/period_end; NULLs never collide under uq_invoice_user_period,
+so closing a period never mistakes a legacy invoice for one of its own.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '89dd6d4d6728'
+down_revision = '39b085eddccb'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    sa.Column('period_start', sa.Date(), nullable=True),
+    sa.Column('period_end', sa.Date(), nullable=True),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'invoices' not in inspector.get_table_names():
+        return
+    columns = {column['name'] for column in inspector.get_columns('invoices')}
+    for column in COLUMNS:
+        if column.name not in columns:
+            op.add_column('invoices', column.copy())
+
+    if 'ix_invoices_status_created_on' not in {index['name'] for index in inspector.get_indexes('invoices')}:
+        op.create_index('ix_invoices_status_created_on', 'invoices', ['status', 'created_on'])
+
+    # SQLite cannot add a constraint in place; batch mode rebuilds the table
+    if 'uq_invoice_user_period' not in {uq['name'] for uq in inspector.get_unique_constraints('invoices')}:
+        with op.batch_alter_table('invoices') as batch_op:
+            batch_op.create_unique_constraint('uq_invoice_user_period', ['user_id', 'period_start', 'period_end'])
+
+
+def downgrade():
+    with op.batch_alter_table('invoices') as batch_op:
+        batch_op.drop_constraint('uq_invoice_user_period', type_='unique')
+        batch_op.drop_index('ix_invoices_status_created_on')
+        for column in COLUMNS:
+            batch_op.drop_column(column.name)
@@ -0,0 +1,30 @@
+"""Index shifts by user and start time
+
+Revision ID: ffe2878d6924
+Revises: 89dd6d4d6728
+Create Date: 2026-10-18 09:30:00
+
+Serves the per-user month views of /dashboard/schedule and the conflict
+checks on shift writes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ffe2878d6924'
+down_revision = '89dd6d4d6728'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'shifts' not in inspector.get_table_names():
+        return
+    if 'ix_shifts_user_start' not in {index['name'] for index in inspector.get_indexes('shifts')}:
+        op.create_index('ix_shifts_user_start', 'shifts', ['user_id', 'start_time'])
+
+
+def downgrade():
+    op.drop_index('ix_shifts_user_start', table_name='shifts')